@@ -9,6 +9,14 @@ class Settings(BaseSettings):
     brokerage_name: str = "Acme Logistics"
     agent_name: str = "John"
     default_search_radius_miles: int = 75
+    # Re-read each logged call after insert and log the result.
+    debug_verify_writes: bool = False
+    # How often loads are re-ranked for the time-based urgency rules.
+    urgency_sweep_seconds: int = 300
+    # How often dashboard snapshots are rebuilt without a write signal.
+    dashboard_refresh_seconds: int = 5
+    # Days of calls /api/analytics covers unless the request says.
+    analytics_window_days: int = 30
 
     model_config = {"env_file": ".env", "env_file_encoding": "utf-8"}
 
@@ -0,0 +1,17 @@
+"""zlib helpers for large text columns (call transcripts, key points)."""
+
+import zlib
+
+_LEVEL = 6
+
+
+def compress_text(text: str | None) -> bytes | None:
+    if text is None:
+        return None
+    return zlib.compress(text.encode("utf-8"), _LEVEL)
+
+
+def decompress_text(blob: bytes | None) -> str | None:
+    if blob is None:
+        return None
+    return zlib.decompress(blob).decode("utf-8")
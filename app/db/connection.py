@@ -22,3 +22,27 @@ def get_db():
         conn.commit()
     finally:
         conn.close()
+
+
+@contextmanager
+def unit_of_work():
+    """
+    One connection and one commit for all of a request's writes.
+    Repository write functions take it as `conn`:
+
+        with unit_of_work() as uow:
+            insert_call(call, conn=uow)
+            insert_interaction(interaction, conn=uow)
+    """
+    with get_db() as conn:
+        yield conn
+
+
+@contextmanager
+def use_db(conn: sqlite3.Connection | None = None):
+    """Reuse the caller's unit-of-work connection, or open a fresh one."""
+    if conn is not None:
+        yield conn
+        return
+    with get_db() as own:
+        yield own
@@ -0,0 +1,57 @@
+"""
+Keyset (cursor) pagination helpers.
+
+A cursor is the sort key of the last row of a page, ending with the
+row's unique id as a tie-breaker, packed as url-safe base64 JSON. The
+next page seeks past it with a WHERE clause on the same columns as the
+ORDER BY, so it reads only page-size rows from the index however deep
+the client has scrolled — unlike LIMIT/OFFSET, which walks and discards
+every earlier row.
+"""
+
+import base64
+import binascii
+import json
+from collections.abc import Sequence
+
+
+def encode_cursor(values: Sequence) -> str:
+    raw = json.dumps(list(values), separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(token: str, size: int) -> list:
+    """Unpack a cursor of `size` values. Raises ValueError if malformed."""
+    try:
+        padded = token + "=" * (-len(token) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded))
+    except (binascii.Error, ValueError, UnicodeDecodeError):
+        raise ValueError("Invalid cursor") from None
+    if not isinstance(values, list) or len(values) != size:
+        raise ValueError("Invalid cursor")
+    return values
+
+
+def seek_clause(
+    keys: Sequence[tuple[str, bool]], values: Sequence
+) -> tuple[str, list]:
+    """
+    WHERE fragment selecting rows strictly after `values` in the order
+    given by `keys` — (column, descending) pairs matching the ORDER BY.
+    """
+    if all(desc == keys[0][1] for _, desc in keys):
+        # Uniform direction: a row-value comparison SQLite can seek on.
+        op = "<" if keys[0][1] else ">"
+        cols = ", ".join(col for col, _ in keys)
+        marks = ", ".join("?" for _ in keys)
+        return f"({cols}) {op} ({marks})", list(values)
+
+    # Mixed directions: (a > ?) OR (a = ? AND b < ?) OR ...
+    terms: list[str] = []
+    params: list = []
+    for i, (col, desc) in enumerate(keys):
+        parts = [f"{c} = ?" for c, _ in keys[:i]]
+        parts.append(f"{col} {'<' if desc else '>'} ?")
+        terms.append(f"({' AND '.join(parts)})")
+        params.extend(values[: i + 1])
+    return f"({' OR '.join(terms)})", params
@@ -0,0 +1,37 @@
+"""
+Database maintenance commands.
+
+CLI:
+    python -m app.db.maintenance recount
+    python -m app.db.maintenance rebuild-rollups
+"""
+
+import argparse
+
+from app.db.repositories.load_repo import recount_load_counters
+from app.db.repositories.rollup_repo import rebuild_daily_rollups
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Database maintenance.")
+    sub = parser.add_subparsers(dest="command", required=True)
+    sub.add_parser(
+        "recount",
+        help="Recompute loads.pitch_count and loads.active_thinking_calls.",
+    )
+    sub.add_parser(
+        "rebuild-rollups",
+        help="Recompute the daily rollup tables from raw rows.",
+    )
+    args = parser.parse_args()
+
+    if args.command == "recount":
+        drifted = recount_load_counters()
+        print(f"{drifted} load(s) had drifted counters; repaired")
+    elif args.command == "rebuild-rollups":
+        for table, rows in rebuild_daily_rollups().items():
+            print(f"Rebuilt {rows} {table} rows")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,35 +1,84 @@
+"""
+Analytics reads. Everything about calls comes from the daily rollups
+(see rollup_repo) summed over an inclusive [since, until] range of UTC
+days, so any window costs a query over its days' rollup rows rather
+than a scan of its calls.
+
+Lane rate history is the exception: it is read whole, once, to build
+the in-memory lane statistics (see lane_stats_service).
+"""
+
+from typing import NamedTuple
+
 from app.db.connection import get_db
 
 
-def get_booked_calls_last_30_days() -> list[dict]:
-    with get_db() as conn:
-        rows = conn.execute("""
-            SELECT * FROM calls
-            WHERE outcome = 'booked'
-            AND created_at >= datetime('now', '-30 days')
-        """).fetchall()
-    return [dict(r) for r in rows]
+class LaneTotals(NamedTuple):
+    lane_origin: str
+    lane_destination: str
+    calls: int
+    bookings: int
+    rate_sum: float  # booked calls: agreed rate, else final rate
+    rate_count: int
 
 
-def get_failed_calls_last_30_days() -> list[dict]:
-    with get_db() as conn:
-        rows = conn.execute("""
-            SELECT * FROM calls
-            WHERE outcome IN ('negotiation_failed', 'dropped_call')
-            AND created_at >= datetime('now', '-30 days')
-        """).fetchall()
-    return [dict(r) for r in rows]
+class WindowTotals(NamedTuple):
+    booked_rounds: dict[int, int]  # negotiation_rounds -> booked calls
+    outcomes: dict[str, int]
+    equipment: dict[str, int]  # calls with an equipment type
+    top_lanes: list[LaneTotals]
 
 
-def get_all_calls_last_30_days() -> list[dict]:
+def get_window_totals(since: str, until: str, lanes: int = 5) -> WindowTotals:
+    """Per-window totals and the `lanes` busiest lanes, on one connection."""
+    window = "day >= :since AND day <= :until"
+    params = {"since": since, "until": until, "lanes": lanes}
     with get_db() as conn:
-        rows = conn.execute("""
-            SELECT c.*, bl.agreed_rate
-            FROM calls c
-            LEFT JOIN booked_loads bl ON c.call_id = bl.call_id
-            WHERE c.created_at >= datetime('now', '-30 days')
-        """).fetchall()
-    return [dict(r) for r in rows]
+        conn.row_factory = None
+        booked_rounds = dict(
+            conn.execute(
+                f"SELECT negotiation_rounds, SUM(calls) "
+                f"FROM booked_rounds_daily WHERE {window} "
+                "GROUP BY negotiation_rounds HAVING SUM(calls) > 0",
+                params,
+            )
+        )
+        outcomes = dict(
+            conn.execute(
+                f"SELECT outcome, SUM(calls) FROM calls_daily "
+                f"WHERE {window} "
+                "GROUP BY outcome HAVING SUM(calls) > 0",
+                params,
+            )
+        )
+        equipment = dict(
+            conn.execute(
+                f"SELECT equipment_type, SUM(calls) FROM calls_daily "
+                f"WHERE {window} AND equipment_type <> '' "
+                "GROUP BY equipment_type HAVING SUM(calls) > 0",
+                params,
+            )
+        )
+        top_lanes = list(
+            map(
+                LaneTotals._make,
+                conn.execute(
+                    f"""
+                    SELECT lane_origin, lane_destination,
+                           SUM(calls) AS n, SUM(bookings),
+                           TOTAL(rate_sum), SUM(rate_count)
+                    FROM lanes_daily
+                    WHERE {window}
+                    GROUP BY lane_origin, lane_destination
+                    HAVING n > 0
+                    ORDER BY n DESC, lane_origin, lane_destination
+                    LIMIT :lanes
+                    """,
+                    params,
+                ),
+            )
+        )
+    return WindowTotals(booked_rounds, outcomes, equipment, top_lanes)
 
 
 def get_available_loads_by_equipment() -> dict[str, int]:
@@ -43,13 +92,28 @@ def get_available_loads_by_equipment() -> dict[str, int]:
     return {r["equipment_type"]: r["cnt"] for r in rows}
 
 
-def get_recent_calls_by_equipment() -> dict[str, int]:
+class LaneBooking(NamedTuple):
+    origin: str
+    destination: str
+    equipment_type: str
+    miles: int
+    agreed_rate: float
+    loadboard_rate: float
+
+
+def get_lane_bookings() -> list[LaneBooking]:
+    """Every booking with its load's lane, oldest first."""
     with get_db() as conn:
-        rows = conn.execute("""
-            SELECT equipment_type, COUNT(*) as cnt
-            FROM calls
-            WHERE equipment_type IS NOT NULL
-            AND created_at >= datetime('now', '-30 days')
-            GROUP BY equipment_type
-        """).fetchall()
-    return {r["equipment_type"]: r["cnt"] for r in rows}
+        conn.row_factory = None
+        return list(
+            map(
+                LaneBooking._make,
+                conn.execute("""
+                    SELECT l.origin, l.destination, l.equipment_type,
+                           l.miles, b.agreed_rate, l.loadboard_rate
+                    FROM booked_loads b
+                    JOIN loads l ON l.load_id = b.load_id
+                    ORDER BY b.created_at
+                """),
+            )
+        )
@@ -1,14 +1,36 @@
+import sqlite3
 import uuid
 from datetime import datetime
 
-from app.db.connection import get_db
+from app.db.connection import get_db, use_db
+from app.db.keyset import decode_cursor, encode_cursor, seek_clause
+from app.db.repositories.rollup_repo import fold_bookings
 
 
-def insert_booked_load(booking: dict) -> dict:
+def insert_booked_load(
+    booking: dict, conn: sqlite3.Connection | None = None
+) -> dict | None:
+    """
+    Claim the load and record the booking in one write transaction.
+    Returns None when the load is no longer available (another call
+    booked it first).
+    """
     booking["id"] = f"BK-{uuid.uuid4().hex[:8]}"
     booking["created_at"] = datetime.utcnow().isoformat()
-    with get_db() as conn:
-        conn.execute(
+    with use_db(conn) as db:
+        # Take the write lock up front so the status check and the
+        # insert can't interleave with a concurrent booking.
+        if not db.in_transaction:
+            db.execute("BEGIN IMMEDIATE")
+        claimed = db.execute(
+            """UPDATE loads SET status='booked', booked_at=?
+               WHERE load_id=? AND status='available'""",
+            (booking["created_at"], booking["load_id"]),
+        ).rowcount
+        if claimed == 0:
+            # Nothing was written; the caller's transaction is intact.
+            return None
+        db.execute(
             """INSERT INTO booked_loads
                (id, load_id, mc_number, carrier_name,
                 agreed_rate, agreed_pickup_datetime,
@@ -26,11 +48,7 @@ def insert_booked_load(booking: dict) -> dict:
                 booking["created_at"],
             ),
         )
-        conn.execute(
-            """UPDATE loads SET status='booked', booked_at=?
-               WHERE load_id=?""",
-            (booking["created_at"], booking["load_id"]),
-        )
+        fold_bookings(db, "b.id = ?", (booking["id"],))
     return booking
 
 
@@ -53,9 +71,17 @@ def get_booked_load(load_id: str) -> dict | None:
     return dict(row) if row else None
 
 
+_BOOKING_LIST_KEYS = (("bl.created_at", True), ("bl.id", True))
+
+
 def get_all_booked_loads(
-    offset: int = 0, limit: int = 20, since: str | None = None
-) -> tuple[list[dict], int]:
+    offset: int = 0,
+    limit: int = 20,
+    since: str | None = None,
+    cursor: str | None = None,
+    include_total: bool = True,
+) -> tuple[list[dict], int | None, str | None]:
+    """Newest bookings first; see get_all_calls for cursor/total."""
     clauses: list[str] = []
     params: list = []
     if since:
@@ -63,10 +89,23 @@ def get_all_booked_loads(
         params.append(since)
     where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
 
+    page_clauses, page_params = list(clauses), list(params)
+    if cursor:
+        seek, seek_params = seek_clause(
+            _BOOKING_LIST_KEYS,
+            decode_cursor(cursor, len(_BOOKING_LIST_KEYS)),
+        )
+        page_clauses.append(seek)
+        page_params += seek_params
+        offset = 0
+    page_where = f"WHERE {' AND '.join(page_clauses)}" if page_clauses else ""
+
     with get_db() as conn:
-        total = conn.execute(
-            f"SELECT COUNT(*) FROM booked_loads bl {where}", params
-        ).fetchone()[0]
+        total = None
+        if include_total:
+            total = conn.execute(
+                f"SELECT COUNT(*) FROM booked_loads bl {where}", params
+            ).fetchone()[0]
         rows = conn.execute(
             f"""SELECT bl.*,
                       l.origin        AS lane_origin,
@@ -78,35 +117,34 @@ def get_all_booked_loads(
                FROM booked_loads bl
                LEFT JOIN loads l ON bl.load_id = l.load_id
                LEFT JOIN calls c ON bl.call_id = c.call_id
-               {where}
-               ORDER BY bl.created_at DESC
+               {page_where}
+               ORDER BY bl.created_at DESC, bl.id DESC
                LIMIT ? OFFSET ?""",
-            params + [limit, offset],
+            page_params + [limit + 1, offset],
         ).fetchall()
-    return [dict(r) for r in rows], total
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor([rows[-1]["created_at"], rows[-1]["id"]])
+    return [dict(r) for r in rows], total, next_cursor
 
 
 def get_booked_loads_kpis(since: str | None = None) -> dict:
-    """Aggregate KPIs across all bookings in the period."""
-    clauses: list[str] = []
-    params: list = []
-    if since:
-        clauses.append("bl.created_at >= ?")
-        params.append(since)
-    where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+    """Aggregate KPIs across all bookings in the period (bookings_daily)."""
+    where = "WHERE day >= ?" if since else ""
+    params = [since] if since else []
 
     with get_db() as conn:
         row = conn.execute(
             f"""SELECT
-                    COUNT(*) AS total_bookings,
-                    COALESCE(SUM(bl.agreed_rate), 0) AS total_revenue,
-                    AVG(CASE WHEN l.loadboard_rate > 0 AND bl.agreed_rate IS NOT NULL
-                        THEN ((l.loadboard_rate - bl.agreed_rate) / l.loadboard_rate) * 100
-                        ELSE NULL END) AS avg_margin,
-                    AVG(c.negotiation_rounds) AS avg_rounds
-                FROM booked_loads bl
-                LEFT JOIN loads l ON bl.load_id = l.load_id
-                LEFT JOIN calls c ON bl.call_id = c.call_id
+                    SUM(bookings) AS total_bookings,
+                    TOTAL(agreed_sum) AS total_revenue,
+                    TOTAL(margin_sum) / NULLIF(SUM(margin_count), 0)
+                        AS avg_margin,
+                    TOTAL(rounds_sum) / NULLIF(SUM(rounds_count), 0)
+                        AS avg_rounds
+                FROM bookings_daily
                 {where}""",
             params,
         ).fetchone()
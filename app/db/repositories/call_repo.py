@@ -1,61 +1,115 @@
 import json
+import sqlite3
 import uuid
-from datetime import datetime
+import zlib
+from datetime import UTC, datetime
 from typing import Optional
 
-from app.db.connection import get_db
+from app.db.compression import compress_text, decompress_text
+from app.db.connection import get_db, use_db
+from app.db.keyset import decode_cursor, encode_cursor, seek_clause
+from app.db.repositories.rollup_repo import fold_calls
+
+_INSERT_CALL_SQL = """INSERT INTO calls
+   (id, call_id, mc_number, carrier_name, lane_origin,
+    lane_destination, equipment_type, load_id,
+    initial_rate, final_rate, negotiation_rounds,
+    carrier_phone, special_requests, outcome,
+    sentiment, duration_seconds, summary, created_at)
+   VALUES (?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?)"""
+
+_INSERT_TRANSCRIPT_SQL = """INSERT INTO call_transcripts
+   (id, transcript, key_points) VALUES (?,?,?)"""
+
+
+def _call_params(call: dict) -> tuple:
+    return (
+        call["id"],
+        call["call_id"],
+        call.get("mc_number"),
+        call.get("carrier_name"),
+        call.get("lane_origin"),
+        call.get("lane_destination"),
+        call.get("equipment_type"),
+        call.get("load_id"),
+        call.get("initial_rate"),
+        call.get("final_rate"),
+        call.get("negotiation_rounds", 0),
+        call.get("carrier_phone"),
+        call.get("special_requests"),
+        call["outcome"],
+        call["sentiment"],
+        call.get("duration_seconds"),
+        call.get("summary"),
+        call["created_at"],
+    )
+
+
+def _transcript_params(call: dict) -> tuple | None:
+    """Compressed side-table row, or None when there's nothing to store."""
+    transcript = call.get("transcript")
+    key_points = call.get("key_points")
+    if not transcript and not key_points:
+        return None
+    return (
+        call["id"],
+        compress_text(transcript),
+        compress_text(json.dumps(key_points)) if key_points else None,
+    )
 
 
-def insert_call(call: dict) -> dict:
+def insert_call(call: dict, conn: sqlite3.Connection | None = None) -> dict:
     call["id"] = f"CALL-{uuid.uuid4().hex[:8]}"
     call["created_at"] = datetime.utcnow().isoformat()
+    with use_db(conn) as db:
+        db.execute(_INSERT_CALL_SQL, _call_params(call))
+        transcript = _transcript_params(call)
+        if transcript is not None:
+            db.execute(_INSERT_TRANSCRIPT_SQL, transcript)
+        fold_calls(db, "c.id = ?", (call["id"],))
+    return call
 
-    key_points_json = None
-    if call.get("key_points"):
-        key_points_json = json.dumps(call["key_points"])
 
-    with get_db() as conn:
-        conn.execute(
-            """INSERT INTO calls
-               (id, call_id, mc_number, carrier_name, lane_origin,
-                lane_destination, equipment_type, load_id,
-                initial_rate, final_rate, negotiation_rounds,
-                carrier_phone, special_requests, outcome,
-                sentiment, duration_seconds, transcript,
-                summary, key_points, created_at)
-               VALUES (?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?)""",
-            (
-                call["id"],
-                call["call_id"],
-                call.get("mc_number"),
-                call.get("carrier_name"),
-                call.get("lane_origin"),
-                call.get("lane_destination"),
-                call.get("equipment_type"),
-                call.get("load_id"),
-                call.get("initial_rate"),
-                call.get("final_rate"),
-                call.get("negotiation_rounds", 0),
-                call.get("carrier_phone"),
-                call.get("special_requests"),
-                call["outcome"],
-                call["sentiment"],
-                call.get("duration_seconds"),
-                call.get("transcript"),
-                call.get("summary"),
-                key_points_json,
-                call["created_at"],
-            ),
+def insert_calls(
+    calls: list[dict], conn: sqlite3.Connection | None = None
+) -> int:
+    """
+    Insert many calls with one executemany. Rows keep their own
+    `created_at` when given (backfills); ids are always generated.
+    """
+    # Naive UTC ISO text, as every other created_at is stored.
+    now = datetime.now(UTC).replace(tzinfo=None).isoformat()
+    for call in calls:
+        # Full 128-bit ids: short ones collide at backfill volumes.
+        call["id"] = f"CALL-{uuid.uuid4().hex}"
+        if not call.get("created_at"):
+            call["created_at"] = now
+    transcripts = [t for t in map(_transcript_params, calls) if t is not None]
+    with use_db(conn) as db:
+        db.executemany(_INSERT_CALL_SQL, map(_call_params, calls))
+        db.executemany(_INSERT_TRANSCRIPT_SQL, transcripts)
+        fold_calls(
+            db,
+            "c.id IN (SELECT value FROM json_each(?))",
+            (json.dumps([call["id"] for call in calls]),),
         )
-    return call
+    return len(calls)
+
+
+# Call columns plus the decompressed-on-read transcript fields.
+_SELECT_WITH_TRANSCRIPT = """SELECT calls.*,
+       ct.transcript AS transcript, ct.key_points AS key_points
+FROM calls LEFT JOIN call_transcripts ct ON ct.id = calls.id"""
 
 
 def _row_to_dict(row) -> dict:
     d = dict(row)
+    if "transcript" in d:
+        d["transcript"] = decompress_text(d["transcript"])
     if d.get("key_points"):
         try:
-            d["key_points"] = json.loads(d["key_points"])
-        except (json.JSONDecodeError, TypeError):
+            d["key_points"] = json.loads(decompress_text(d["key_points"]))
+        except (json.JSONDecodeError, TypeError, zlib.error):
             d["key_points"] = None
     return d
 
@@ -63,13 +117,16 @@ def _row_to_dict(row) -> dict:
 def get_call_by_call_id(call_id: str) -> Optional[dict]:
     with get_db() as conn:
         row = conn.execute(
-            "SELECT * FROM calls WHERE call_id = ?", (call_id,)
+            f"{_SELECT_WITH_TRANSCRIPT} WHERE calls.call_id = ?", (call_id,)
         ).fetchone()
     if row is None:
         return None
     return _row_to_dict(row)
 
 
+_CALL_LIST_KEYS = (("calls.created_at", True), ("calls.id", True))
+
+
 def get_all_calls(
     outcome: Optional[str] = None,
     sentiment: Optional[str] = None,
@@ -77,7 +134,16 @@ def get_all_calls(
     since: Optional[str] = None,
     page: int = 1,
     page_size: int = 50,
-) -> tuple[list[dict], int]:
+    include_transcript: bool = False,
+    cursor: str | None = None,
+    include_total: bool = True,
+) -> tuple[list[dict], int | None, str | None]:
+    """
+    One page of calls, newest first, plus the filtered total (None
+    unless `include_total`) and the cursor of the next page (None on
+    the last one). A `cursor` seeks past the previous page and takes
+    precedence over `page`.
+    """
     clauses: list[str] = []
     params: list = []
 
@@ -96,46 +162,65 @@ def get_all_calls(
 
     where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
 
-    with get_db() as conn:
-        total = conn.execute(
-            f"SELECT COUNT(*) FROM calls {where}", params
-        ).fetchone()[0]
+    page_clauses, page_params = list(clauses), list(params)
+    offset = (page - 1) * page_size
+    if cursor:
+        seek, seek_params = seek_clause(
+            _CALL_LIST_KEYS, decode_cursor(cursor, len(_CALL_LIST_KEYS))
+        )
+        page_clauses.append(seek)
+        page_params += seek_params
+        offset = 0
+    page_where = f"WHERE {' AND '.join(page_clauses)}" if page_clauses else ""
 
+    with get_db() as conn:
+        total = None
+        if include_total:
+            total = conn.execute(
+                f"SELECT COUNT(*) FROM calls {where}", params
+            ).fetchone()[0]
+
+        select = (
+            _SELECT_WITH_TRANSCRIPT
+            if include_transcript
+            else "SELECT * FROM calls"
+        )
+        # One extra row tells whether there is a next page.
         rows = conn.execute(
-            f"SELECT * FROM calls {where} "
-            "ORDER BY created_at DESC LIMIT ? OFFSET ?",
-            params + [page_size, (page - 1) * page_size],
+            f"{select} {page_where} "
+            "ORDER BY calls.created_at DESC, calls.id DESC "
+            "LIMIT ? OFFSET ?",
+            page_params + [page_size + 1, offset],
         ).fetchall()
 
-    return [_row_to_dict(r) for r in rows], total
+    next_cursor = None
+    if len(rows) > page_size:
+        rows = rows[:page_size]
+        next_cursor = encode_cursor([rows[-1]["created_at"], rows[-1]["id"]])
+    return [_row_to_dict(r) for r in rows], total, next_cursor
 
 
 def get_calls_kpis(since: Optional[str] = None) -> dict:
-    """Aggregate KPIs across all calls in the period."""
-    clauses: list[str] = []
-    params: list = []
-    if since:
-        clauses.append("created_at >= ?")
-        params.append(since)
-    where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+    """Aggregate KPIs across all calls in the period (from calls_daily)."""
+    where = "WHERE day >= ?" if since else ""
+    params = [since] if since else []
 
     with get_db() as conn:
         row = conn.execute(
             f"SELECT "
-            f"  COUNT(*) AS total, "
-            f"  SUM(CASE WHEN outcome='booked' THEN 1 ELSE 0 END) AS booked, "
-            f"  COALESCE(SUM(duration_seconds), 0) AS total_duration, "
-            f"  AVG(CASE WHEN outcome='booked'"
-            f"      AND initial_rate > 0 AND final_rate IS NOT NULL"
-            f"      THEN (final_rate - initial_rate) * 100.0"
-            f"           / initial_rate END) AS avg_neg_pct "
-            f"FROM calls {where}",
+            f"  SUM(calls) AS total, "
+            f"  SUM(CASE WHEN outcome='booked' THEN calls END) AS booked, "
+            f"  TOTAL(duration_sum) AS total_duration, "
+            f"  SUM(CASE WHEN outcome='booked' THEN neg_pct_sum END)"
+            f"  / SUM(CASE WHEN outcome='booked' THEN neg_pct_count END)"
+            f"  AS avg_neg_pct "
+            f"FROM calls_daily {where}",
             params,
         ).fetchone()
 
     total = row[0] or 0
     booked = row[1] or 0
-    total_duration = row[2] or 0
+    total_duration = int(row[2] or 0)
     avg_neg_pct = row[3]
 
     return {
@@ -1,34 +1,57 @@
+import sqlite3
 import uuid
-from datetime import datetime
+from datetime import UTC, datetime
 
-from app.db.connection import get_db
+from app.db.connection import get_db, use_db
 
+_INSERT_INTERACTION_SQL = """INSERT INTO carrier_interactions
+   (id, mc_number, carrier_name, call_id,
+    call_length_seconds, outcome, load_id,
+    notes, created_at)
+   VALUES (?,?,?,?,?,?,?,?,?)"""
 
-def insert_interaction(interaction: dict) -> dict:
+
+def _interaction_params(interaction: dict) -> tuple:
+    return (
+        interaction["id"],
+        interaction["mc_number"],
+        interaction.get("carrier_name"),
+        interaction.get("call_id"),
+        interaction.get("call_length_seconds"),
+        interaction.get("outcome"),
+        interaction.get("load_id"),
+        interaction.get("notes", ""),
+        interaction["created_at"],
+    )
+
+
+def insert_interaction(
+    interaction: dict, conn: sqlite3.Connection | None = None
+) -> dict:
     interaction["id"] = f"CI-{uuid.uuid4().hex[:8]}"
     interaction["created_at"] = datetime.utcnow().isoformat()
-    with get_db() as conn:
-        conn.execute(
-            """INSERT INTO carrier_interactions
-               (id, mc_number, carrier_name, call_id,
-                call_length_seconds, outcome, load_id,
-                notes, created_at)
-               VALUES (?,?,?,?,?,?,?,?,?)""",
-            (
-                interaction["id"],
-                interaction["mc_number"],
-                interaction.get("carrier_name"),
-                interaction.get("call_id"),
-                interaction.get("call_length_seconds"),
-                interaction.get("outcome"),
-                interaction.get("load_id"),
-                interaction.get("notes", ""),
-                interaction["created_at"],
-            ),
-        )
+    with use_db(conn) as db:
+        db.execute(_INSERT_INTERACTION_SQL, _interaction_params(interaction))
     return interaction
 
 
+def insert_interactions(
+    interactions: list[dict], conn: sqlite3.Connection | None = None
+) -> int:
+    # Naive UTC ISO text, as every other created_at is stored.
+    now = datetime.now(UTC).replace(tzinfo=None).isoformat()
+    for interaction in interactions:
+        # Full 128-bit ids: short ones collide at backfill volumes.
+        interaction["id"] = f"CI-{uuid.uuid4().hex}"
+        if not interaction.get("created_at"):
+            interaction["created_at"] = now
+    with use_db(conn) as db:
+        db.executemany(
+            _INSERT_INTERACTION_SQL, map(_interaction_params, interactions)
+        )
+    return len(interactions)
+
+
 def get_interactions_by_mc(mc_number: str) -> list[dict]:
     with get_db() as conn:
         rows = conn.execute(
@@ -1,53 +1,218 @@
+"""
+Dashboard reads, aggregated in SQL and projected to what
+`dashboard_service` consumes.
+
+Period aggregates come from the daily rollups (see rollup_repo): a
+period's calls as one row per (outcome, sentiment, negotiated) and its
+bookings as one summary row, so a dashboard reads at most a few hundred
+rollup rows however many calls exist. The current and previous periods
+come out of one statement per table, each rollup row read once and
+tagged with its period. Only the recent-calls table is fetched from
+`calls` row by row.
+"""
+
+from typing import NamedTuple
+
 from app.db.connection import get_db
+from app.db.repositories.rollup_repo import _NEG_PCT
+
+
+class CallGroup(NamedTuple):
+    outcome: str
+    sentiment: str
+    negotiated: bool
+    calls: int
+    offered_calls: int
+    final_rate_sum: float
+    rate_diff_sum: float
+    rate_diff_count: int
+
+
+class RecentCallRow(NamedTuple):
+    call_id: str
+    mc_number: str | None
+    carrier_name: str | None
+    lane_origin: str | None
+    lane_destination: str | None
+    load_id: str | None
+    outcome: str
+    final_rate: float | None
+    created_at: str
+
+
+class BookingSummary(NamedTuple):
+    bookings: int
+    revenue: float
+    avg_loadboard: float | None
+    avg_agreed: float | None
+    avg_margin_pct: float | None
+
+
+class CallBucket(NamedTuple):
+    calls: int
+    booked: int
+    neg_pct_sum: float  # booked calls, as the calls KPI averages it
+    neg_pct_count: int
+
+
+_EMPTY_BOOKING_SUMMARY = BookingSummary(0, 0.0, None, None, None)
+
+_RECENT_CALL_COLUMNS = ", ".join(RecentCallRow._fields)
+
+
+def get_call_groups(
+    since: str | None = None, previous_since: str | None = None
+) -> tuple[list[CallGroup], dict[str, int]]:
+    """
+    Call counts and rate sums per (outcome, sentiment, negotiated) from
+    `since`, and the previous period's ([previous_since, since)) call
+    counts per outcome, which is all its trends need. One statement:
+    each rollup row is read once, tagged with the period it falls in.
+    """
+    where, params = ("WHERE day >= ?", [since]) if since else ("", [])
+    previous = ""
+    if since and previous_since:
+        previous = """
+            UNION ALL
+            SELECT 0, outcome, NULL, NULL, SUM(calls),
+                   NULL, NULL, NULL, NULL
+            FROM calls_daily
+            WHERE day >= ? AND day < ?
+            GROUP BY outcome
+            HAVING SUM(calls) > 0
+            """
+        params += [previous_since, since]
+    groups: list[CallGroup] = []
+    previous_outcomes: dict[str, int] = {}
+    with get_db() as conn:
+        cur = conn.execute(
+            f"""
+            SELECT 1, outcome, sentiment, negotiated,
+                   SUM(calls), SUM(offered_calls),
+                   TOTAL(final_rate_sum),
+                   TOTAL(rate_diff_sum), SUM(rate_diff_count)
+            FROM calls_daily
+            {where}
+            GROUP BY outcome, sentiment, negotiated
+            HAVING SUM(calls) > 0
+            {previous}
+            """,
+            params,
+        )
+        cur.row_factory = None
+        for is_current, *group in cur:
+            if is_current:
+                groups.append(CallGroup._make(group))
+            else:
+                previous_outcomes[group[0]] = group[3]
+    return groups, previous_outcomes
+
+
+def get_recent_calls(
+    since: str | None = None, limit: int = 10
+) -> list[RecentCallRow]:
+    """The `limit` newest calls, optionally since a date."""
+    where = "WHERE created_at >= ?" if since else ""
+    params = (since,) if since else ()
+    with get_db() as conn:
+        cur = conn.execute(
+            f"SELECT {_RECENT_CALL_COLUMNS} FROM calls {where} "
+            "ORDER BY created_at DESC LIMIT ?",
+            (*params, limit),
+        )
+        cur.row_factory = None
+        return list(map(RecentCallRow._make, cur))
+
+
+def get_booking_summaries(
+    since: str | None = None, previous_since: str | None = None
+) -> tuple[BookingSummary, BookingSummary]:
+    """
+    Booking count, revenue and rate averages from `since`, and for the
+    previous period ([previous_since, since)), in one scan grouped by
+    which period each rollup row falls in.
+    """
+    current, params = ("day >= ?", [since]) if since else ("1", [])
+    where = ""
+    if since:
+        where = "WHERE day >= ?"
+        params.append(previous_since or since)
+    summaries = {1: _EMPTY_BOOKING_SUMMARY, 0: _EMPTY_BOOKING_SUMMARY}
+    with get_db() as conn:
+        cur = conn.execute(
+            f"""
+            SELECT {current} AS is_current,
+                   SUM(bookings),
+                   TOTAL(agreed_sum),
+                   TOTAL(loadboard_sum) / NULLIF(SUM(loadboard_count), 0),
+                   TOTAL(agreed_nz_sum) / NULLIF(SUM(agreed_nz_count), 0),
+                   TOTAL(margin_nz_sum) / NULLIF(SUM(margin_nz_count), 0)
+            FROM bookings_daily
+            {where}
+            GROUP BY is_current
+            """,
+            params,
+        )
+        cur.row_factory = None
+        for is_current, *summary in cur:
+            summaries[is_current] = BookingSummary._make(summary)
+    return summaries[1], summaries[0]
+
 
+# ── Time-series buckets ──────────────────────────────────────────────────────
+#
+# Over [since, until) in unix seconds, keyed by bucket start: buckets are
+# `width` seconds, aligned to the epoch (so days are UTC days). They read
+# the created_epoch indexes only.
 
-def get_calls_since(since: str | None = None) -> list[dict]:
-    """Get all calls, optionally filtered by created_at >= since."""
+
+def get_first_epoch() -> int | None:
+    """When the oldest call or booking was created, in unix seconds."""
     with get_db() as conn:
-        if since:
-            rows = conn.execute(
-                "SELECT * FROM calls WHERE created_at >= ? ORDER BY created_at DESC",
-                (since,),
-            ).fetchall()
-        else:
-            rows = conn.execute(
-                "SELECT * FROM calls ORDER BY created_at DESC"
-            ).fetchall()
-    return [dict(r) for r in rows]
-
-
-def get_bookings_with_loads_since(since: str | None = None) -> list[dict]:
-    """Get bookings joined with loads, optionally filtered by date."""
+        return conn.execute(
+            "SELECT MIN(m) FROM ("
+            "  SELECT MIN(created_epoch) AS m FROM calls"
+            "  UNION ALL SELECT MIN(created_epoch) FROM booked_loads)"
+        ).fetchone()[0]
+
+
+def get_call_buckets(
+    width: int, since: int, until: int
+) -> dict[int, CallBucket]:
     with get_db() as conn:
-        if since:
-            rows = conn.execute(
-                """
-                SELECT bl.*, l.loadboard_rate
-                FROM booked_loads bl
-                LEFT JOIN loads l ON bl.load_id = l.load_id
-                WHERE bl.created_at >= ?
-                ORDER BY bl.created_at DESC
+        cur = conn.execute(
+            f"""
+            SELECT created_epoch / :width * :width AS bucket,
+                   COUNT(*),
+                   TOTAL(c.outcome = 'booked'),
+                   TOTAL(CASE WHEN c.outcome = 'booked' THEN {_NEG_PCT} END),
+                   COUNT(CASE WHEN c.outcome = 'booked' THEN {_NEG_PCT} END)
+            FROM calls c
+            WHERE created_epoch >= :since AND created_epoch < :until
+            GROUP BY bucket
             """,
-                (since,),
-            ).fetchall()
-        else:
-            rows = conn.execute("""
-                SELECT bl.*, l.loadboard_rate
-                FROM booked_loads bl
-                LEFT JOIN loads l ON bl.load_id = l.load_id
-                ORDER BY bl.created_at DESC
-            """).fetchall()
-    return [dict(r) for r in rows]
-
-
-def get_offers_for_calls(call_ids: list[str]) -> list[dict]:
-    """Get offers associated with a list of call_ids."""
-    if not call_ids:
-        return []
-    placeholders = ",".join("?" for _ in call_ids)
+            {"width": width, "since": since, "until": until},
+        )
+        cur.row_factory = None
+        return {
+            bucket: CallBucket(calls, int(booked), neg_sum, neg_count)
+            for bucket, calls, booked, neg_sum, neg_count in cur
+        }
+
+
+def get_revenue_buckets(
+    width: int, since: int, until: int
+) -> dict[int, float]:
     with get_db() as conn:
-        rows = conn.execute(
-            f"SELECT * FROM offers WHERE call_id IN ({placeholders})",
-            call_ids,
-        ).fetchall()
-    return [dict(r) for r in rows]
+        cur = conn.execute(
+            """
+            SELECT created_epoch / :width * :width AS bucket,
+                   TOTAL(agreed_rate)
+            FROM booked_loads
+            WHERE created_epoch >= :since AND created_epoch < :until
+            GROUP BY bucket
+            """,
+            {"width": width, "since": since, "until": until},
+        )
+        cur.row_factory = None
+        return dict(cur.fetchall())
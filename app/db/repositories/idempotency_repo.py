@@ -0,0 +1,63 @@
+import sqlite3
+from datetime import UTC, datetime
+
+from app.db.connection import use_db
+
+
+def get_stored_response(
+    scope: str, key: str, conn: sqlite3.Connection | None = None
+) -> tuple[str, str] | None:
+    """(request_hash, response) stored under the key, if any."""
+    with use_db(conn) as db:
+        row = db.execute(
+            """SELECT request_hash, response FROM idempotency_keys
+               WHERE scope=? AND key=?""",
+            (scope, key),
+        ).fetchone()
+    return (row["request_hash"], row["response"]) if row else None
+
+
+def claim_key(
+    scope: str, key: str, request_hash: str, conn: sqlite3.Connection
+) -> bool:
+    """
+    Insert the key with an empty response, in the caller's write
+    transaction. False when it already exists: another request with the
+    key has committed, or ran earlier in this transaction.
+    """
+    return (
+        conn.execute(
+            """INSERT INTO idempotency_keys
+               (scope, key, request_hash, response, created_at)
+               VALUES (?,?,?,'',?)
+               ON CONFLICT(scope, key) DO NOTHING""",
+            (scope, key, request_hash, datetime.now(UTC).isoformat()),
+        ).rowcount
+        == 1
+    )
+
+
+def store_response(
+    scope: str, key: str, response: str, conn: sqlite3.Connection
+) -> None:
+    """Fill in the response of a key claimed in this transaction."""
+    conn.execute(
+        "UPDATE idempotency_keys SET response=? WHERE scope=? AND key=?",
+        (response, scope, key),
+    )
+
+
+def release_key(scope: str, key: str, conn: sqlite3.Connection) -> None:
+    """Drop a key claimed in this transaction whose write didn't happen."""
+    conn.execute(
+        "DELETE FROM idempotency_keys WHERE scope=? AND key=?", (scope, key)
+    )
+
+
+def delete_responses_before(
+    cutoff: str, conn: sqlite3.Connection | None = None
+) -> int:
+    with use_db(conn) as db:
+        return db.execute(
+            "DELETE FROM idempotency_keys WHERE created_at < ?", (cutoff,)
+        ).rowcount
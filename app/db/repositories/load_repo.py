@@ -1,6 +1,9 @@
+import sqlite3
+import threading
 from typing import Optional
 
-from app.db.connection import get_db
+from app.db.connection import get_db, use_db
+from app.db.keyset import decode_cursor, encode_cursor, seek_clause
 
 
 def get_all_loads() -> list[dict]:
@@ -11,31 +14,88 @@ def get_all_loads() -> list[dict]:
         return [dict(r) for r in rows]
 
 
-_ALLOWED_SORT_FIELDS = {
-    "pickup_datetime",
-    "loadboard_rate",
-    "miles",
-    "created_at",
-    "weight",
+# ── Urgency ──────────────────────────────────────────────────────────────────
+# Persisted as loads.urgency_rank (0 critical, 1 high, 2 normal) so it
+# can be filtered, sorted and paginated in SQL. Triggers recompute it
+# when a load's inputs change (schema.py); the days-listed part only
+# changes with the clock, so refresh_urgency() sweeps it periodically.
+
+URGENCY_LEVELS = ("critical", "high", "normal")
+
+_PERISHABLE_KEYWORDS = (
+    "temp-controlled",
+    "seafood",
+    "produce",
+    "frozen",
+    "perishable",
+    "dairy",
+    "meat",
+)
+
+_PERISHABLE_SQL = " OR ".join(
+    f"commodity_type LIKE '%{kw}%'" for kw in _PERISHABLE_KEYWORDS
+)
+
+# Unqualified columns, so it evaluates against the loads row in an
+# UPDATE or trigger. LIKE is case-insensitive for ASCII.
+URGENCY_RANK_SQL = f"""CASE
+    WHEN pitch_count > 8
+      OR julianday('now') - julianday(created_at) >= 2
+      OR {_PERISHABLE_SQL}
+      OR notes LIKE '%dead-end%'
+    THEN 0
+    WHEN pitch_count > 4
+      OR julianday('now') - julianday(created_at) >= 1
+    THEN 1
+    ELSE 2
+END"""
+
+
+def refresh_urgency(conn: sqlite3.Connection | None = None) -> int:
+    """Recompute loads.urgency_rank. Returns how many loads changed."""
+    with use_db(conn) as db:
+        cur = db.execute(
+            f"UPDATE loads SET urgency_rank = {URGENCY_RANK_SQL} "
+            f"WHERE urgency_rank IS NOT {URGENCY_RANK_SQL}"
+        )
+        return cur.rowcount
+
+
+# Sort field → column; urgency sorts critical first when ascending.
+_SORT_COLUMNS = {
+    "pickup_datetime": "loads.pickup_datetime",
+    "loadboard_rate": "loads.loadboard_rate",
+    "miles": "loads.miles",
+    "created_at": "loads.created_at",
+    "weight": "loads.weight",
+    "urgency": "loads.urgency_rank",
 }
-_ALLOWED_ORDER = {"asc", "desc"}
 
 
-def _build_order_clause(sort_by: str, sort_order: str) -> str:
-    """Build a multi-column ORDER BY clause from comma-separated sort fields."""
+def _sort_keys(sort_by: str, sort_order: str) -> list[tuple[str, bool]]:
+    """
+    (column, descending) pairs from comma-separated sort fields, ending
+    with load_id so the order is total (needed for cursors).
+    """
     fields = [s.strip() for s in sort_by.split(",") if s.strip()]
     orders = [s.strip() for s in sort_order.split(",") if s.strip()]
     # Pad orders to match fields length
     while len(orders) < len(fields):
         orders.append("asc")
 
-    parts: list[str] = []
+    keys: list[tuple[str, bool]] = []
     for field, ord_ in zip(fields, orders):
-        if field in _ALLOWED_SORT_FIELDS:
-            safe_ord = ord_.upper() if ord_.lower() in _ALLOWED_ORDER else "ASC"
-            parts.append(f"loads.{field} {safe_ord}")
+        if field in _SORT_COLUMNS:
+            keys.append((_SORT_COLUMNS[field], ord_.lower() == "desc"))
+    if not keys:
+        keys.append(("loads.pickup_datetime", False))
+    keys.append(("loads.load_id", keys[-1][1]))
+    return keys
 
-    return f"ORDER BY {', '.join(parts)}" if parts else "ORDER BY loads.pickup_datetime ASC"
+
+def _build_order_clause(keys: list[tuple[str, bool]]) -> str:
+    parts = [f"{col} {'DESC' if desc else 'ASC'}" for col, desc in keys]
+    return f"ORDER BY {', '.join(parts)}"
 
 
 def get_loads_paginated(
@@ -44,12 +104,18 @@ def get_loads_paginated(
     origin: str | None = None,
     destination: str | None = None,
     since: str | None = None,
+    urgency: str | None = None,
     page: int = 1,
     page_size: int = 50,
     sort_by: str = "pickup_datetime",
     sort_order: str = "asc",
-    skip_pagination: bool = False,
-) -> tuple[list[dict], int]:
+    cursor: str | None = None,
+    include_total: bool = True,
+) -> tuple[list[dict], int | None, str | None]:
+    """
+    Rows, filtered total (None unless `include_total`) and next-page
+    cursor (None on the last page).
+    """
     clauses: list[str] = []
     params: list = []
 
@@ -68,33 +134,51 @@ def get_loads_paginated(
     if destination:
         clauses.append("loads.destination LIKE ?")
         params.append(f"%{destination}%")
+    if urgency:
+        # An unknown level matches nothing, as before.
+        clauses.append("loads.urgency_rank = ?")
+        params.append(
+            URGENCY_LEVELS.index(urgency) if urgency in URGENCY_LEVELS else -1
+        )
 
     where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
 
-    order_clause = _build_order_clause(sort_by, sort_order)
+    keys = _sort_keys(sort_by, sort_order)
+    order_clause = _build_order_clause(keys)
 
-    select_expr = (
-        f"SELECT loads.*, "
-        f"(SELECT COUNT(*) FROM offers WHERE offers.load_id = loads.load_id) AS pitch_count, "
-        f"(SELECT COUNT(*) FROM calls WHERE calls.load_id = loads.load_id "
-        f"AND calls.outcome = 'carrier_thinking') AS active_thinking_calls "
-        f"FROM loads {where} {order_clause}"
-    )
+    page_clauses, page_params = list(clauses), list(params)
+    offset = (page - 1) * page_size
+    if cursor:
+        seek, seek_params = seek_clause(keys, decode_cursor(cursor, len(keys)))
+        page_clauses.append(seek)
+        page_params += seek_params
+        offset = 0
+    page_where = f"WHERE {' AND '.join(page_clauses)}" if page_clauses else ""
 
+    # pitch_count / active_thinking_calls are trigger-maintained columns.
+    select_expr = f"SELECT * FROM loads {page_where} {order_clause}"
+
+    next_cursor = None
     with get_db() as conn:
-        total = conn.execute(
-            f"SELECT COUNT(*) FROM loads {where}", params
-        ).fetchone()[0]
+        total = None
+        if include_total:
+            total = conn.execute(
+                f"SELECT COUNT(*) FROM loads {where}", params
+            ).fetchone()[0]
 
-        if skip_pagination:
-            rows = conn.execute(select_expr, params).fetchall()
-        else:
-            rows = conn.execute(
-                f"{select_expr} LIMIT ? OFFSET ?",
-                params + [page_size, (page - 1) * page_size],
-            ).fetchall()
+        # One extra row tells whether there is a next page.
+        rows = conn.execute(
+            f"{select_expr} LIMIT ? OFFSET ?",
+            page_params + [page_size + 1, offset],
+        ).fetchall()
+        if len(rows) > page_size:
+            rows = rows[:page_size]
+            last = rows[-1]
+            next_cursor = encode_cursor(
+                [last[col.split(".", 1)[1]] for col, _ in keys]
+            )
 
-    return [dict(r) for r in rows], total
+    return [dict(r) for r in rows], total, next_cursor
 
 
 def get_load_by_id(load_id: str) -> dict | None:
@@ -105,6 +189,19 @@ def get_load_by_id(load_id: str) -> dict | None:
         return dict(row) if row else None
 
 
+def get_loads_by_ids(load_ids: list[str]) -> dict[str, dict]:
+    """Fetch several loads in one query, keyed by load_id."""
+    if not load_ids:
+        return {}
+    placeholders = ",".join("?" for _ in load_ids)
+    with get_db() as conn:
+        rows = conn.execute(
+            f"SELECT * FROM loads WHERE load_id IN ({placeholders})",
+            load_ids,
+        ).fetchall()
+    return {r["load_id"]: dict(r) for r in rows}
+
+
 def mark_load_booked(load_id: str, booked_at: str) -> None:
     with get_db() as conn:
         conn.execute(
@@ -113,12 +210,19 @@ def mark_load_booked(load_id: str, booked_at: str) -> None:
         )
 
 
-def get_loads_kpis(
-    since: str | None = None,
-    status: str | None = None,
-    target_margin: float = 0.15,
+# Load KPIs cached per (since, status, target_margin) and dropped as a
+# whole when loads_version moves, i.e. on any load or offer write.
+_kpi_cache: dict[tuple, dict] = {}
+_kpi_cache_version = -1
+_kpi_lock = threading.Lock()
+
+
+def _read_kpis(
+    conn: sqlite3.Connection,
+    since: str | None,
+    status: str | None,
+    target_margin: float,
 ) -> dict:
-    """Aggregate KPIs and urgency data across all loads in the period."""
     clauses: list[str] = []
     params: list = []
     if since:
@@ -130,27 +234,76 @@ def get_loads_kpis(
     where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
 
     floor_factor = 1 - target_margin
-
-    with get_db() as conn:
-        row = conn.execute(
-            f"SELECT "
-            f"  COUNT(*) AS total_loads, "
-            f"  AVG(CASE WHEN loads.miles > 0 "
-            f"      THEN loads.loadboard_rate * ? / loads.miles "
-            f"      ELSE NULL END) AS avg_rpm "
-            f"FROM loads {where}",
-            [floor_factor] + params,
-        ).fetchone()
-
-        urgency_rows = conn.execute(
-            f"SELECT loads.commodity_type, loads.notes, loads.created_at, "
-            f"  (SELECT COUNT(*) FROM offers WHERE offers.load_id = loads.load_id) AS pitch_count "
-            f"FROM loads {where}",
-            params,
-        ).fetchall()
+    row = conn.execute(
+        f"SELECT "
+        f"  COUNT(*) AS total_loads, "
+        f"  AVG(CASE WHEN loads.miles > 0 "
+        f"      THEN loads.loadboard_rate * ? / loads.miles "
+        f"      ELSE NULL END) AS avg_rpm, "
+        f"  SUM(loads.urgency_rank = 0) AS critical_count "
+        f"FROM loads {where}",
+        [floor_factor] + params,
+    ).fetchone()
 
     return {
         "total_loads": row[0] or 0,
         "avg_rate_per_mile": round(row[1], 2) if row[1] is not None else None,
-        "urgency_data": [dict(r) for r in urgency_rows],
+        "critical_count": row[2] or 0,
     }
+
+
+def get_loads_kpis(
+    since: str | None = None,
+    status: str | None = None,
+    target_margin: float = 0.15,
+) -> dict:
+    """Aggregate KPIs across all loads in the period, in one pass."""
+    global _kpi_cache_version
+    key = (since, status, target_margin)
+    with get_db() as conn:
+        # One read transaction so the version matches what we cache.
+        conn.execute("BEGIN")
+        version = conn.execute(
+            "SELECT version FROM loads_version WHERE id = 1"
+        ).fetchone()[0]
+        with _kpi_lock:
+            if version != _kpi_cache_version:
+                _kpi_cache.clear()
+                _kpi_cache_version = version
+            cached = _kpi_cache.get(key)
+        if cached is not None:
+            return dict(cached)
+        kpis = _read_kpis(conn, since, status, target_margin)
+    with _kpi_lock:
+        if version == _kpi_cache_version:
+            _kpi_cache[key] = kpis
+    return dict(kpis)
+
+
+def recount_load_counters(conn: sqlite3.Connection | None = None) -> int:
+    """
+    Recompute loads.pitch_count and loads.active_thinking_calls from
+    offers and calls. Returns how many loads had drifted.
+    """
+    with use_db(conn) as db:
+        cur = db.execute(
+            """UPDATE loads
+               SET pitch_count = e.pitch_count,
+                   active_thinking_calls = e.active_thinking_calls
+               FROM (
+                   SELECT l.load_id,
+                          COALESCE(p.n, 0) AS pitch_count,
+                          COALESCE(t.n, 0) AS active_thinking_calls
+                   FROM loads l
+                   LEFT JOIN (SELECT load_id, COUNT(*) AS n FROM offers
+                              GROUP BY load_id) p ON p.load_id = l.load_id
+                   LEFT JOIN (SELECT load_id, COUNT(*) AS n FROM calls
+                              WHERE outcome = 'carrier_thinking'
+                              GROUP BY load_id) t ON t.load_id = l.load_id
+               ) AS e
+               WHERE e.load_id = loads.load_id
+                 AND (loads.pitch_count IS NOT e.pitch_count
+                      OR loads.active_thinking_calls
+                         IS NOT e.active_thinking_calls)"""
+        )
+        return cur.rowcount
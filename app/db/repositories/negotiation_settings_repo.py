@@ -1,11 +1,47 @@
+"""
+Negotiation settings — cached in-process as an immutable snapshot.
+
+Hot paths (search, offers, booking, load listing) read the snapshot
+without touching the DB. Local writes refresh it immediately; writes
+from other processes are picked up through the `settings_version` row,
+which triggers bump on every change and which is re-checked at most
+once per `_RECHECK_INTERVAL_SECONDS`.
+"""
+
+import sqlite3
+import threading
+import time
+from collections.abc import Mapping
+from dataclasses import dataclass
+from types import MappingProxyType
+
 from app.db.connection import get_db
 
+_RECHECK_INTERVAL_SECONDS = 1.0
 
-def get_all_settings() -> dict[str, float | str]:
-    with get_db() as conn:
-        rows = conn.execute(
-            "SELECT key, value, text_value FROM negotiation_settings"
-        ).fetchall()
+
+@dataclass(frozen=True, slots=True)
+class SettingsSnapshot:
+    """Typed, read-only view of negotiation_settings at one version."""
+
+    version: int
+    target_margin: float
+    min_margin: float
+    max_bump_above_loadboard: float
+    max_negotiation_rounds: int
+    max_offers_per_call: int
+    raw: Mapping[str, float | str]
+
+
+_snapshot: SettingsSnapshot | None = None
+_checked_at = 0.0
+_lock = threading.Lock()
+
+
+def _read_raw(conn: sqlite3.Connection) -> dict[str, float | str]:
+    rows = conn.execute(
+        "SELECT key, value, text_value FROM negotiation_settings"
+    ).fetchall()
     result: dict[str, float | str] = {}
     for r in rows:
         if r["text_value"] is not None:
@@ -15,37 +51,84 @@ def get_all_settings() -> dict[str, float | str]:
     return result
 
 
+def _read_version(conn: sqlite3.Connection) -> int:
+    row = conn.execute(
+        "SELECT version FROM settings_version WHERE id = 1"
+    ).fetchone()
+    return row[0] if row else 0
+
+
+def _build_snapshot(
+    version: int, raw: dict[str, float | str]
+) -> SettingsSnapshot:
+    return SettingsSnapshot(
+        version=version,
+        target_margin=float(raw.get("target_margin", 0.15)),
+        min_margin=float(raw.get("min_margin", 0.05)),
+        max_bump_above_loadboard=float(
+            raw.get("max_bump_above_loadboard", 0.03)
+        ),
+        max_negotiation_rounds=int(raw.get("max_negotiation_rounds", 3)),
+        max_offers_per_call=int(raw.get("max_offers_per_call", 3)),
+        raw=MappingProxyType(raw),
+    )
+
+
+def _reload(force: bool) -> SettingsSnapshot:
+    """Re-read the table if its version moved (or unconditionally)."""
+    global _snapshot, _checked_at
+    with _lock:
+        with get_db() as conn:
+            # One read transaction so version and values match.
+            conn.execute("BEGIN")
+            version = _read_version(conn)
+            if force or _snapshot is None or _snapshot.version != version:
+                _snapshot = _build_snapshot(version, _read_raw(conn))
+        _checked_at = time.monotonic()
+        return _snapshot
+
+
+def get_settings_snapshot() -> SettingsSnapshot:
+    snap = _snapshot
+    if (
+        snap is not None
+        and time.monotonic() - _checked_at < _RECHECK_INTERVAL_SECONDS
+    ):
+        return snap
+    return _reload(force=False)
+
+
+def get_all_settings() -> dict[str, float | str]:
+    return dict(get_settings_snapshot().raw)
+
+
 def get_setting(key: str) -> float | str | None:
+    return get_settings_snapshot().raw.get(key)
+
+
+def _upsert(conn: sqlite3.Connection, key: str, value: float | str):
+    if isinstance(value, str):
+        conn.execute(
+            """INSERT INTO negotiation_settings (key, value, text_value)
+               VALUES (?, NULL, ?)
+               ON CONFLICT(key) DO UPDATE
+               SET text_value=excluded.text_value, value=NULL""",
+            (key, value),
+        )
+    else:
+        conn.execute(
+            """INSERT INTO negotiation_settings (key, value, text_value)
+               VALUES (?, ?, NULL)
+               ON CONFLICT(key) DO UPDATE
+               SET value=excluded.value, text_value=NULL""",
+            (key, value),
+        )
+
+
+def upsert_setting(key: str, value: float | str) -> None:
     with get_db() as conn:
-        row = conn.execute(
-            "SELECT value, text_value FROM negotiation_settings WHERE key=?",
-            (key,),
-        ).fetchone()
-    if row is None:
-        return None
-    if row["text_value"] is not None:
-        return row["text_value"]
-    return row["value"]
-
-
-def upsert_setting(key: str, value: float | str | int) -> None:
-    with get_db() as conn:
-        if isinstance(value, str):
-            conn.execute(
-                """INSERT INTO negotiation_settings (key, value, text_value)
-                   VALUES (?, NULL, ?)
-                   ON CONFLICT(key) DO UPDATE
-                   SET text_value=excluded.text_value, value=NULL""",
-                (key, value),
-            )
-        else:
-            conn.execute(
-                """INSERT INTO negotiation_settings (key, value, text_value)
-                   VALUES (?, ?, NULL)
-                   ON CONFLICT(key) DO UPDATE
-                   SET value=excluded.value, text_value=NULL""",
-                (key, value),
-            )
+        _upsert(conn, key, value)
+    _reload(force=True)
 
 
 def upsert_all(
@@ -53,20 +136,5 @@ def upsert_all(
 ) -> dict[str, float | str]:
     with get_db() as conn:
         for key, value in settings.items():
-            if isinstance(value, str):
-                conn.execute(
-                    """INSERT INTO negotiation_settings (key, value, text_value)
-                       VALUES (?, NULL, ?)
-                       ON CONFLICT(key) DO UPDATE
-                       SET text_value=excluded.text_value, value=NULL""",
-                    (key, value),
-                )
-            else:
-                conn.execute(
-                    """INSERT INTO negotiation_settings (key, value, text_value)
-                       VALUES (?, ?, NULL)
-                       ON CONFLICT(key) DO UPDATE
-                       SET value=excluded.value, text_value=NULL""",
-                    (key, value),
-                )
-    return get_all_settings()
+            _upsert(conn, key, value)
+    return dict(_reload(force=True).raw)
@@ -1,14 +1,16 @@
+import sqlite3
 import uuid
 from datetime import datetime
 
-from app.db.connection import get_db
+from app.db.connection import get_db, use_db
+from app.db.repositories.rollup_repo import add_offer
 
 
-def insert_offer(offer: dict) -> dict:
+def insert_offer(offer: dict, conn: sqlite3.Connection | None = None) -> dict:
     offer["offer_id"] = f"OFF-{uuid.uuid4().hex[:8]}"
     offer["created_at"] = datetime.utcnow().isoformat()
-    with get_db() as conn:
-        conn.execute(
+    with use_db(conn) as db:
+        db.execute(
             """INSERT INTO offers
                (offer_id, call_id, load_id, mc_number,
                 offer_amount, offer_type, round_number,
@@ -37,4 +39,33 @@ def insert_offer(offer: dict) -> dict:
                 offer.get("pickup_changed", False),
             ),
         )
+        add_offer(db, offer["offer_id"])
     return offer
+
+
+def get_opening_ask_history() -> list[tuple]:
+    """
+    One row per historical opening ask (round 1):
+    (carrier_ask, loadboard_rate, booked 0/1, agreed_rate or None).
+    call_id isn't unique in calls or booked_loads, so both are reduced
+    to one row per call rather than joined, which would repeat the ask.
+    """
+    with get_db() as conn:
+        conn.row_factory = None  # plain tuples: this can be ~1M rows
+        return conn.execute(
+            """SELECT o.offer_amount,
+                      o.original_rate,
+                      COALESCE(c.outcome = 'booked', 0),
+                      COALESCE(
+                          (SELECT MAX(bl.agreed_rate) FROM booked_loads bl
+                           WHERE bl.call_id = o.call_id),
+                          c.final_rate
+                      )
+               FROM offers o
+               LEFT JOIN calls c ON c.rowid = (
+                   SELECT MAX(rowid) FROM calls WHERE call_id = o.call_id
+               )
+               WHERE o.round_number = 1
+               AND o.original_rate > 0
+               AND o.offer_amount > 0"""
+        ).fetchall()
@@ -0,0 +1,419 @@
+"""
+Daily rollups of calls and bookings for the dashboard, KPI and
+analytics reads.
+
+`calls_daily` holds one row per (UTC day, outcome, sentiment, equipment,
+negotiated) and `bookings_daily` one per (UTC day, equipment), each with
+the counts and sums those reads aggregate. For analytics, `lanes_daily`
+holds one row per (UTC day, lane) and `booked_rounds_daily` one per
+(UTC day, negotiation rounds) of booked calls. Periods and windows
+start at a date, so `created_at >= since` over the raw rows is
+`day >= since` here, and a period costs a few hundred rollup rows per
+day whatever the call volume.
+
+The repositories fold rows in as they insert them, on the same
+connection: `fold_calls` after a call (and any offers or bookings it
+already has), `add_offer` after an offer, `fold_bookings` after a
+booking. The seed reset folds its rows out (sign=-1) before deleting
+them. Nothing updates those rows in place. The folds are explicit calls
+rather than row triggers so that a bulk import folds each chunk with
+one grouped upsert per table, in the transaction that inserts it,
+instead of one upsert per row. After editing rows by hand, or to repair
+drift:
+
+    python -m app.db.maintenance rebuild-rollups
+"""
+
+import sqlite3
+
+from app.db.connection import use_db
+
+# ── calls_daily ──────────────────────────────────────────────────────────────
+
+_CALL_KEY_COLUMNS = [
+    "day",
+    "outcome",
+    "sentiment",
+    "equipment_type",
+    "negotiated",
+]
+_CALL_VALUE_COLUMNS = [
+    "calls",
+    "offered_calls",
+    "duration_sum",
+    "final_rate_sum",
+    "neg_pct_sum",
+    "neg_pct_count",
+    "rate_diff_sum",
+    "rate_diff_count",
+]
+
+_CALL_KEY = [
+    "substr(c.created_at, 1, 10)",
+    "c.outcome",
+    "c.sentiment",
+    "COALESCE(c.equipment_type, '')",
+    "(COALESCE(c.negotiation_rounds, 0) >= 1)",
+]
+
+
+# Percent change from the opening ask, as the calls KPI defines it
+# (neg_pct) and as the dashboard does (rate_diff: a zero final rate
+# doesn't count).
+def _pct_change(when: str) -> str:
+    return (
+        f"CASE WHEN c.initial_rate > 0 AND c.final_rate {when} "
+        "THEN (c.final_rate - c.initial_rate) * 100.0 / c.initial_rate END"
+    )
+
+
+_NEG_PCT = _pct_change("IS NOT NULL")
+_RATE_DIFF = _pct_change("<> 0")
+
+_CALL_VALUES = [
+    "1",
+    "EXISTS (SELECT 1 FROM offers o WHERE o.call_id = c.call_id)",
+    "COALESCE(c.duration_seconds, 0)",
+    "COALESCE(c.final_rate, 0)",
+    f"COALESCE({_NEG_PCT}, 0)",
+    f"({_NEG_PCT}) IS NOT NULL",
+    f"COALESCE({_RATE_DIFF}, 0)",
+    f"({_RATE_DIFF}) IS NOT NULL",
+]
+
+# ── lanes_daily / booked_rounds_daily ────────────────────────────────────────
+
+_LANE_KEY_COLUMNS = ["day", "lane_origin", "lane_destination"]
+_LANE_VALUE_COLUMNS = ["calls", "bookings", "rate_sum", "rate_count"]
+
+_LANE_KEY = [
+    "substr(c.created_at, 1, 10)",
+    "c.lane_origin",
+    "c.lane_destination",
+]
+_LANE_FILTER = "c.lane_origin <> '' AND c.lane_destination <> ''"
+
+
+# A booked call's rate: its (first) booking's agreed rate, or its own
+# final rate when there is no booking or the agreed rate is zero.
+def _lane_rate(agreed: str) -> str:
+    return (
+        "CASE WHEN c.outcome = 'booked' "
+        f"THEN COALESCE(NULLIF({agreed}, 0), c.final_rate) END"
+    )
+
+
+_LANE_RATE = _lane_rate(
+    "(SELECT b.agreed_rate FROM booked_loads b WHERE b.call_id = c.call_id)"
+)
+
+_LANE_VALUES = [
+    "1",
+    "c.outcome = 'booked'",
+    f"COALESCE({_LANE_RATE}, 0)",
+    f"({_LANE_RATE}) IS NOT NULL",
+]
+
+_ROUNDS_KEY_COLUMNS = ["day", "negotiation_rounds"]
+_ROUNDS_VALUE_COLUMNS = ["calls"]
+_ROUNDS_KEY = [
+    "substr(c.created_at, 1, 10)",
+    "COALESCE(c.negotiation_rounds, 0)",
+]
+
+# ── bookings_daily ───────────────────────────────────────────────────────────
+
+_BOOKING_KEY_COLUMNS = ["day", "equipment_type"]
+_BOOKING_VALUE_COLUMNS = [
+    "bookings",
+    "agreed_sum",
+    "agreed_nz_sum",
+    "agreed_nz_count",
+    "loadboard_sum",
+    "loadboard_count",
+    "margin_sum",
+    "margin_count",
+    "margin_nz_sum",
+    "margin_nz_count",
+    "rounds_sum",
+    "rounds_count",
+]
+
+# Over booked_loads b LEFT JOIN loads l.
+_BOOKING_KEY = [
+    "substr(b.created_at, 1, 10)",
+    "COALESCE(l.equipment_type, '')",
+]
+
+_MARGIN = "(l.loadboard_rate - b.agreed_rate) * 100.0 / l.loadboard_rate"
+
+_BOOKING_VALUES = [
+    "1",
+    "b.agreed_rate",
+    "CASE WHEN b.agreed_rate <> 0 THEN b.agreed_rate ELSE 0 END",
+    "b.agreed_rate <> 0",
+    "CASE WHEN l.loadboard_rate <> 0 THEN l.loadboard_rate ELSE 0 END",
+    "COALESCE(l.loadboard_rate <> 0, 0)",
+    # Bookings KPI margin: any agreed rate. Dashboard: non-zero only.
+    f"CASE WHEN l.loadboard_rate > 0 THEN {_MARGIN} ELSE 0 END",
+    "COALESCE(l.loadboard_rate > 0, 0)",
+    (
+        "CASE WHEN l.loadboard_rate > 0 AND b.agreed_rate <> 0 "
+        f"THEN {_MARGIN} ELSE 0 END"
+    ),
+    "COALESCE(l.loadboard_rate > 0 AND b.agreed_rate <> 0, 0)",
+    (
+        "(SELECT TOTAL(negotiation_rounds) FROM calls "
+        "WHERE call_id = b.call_id)"
+    ),
+    (
+        "(SELECT COUNT(negotiation_rounds) FROM calls "
+        "WHERE call_id = b.call_id)"
+    ),
+]
+
+
+def _table_sql(
+    table: str, keys: list[str], key_types: list[str], values: list[str]
+) -> str:
+    cols = [f"{k} {t} NOT NULL" for k, t in zip(keys, key_types)]
+    cols += [
+        f"{v} {'REAL' if v.endswith('_sum') else 'INTEGER'} NOT NULL"
+        for v in values
+    ]
+    return (
+        f"CREATE TABLE IF NOT EXISTS {table} (\n    "
+        + ",\n    ".join(cols)
+        + f",\n    PRIMARY KEY ({', '.join(keys)})\n);"
+    )
+
+
+ROLLUP_TABLES_SQL = "\n".join(
+    [
+        _table_sql(
+            "calls_daily",
+            _CALL_KEY_COLUMNS,
+            ["TEXT", "TEXT", "TEXT", "TEXT", "INTEGER"],
+            _CALL_VALUE_COLUMNS,
+        ),
+        _table_sql(
+            "bookings_daily",
+            _BOOKING_KEY_COLUMNS,
+            ["TEXT", "TEXT"],
+            _BOOKING_VALUE_COLUMNS,
+        ),
+        _table_sql(
+            "lanes_daily",
+            _LANE_KEY_COLUMNS,
+            ["TEXT", "TEXT", "TEXT"],
+            _LANE_VALUE_COLUMNS,
+        ),
+        _table_sql(
+            "booked_rounds_daily",
+            _ROUNDS_KEY_COLUMNS,
+            ["TEXT", "INTEGER"],
+            _ROUNDS_VALUE_COLUMNS,
+        ),
+    ]
+)
+
+ROLLUP_TABLES = (
+    "calls_daily",
+    "bookings_daily",
+    "lanes_daily",
+    "booked_rounds_daily",
+)
+
+
+def _fold_sql(
+    table: str,
+    key_cols: list[str],
+    value_cols: list[str],
+    key: list[str],
+    values: list[str],
+    source: str,
+    where: str,
+    sign: int,
+) -> str:
+    """Upsert the grouped sums of the `source` rows matching `where`."""
+    sums = [f"{sign} * TOTAL({v})" for v in values]
+    updates = ", ".join(f"{c} = {c} + excluded.{c}" for c in value_cols)
+    return (
+        f"INSERT INTO {table} ({', '.join(key_cols + value_cols)}) "
+        f"SELECT {', '.join(key + sums)} FROM {source} WHERE {where} "
+        f"GROUP BY {', '.join(key)} "
+        f"ON CONFLICT ({', '.join(key_cols)}) DO UPDATE SET {updates}"
+    )
+
+
+def fold_calls(
+    conn: sqlite3.Connection,
+    where: str,
+    params: tuple = (),
+    sign: int = 1,
+) -> None:
+    """
+    Add (sign=1) or take back (sign=-1) the calls matching `where`
+    (over `calls c`), including their rounds on bookings that already
+    reference them. Run it after inserting the calls, or before
+    deleting them and their offers.
+    """
+    conn.execute(
+        _fold_sql(
+            "calls_daily",
+            _CALL_KEY_COLUMNS,
+            _CALL_VALUE_COLUMNS,
+            _CALL_KEY,
+            _CALL_VALUES,
+            "calls c",
+            where,
+            sign,
+        ),
+        params,
+    )
+    conn.execute(
+        _fold_sql(
+            "lanes_daily",
+            _LANE_KEY_COLUMNS,
+            _LANE_VALUE_COLUMNS,
+            _LANE_KEY,
+            _LANE_VALUES,
+            "calls c",
+            f"({where}) AND {_LANE_FILTER}",
+            sign,
+        ),
+        params,
+    )
+    conn.execute(
+        _fold_sql(
+            "booked_rounds_daily",
+            _ROUNDS_KEY_COLUMNS,
+            _ROUNDS_VALUE_COLUMNS,
+            _ROUNDS_KEY,
+            ["1"],
+            "calls c",
+            f"({where}) AND c.outcome = 'booked'",
+            sign,
+        ),
+        params,
+    )
+    booking_key = ", ".join(
+        f"{expr} AS {col}"
+        for expr, col in zip(_BOOKING_KEY, _BOOKING_KEY_COLUMNS)
+    )
+    conn.execute(
+        "UPDATE bookings_daily "
+        "SET rounds_sum = rounds_sum + d.total, "
+        "    rounds_count = rounds_count + d.n "
+        f"FROM (SELECT {booking_key}, "
+        f"        {sign} * TOTAL(c.negotiation_rounds) AS total, "
+        f"        {sign} * COUNT(c.negotiation_rounds) AS n "
+        "      FROM calls c "
+        "      JOIN booked_loads b ON b.call_id = c.call_id "
+        "      LEFT JOIN loads l ON l.load_id = b.load_id "
+        f"     WHERE {where} GROUP BY 1, 2) d "
+        "WHERE (bookings_daily.day, bookings_daily.equipment_type) "
+        "    = (d.day, d.equipment_type)",
+        params,
+    )
+
+
+def add_offer(conn: sqlite3.Connection, offer_id: str) -> None:
+    """
+    Count a just-inserted offer's calls as offered, if it's the first
+    offer for its call_id (offered_calls counts calls with any offer).
+    """
+    call_key = ", ".join(
+        f"{expr} AS {col}" for expr, col in zip(_CALL_KEY, _CALL_KEY_COLUMNS)
+    )
+    target = ", ".join(f"calls_daily.{c}" for c in _CALL_KEY_COLUMNS)
+    derived = ", ".join(f"d.{c}" for c in _CALL_KEY_COLUMNS)
+    conn.execute(
+        "UPDATE calls_daily SET offered_calls = offered_calls + d.n "
+        f"FROM (SELECT {call_key}, COUNT(*) AS n "
+        "      FROM offers o JOIN calls c ON c.call_id = o.call_id "
+        "      WHERE o.offer_id = ? AND NOT EXISTS ("
+        "          SELECT 1 FROM offers x "
+        "          WHERE x.call_id = o.call_id AND x.offer_id <> o.offer_id)"
+        "      GROUP BY 1, 2, 3, 4, 5) d "
+        f"WHERE ({target}) = ({derived})",
+        (offer_id,),
+    )
+
+
+def fold_bookings(
+    conn: sqlite3.Connection,
+    where: str,
+    params: tuple = (),
+    sign: int = 1,
+    shift_lane_rates: bool = True,
+) -> None:
+    """
+    Add (sign=1) or take back (sign=-1) the bookings matching `where`
+    (over `booked_loads b`), including the agreed rate they give the
+    lanes of calls already folded in. Run it after inserting them, or
+    before deleting them.
+    """
+    conn.execute(
+        _fold_sql(
+            "bookings_daily",
+            _BOOKING_KEY_COLUMNS,
+            _BOOKING_VALUE_COLUMNS,
+            _BOOKING_KEY,
+            _BOOKING_VALUES,
+            "booked_loads b LEFT JOIN loads l ON l.load_id = b.load_id",
+            where,
+            sign,
+        ),
+        params,
+    )
+    if not shift_lane_rates:
+        return
+    # A call's lane rate moves from its final rate to the agreed rate
+    # of its first booking; later bookings don't change it.
+    lane_key = ", ".join(
+        f"{expr} AS {col}" for expr, col in zip(_LANE_KEY, _LANE_KEY_COLUMNS)
+    )
+    target = ", ".join(f"lanes_daily.{c}" for c in _LANE_KEY_COLUMNS)
+    derived = ", ".join(f"d.{c}" for c in _LANE_KEY_COLUMNS)
+    booked = _lane_rate("b.agreed_rate")
+    unbooked = _lane_rate("NULL")
+    conn.execute(
+        "UPDATE lanes_daily "
+        "SET rate_sum = rate_sum + d.total, "
+        "    rate_count = rate_count + d.n "
+        f"FROM (SELECT {lane_key}, "
+        f"        {sign} * (TOTAL({booked}) - TOTAL({unbooked})) AS total, "
+        f"        {sign} * (COUNT({booked}) - COUNT({unbooked})) AS n "
+        "      FROM booked_loads b "
+        "      LEFT JOIN loads l ON l.load_id = b.load_id "
+        "      JOIN calls c ON c.call_id = b.call_id "
+        f"     WHERE ({where}) AND {_LANE_FILTER} "
+        "        AND b.rowid = (SELECT MIN(x.rowid) FROM booked_loads x "
+        "                       WHERE x.call_id = b.call_id) "
+        "      GROUP BY 1, 2, 3) d "
+        f"WHERE ({target}) = ({derived})",
+        params,
+    )
+
+
+def rebuild_daily_rollups(
+    conn: sqlite3.Connection | None = None,
+) -> dict[str, int]:
+    """
+    Recompute every rollup table from the raw tables. Returns the
+    number of rows written to each.
+    """
+    with use_db(conn) as db:
+        for table in ROLLUP_TABLES:
+            db.execute(f"DELETE FROM {table}")
+        # Calls first, while there are no booking rows to add rounds
+        # to; the bookings then read their rounds from the calls. The
+        # calls already read their bookings' agreed rates, so the
+        # bookings mustn't shift them again.
+        fold_calls(db, "1")
+        fold_bookings(db, "1", shift_lane_rates=False)
+        return {
+            table: db.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+            for table in ROLLUP_TABLES
+        }
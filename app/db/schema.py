@@ -1,4 +1,17 @@
+import sqlite3
+
+from app.db.compression import compress_text
 from app.db.connection import get_db
+from app.db.repositories.load_repo import (
+    URGENCY_RANK_SQL,
+    recount_load_counters,
+    refresh_urgency,
+)
+from app.db.repositories.rollup_repo import (
+    ROLLUP_TABLES,
+    ROLLUP_TABLES_SQL,
+    rebuild_daily_rollups,
+)
 
 
 def init_db() -> None:
@@ -32,7 +45,10 @@ def init_db() -> None:
                 dimensions TEXT DEFAULT '',
                 status TEXT DEFAULT 'available',
                 booked_at TEXT,
-                created_at TEXT DEFAULT (datetime('now'))
+                created_at TEXT DEFAULT (datetime('now')),
+                pitch_count INTEGER NOT NULL DEFAULT 0,
+                active_thinking_calls INTEGER NOT NULL DEFAULT 0,
+                urgency_rank INTEGER NOT NULL DEFAULT 2
             );
 
             CREATE TABLE IF NOT EXISTS carrier_interactions (
@@ -56,7 +72,9 @@ def init_db() -> None:
                 agreed_pickup_datetime TEXT,
                 offer_id TEXT,
                 call_id TEXT,
-                created_at TEXT NOT NULL
+                created_at TEXT NOT NULL,
+                created_epoch INTEGER
+                    GENERATED ALWAYS AS (unixepoch(created_at)) VIRTUAL
             );
 
             CREATE TABLE IF NOT EXISTS offers (
@@ -84,6 +102,66 @@ def init_db() -> None:
                 text_value TEXT
             );
 
+            -- Bumped on every settings write so other processes can
+            -- tell their cached snapshot is stale.
+            CREATE TABLE IF NOT EXISTS settings_version (
+                id      INTEGER PRIMARY KEY CHECK (id = 1),
+                version INTEGER NOT NULL
+            );
+            INSERT OR IGNORE INTO settings_version (id, version) VALUES (1, 0);
+
+            CREATE TRIGGER IF NOT EXISTS trg_settings_version_ins
+            AFTER INSERT ON negotiation_settings
+            BEGIN
+                UPDATE settings_version SET version = version + 1 WHERE id = 1;
+            END;
+            CREATE TRIGGER IF NOT EXISTS trg_settings_version_upd
+            AFTER UPDATE ON negotiation_settings
+            BEGIN
+                UPDATE settings_version SET version = version + 1 WHERE id = 1;
+            END;
+            CREATE TRIGGER IF NOT EXISTS trg_settings_version_del
+            AFTER DELETE ON negotiation_settings
+            BEGIN
+                UPDATE settings_version SET version = version + 1 WHERE id = 1;
+            END;
+
+            -- Bumped on every loads write (offers reach it through
+            -- the pitch_count triggers) so cached load KPIs can tell
+            -- they are stale.
+            CREATE TABLE IF NOT EXISTS loads_version (
+                id      INTEGER PRIMARY KEY CHECK (id = 1),
+                version INTEGER NOT NULL
+            );
+            INSERT OR IGNORE INTO loads_version (id, version) VALUES (1, 0);
+
+            CREATE TRIGGER IF NOT EXISTS trg_loads_version_ins
+            AFTER INSERT ON loads
+            BEGIN
+                UPDATE loads_version SET version = version + 1 WHERE id = 1;
+            END;
+            CREATE TRIGGER IF NOT EXISTS trg_loads_version_upd
+            AFTER UPDATE ON loads
+            BEGIN
+                UPDATE loads_version SET version = version + 1 WHERE id = 1;
+            END;
+            CREATE TRIGGER IF NOT EXISTS trg_loads_version_del
+            AFTER DELETE ON loads
+            BEGIN
+                UPDATE loads_version SET version = version + 1 WHERE id = 1;
+            END;
+
+            CREATE TABLE IF NOT EXISTS idempotency_keys (
+                scope      TEXT NOT NULL,
+                key        TEXT NOT NULL,
+                request_hash TEXT NOT NULL DEFAULT '',
+                response   TEXT NOT NULL,
+                created_at TEXT NOT NULL,
+                PRIMARY KEY (scope, key)
+            );
+            CREATE INDEX IF NOT EXISTS idx_idempotency_keys_created_at
+                ON idempotency_keys(created_at);
+
             CREATE TABLE IF NOT EXISTS calls (
                 id TEXT PRIMARY KEY,
                 call_id TEXT NOT NULL,
@@ -101,9 +179,228 @@ def init_db() -> None:
                 outcome TEXT NOT NULL,
                 sentiment TEXT NOT NULL,
                 duration_seconds INTEGER,
-                transcript TEXT,
                 summary TEXT,
-                key_points TEXT,
-                created_at TEXT NOT NULL
+                created_at TEXT NOT NULL,
+                created_epoch INTEGER
+                    GENERATED ALWAYS AS (unixepoch(created_at)) VIRTUAL
+            );
+
+            -- zlib-compressed transcript and key_points (JSON), one row
+            -- per call, kept out of calls so list queries never read them.
+            CREATE TABLE IF NOT EXISTS call_transcripts (
+                id         TEXT PRIMARY KEY,
+                transcript BLOB,
+                key_points BLOB
             );
+            -- Keyset pagination seeks on (sort key, id); call_id is
+            -- the join key between calls, bookings and offers.
+            CREATE INDEX IF NOT EXISTS idx_calls_created_at_id
+                ON calls(created_at, id);
+            CREATE INDEX IF NOT EXISTS idx_calls_call_id
+                ON calls(call_id);
+            CREATE INDEX IF NOT EXISTS idx_offers_call_id
+                ON offers(call_id);
+            CREATE INDEX IF NOT EXISTS idx_booked_loads_created_at_id
+                ON booked_loads(created_at, id);
+            CREATE INDEX IF NOT EXISTS idx_booked_loads_call_id
+                ON booked_loads(call_id);
+            CREATE INDEX IF NOT EXISTS idx_loads_pickup_datetime_id
+                ON loads(pickup_datetime, load_id);
+            CREATE INDEX IF NOT EXISTS idx_loads_created_at_id
+                ON loads(created_at, load_id);
+
+            CREATE TRIGGER IF NOT EXISTS trg_calls_transcript_del
+            AFTER DELETE ON calls
+            BEGIN
+                DELETE FROM call_transcripts WHERE id = old.id;
+            END;
         """)
+        _move_transcripts_out_of_calls(conn)
+        _add_load_counters(conn)
+        conn.executescript(_LOAD_COUNTER_TRIGGERS)
+        _add_urgency_rank(conn)
+        conn.executescript(_URGENCY_TRIGGERS)
+        _add_daily_rollups(conn)
+        _add_created_epoch(conn)
+        _add_request_hash(conn)
+
+
+def _columns(conn: sqlite3.Connection, table: str) -> set[str]:
+    # table_xinfo: table_info leaves out generated columns.
+    return {r[1] for r in conn.execute(f"PRAGMA table_xinfo({table})")}
+
+
+def _move_transcripts_out_of_calls(conn: sqlite3.Connection) -> None:
+    """
+    Migrate databases created before call_transcripts existed: compress
+    calls.transcript / calls.key_points into the side table, then drop
+    both columns. Run VACUUM afterwards to reclaim the space.
+    """
+    legacy = {"transcript", "key_points"} & _columns(conn, "calls")
+    if not legacy:
+        return
+    select = ", ".join(
+        col if col in legacy else f"NULL AS {col}"
+        for col in ("transcript", "key_points")
+    )
+    rows = conn.execute(f"SELECT id, {select} FROM calls")
+    conn.executemany(
+        """INSERT OR REPLACE INTO call_transcripts (id, transcript, key_points)
+           VALUES (?,?,?)""",
+        (
+            (r[0], compress_text(r[1]), compress_text(r[2]))
+            for r in rows
+            if r[1] is not None or r[2] is not None
+        ),
+    )
+    for col in sorted(legacy):
+        conn.execute(f"ALTER TABLE calls DROP COLUMN {col}")
+
+
+# loads.pitch_count (offers on the load) and loads.active_thinking_calls
+# (calls on it with outcome carrier_thinking) are kept current here so
+# load listings read them off the row instead of counting per load.
+# `python -m app.db.maintenance recount` repairs them if they drift.
+_LOAD_COUNTER_TRIGGERS = """
+    CREATE TRIGGER IF NOT EXISTS trg_offers_pitch_ins
+    AFTER INSERT ON offers
+    BEGIN
+        UPDATE loads SET pitch_count = pitch_count + 1
+        WHERE load_id = new.load_id;
+    END;
+    CREATE TRIGGER IF NOT EXISTS trg_offers_pitch_del
+    AFTER DELETE ON offers
+    BEGIN
+        UPDATE loads SET pitch_count = pitch_count - 1
+        WHERE load_id = old.load_id;
+    END;
+    CREATE TRIGGER IF NOT EXISTS trg_offers_pitch_upd
+    AFTER UPDATE OF load_id ON offers
+    WHEN old.load_id IS NOT new.load_id
+    BEGIN
+        UPDATE loads SET pitch_count = pitch_count - 1
+        WHERE load_id = old.load_id;
+        UPDATE loads SET pitch_count = pitch_count + 1
+        WHERE load_id = new.load_id;
+    END;
+
+    CREATE TRIGGER IF NOT EXISTS trg_calls_thinking_ins
+    AFTER INSERT ON calls
+    WHEN new.outcome = 'carrier_thinking'
+    BEGIN
+        UPDATE loads SET active_thinking_calls = active_thinking_calls + 1
+        WHERE load_id = new.load_id;
+    END;
+    CREATE TRIGGER IF NOT EXISTS trg_calls_thinking_del
+    AFTER DELETE ON calls
+    WHEN old.outcome = 'carrier_thinking'
+    BEGIN
+        UPDATE loads SET active_thinking_calls = active_thinking_calls - 1
+        WHERE load_id = old.load_id;
+    END;
+    CREATE TRIGGER IF NOT EXISTS trg_calls_thinking_upd
+    AFTER UPDATE OF load_id, outcome ON calls
+    WHEN old.outcome = 'carrier_thinking'
+      OR new.outcome = 'carrier_thinking'
+    BEGIN
+        UPDATE loads SET active_thinking_calls = active_thinking_calls - 1
+        WHERE old.outcome = 'carrier_thinking' AND load_id = old.load_id;
+        UPDATE loads SET active_thinking_calls = active_thinking_calls + 1
+        WHERE new.outcome = 'carrier_thinking' AND load_id = new.load_id;
+    END;
+"""
+
+
+def _add_load_counters(conn: sqlite3.Connection) -> None:
+    """
+    Migrate databases created before the load counter columns existed:
+    add them and fill them from offers/calls. The triggers keep them
+    current from then on.
+    """
+    missing = [
+        col
+        for col in ("pitch_count", "active_thinking_calls")
+        if col not in _columns(conn, "loads")
+    ]
+    if not missing:
+        return
+    for col in missing:
+        conn.execute(
+            f"ALTER TABLE loads ADD COLUMN {col} INTEGER NOT NULL DEFAULT 0"
+        )
+    recount_load_counters(conn=conn)
+
+
+# Urgency is recomputed whenever one of its inputs changes on the row —
+# including pitch_count, so every offer insert re-ranks its load. The
+# days-listed escalation is time-driven and left to refresh_urgency().
+_URGENCY_TRIGGERS = f"""
+    CREATE INDEX IF NOT EXISTS idx_loads_urgency_rank
+        ON loads(urgency_rank, pickup_datetime, load_id);
+
+    CREATE TRIGGER IF NOT EXISTS trg_loads_urgency_ins
+    AFTER INSERT ON loads
+    BEGIN
+        UPDATE loads SET urgency_rank = {URGENCY_RANK_SQL}
+        WHERE load_id = new.load_id;
+    END;
+    CREATE TRIGGER IF NOT EXISTS trg_loads_urgency_upd
+    AFTER UPDATE OF pitch_count, commodity_type, notes, created_at ON loads
+    BEGIN
+        UPDATE loads SET urgency_rank = {URGENCY_RANK_SQL}
+        WHERE load_id = new.load_id;
+    END;
+"""
+
+
+def _add_urgency_rank(conn: sqlite3.Connection) -> None:
+    """Migrate databases created before loads.urgency_rank existed."""
+    if "urgency_rank" in _columns(conn, "loads"):
+        return
+    conn.execute(
+        "ALTER TABLE loads ADD COLUMN urgency_rank INTEGER NOT NULL DEFAULT 2"
+    )
+    refresh_urgency(conn=conn)
+
+
+def _add_daily_rollups(conn: sqlite3.Connection) -> None:
+    """
+    Create the daily rollup tables, filling them all from history when
+    any of them is new (see rollup_repo).
+    """
+    existed = all(_columns(conn, table) for table in ROLLUP_TABLES)
+    conn.executescript(ROLLUP_TABLES_SQL)
+    if not existed:
+        rebuild_daily_rollups(conn=conn)
+
+
+# Time-series buckets group on created_at as unix seconds. The columns
+# are virtual, so they cost nothing on insert beyond the index entries;
+# the indexes cover what the bucket queries read.
+_CREATED_EPOCH_INDEXES = """
+    CREATE INDEX IF NOT EXISTS idx_calls_created_epoch
+        ON calls(created_epoch, outcome, initial_rate, final_rate);
+    CREATE INDEX IF NOT EXISTS idx_booked_loads_created_epoch
+        ON booked_loads(created_epoch, agreed_rate);
+"""
+
+
+def _add_created_epoch(conn: sqlite3.Connection) -> None:
+    """Migrate databases created before the created_epoch columns."""
+    for table in ("calls", "booked_loads"):
+        if "created_epoch" not in _columns(conn, table):
+            conn.execute(
+                f"ALTER TABLE {table} ADD COLUMN created_epoch INTEGER "
+                "GENERATED ALWAYS AS (unixepoch(created_at)) VIRTUAL"
+            )
+    conn.executescript(_CREATED_EPOCH_INDEXES)
+
+
+def _add_request_hash(conn: sqlite3.Connection) -> None:
+    """Migrate databases created before idempotency_keys.request_hash."""
+    if "request_hash" in _columns(conn, "idempotency_keys"):
+        return
+    conn.execute(
+        "ALTER TABLE idempotency_keys "
+        "ADD COLUMN request_hash TEXT NOT NULL DEFAULT ''"
+    )
@@ -4,6 +4,7 @@ from pathlib import Path
 
 from app.db.city_data import CITY_COORDS, get_coords
 from app.db.connection import get_db
+from app.db.repositories.rollup_repo import fold_bookings
 
 LOADS_JSON_PATH = (
     Path(__file__).resolve().parent.parent.parent / "data" / "loads.json"
@@ -138,6 +139,7 @@ def seed_loads() -> None:
             "WHERE status='booked' AND load_id NOT IN "
             "(SELECT load_id FROM booked_loads WHERE id LIKE 'BK-%')"
         )
+        fold_bookings(conn, "b.id LIKE '00000000-0000-4000%'", sign=-1)
         conn.execute(
             "DELETE FROM booked_loads WHERE id LIKE '00000000-0000-4000%'"
         )
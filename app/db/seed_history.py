@@ -14,7 +14,9 @@ import json
 import uuid
 from datetime import datetime, timedelta, timezone
 
+from app.db.compression import compress_text
 from app.db.connection import get_db
+from app.db.repositories.rollup_repo import fold_bookings, fold_calls
 
 # ─── Deterministic UUID generation ────────────────────────────────────────────
 _COUNTER = 0
@@ -2130,8 +2132,9 @@ def _apply_bookings() -> None:
         )
 
     with get_db() as conn:
+        inserted = []
         for r in rows:
-            conn.execute(
+            cur = conn.execute(
                 """INSERT INTO booked_loads
                    (id, load_id, mc_number, carrier_name, agreed_rate,
                     agreed_pickup_datetime, offer_id, call_id, created_at)
@@ -2149,10 +2152,17 @@ def _apply_bookings() -> None:
                     r["created_at"],
                 ),
             )
+            if cur.rowcount:
+                inserted.append(r["id"])
             conn.execute(
                 "UPDATE loads SET status='booked', booked_at=? WHERE load_id=?",
                 (r["booked_at"], r["load_id"]),
             )
+        fold_bookings(
+            conn,
+            "b.id IN (SELECT value FROM json_each(?))",
+            (json.dumps(inserted),),
+        )
 
 
 # ─── Main entry point ─────────────────────────────────────────────────────────
@@ -2175,6 +2185,7 @@ def seed_historical_data() -> None:
     # Wipe only deterministic seed data (IDs start with 00000000-0000-4000),
     # preserving any real calls/offers/interactions created via the API.
     with get_db() as conn:
+        fold_calls(conn, "c.id LIKE '00000000-0000-4000%'", sign=-1)
         conn.execute(
             "DELETE FROM carrier_interactions WHERE id LIKE '00000000-0000-4000%'"
         )
@@ -2195,14 +2206,26 @@ def seed_historical_data() -> None:
                (id, call_id, mc_number, carrier_name, lane_origin, lane_destination,
                 equipment_type, load_id, initial_rate, final_rate, negotiation_rounds,
                 carrier_phone, special_requests, outcome, sentiment, duration_seconds,
-                transcript, summary, key_points, created_at)
+                summary, created_at)
                VALUES
                (:id,:call_id,:mc_number,:carrier_name,:lane_origin,:lane_destination,
                 :equipment_type,:load_id,:initial_rate,:final_rate,:negotiation_rounds,
                 :carrier_phone,:special_requests,:outcome,:sentiment,:duration_seconds,
-                :transcript,:summary,:key_points,:created_at)""",
+                :summary,:created_at)""",
             calls,
         )
+        conn.executemany(
+            """INSERT INTO call_transcripts (id, transcript, key_points)
+               VALUES (?,?,?)""",
+            [
+                (
+                    c["id"],
+                    compress_text(c["transcript"]),
+                    compress_text(c["key_points"]),
+                )
+                for c in calls
+            ],
+        )
         conn.executemany(
             """INSERT INTO offers
                (offer_id, call_id, load_id, mc_number, offer_amount, offer_type,
@@ -2225,6 +2248,7 @@ def seed_historical_data() -> None:
                 :outcome,:load_id,:notes,:created_at)""",
             interactions,
         )
+        fold_calls(conn, "c.id LIKE '00000000-0000-4000%'")
 
     print(
         f"   History   : {len(calls)} calls, {len(offers)} offers, "
@@ -0,0 +1,231 @@
+"""
+Group-commit write queue.
+
+SQLite has a single writer lock, so under load every request committing
+on its own connection mostly waits for that lock and for its own fsync.
+Writes submitted here are handed to one writer thread instead. Each
+batch is whatever queued up while the previous one was committing (up
+to `_MAX_BATCH` items, optionally waiting `_MAX_WAIT_SECONDS` for more)
+and runs in a single transaction, each intent under its own SAVEPOINT
+so that one failing intent is rolled back alone. Each caller's future
+resolves once the batch has committed.
+
+An intent is a callable taking the batch connection, e.g.:
+
+    result = execute(lambda conn: insert_call(call, conn=conn))
+
+When the writer isn't running (CLI tools, seeding, tests) `execute`
+falls back to a plain unit of work on the calling thread.
+"""
+
+import logging
+import queue
+import sqlite3
+import threading
+import time
+from collections.abc import Callable
+from concurrent.futures import Future
+from dataclasses import dataclass
+
+from app.db.connection import _connect, unit_of_work
+
+log = logging.getLogger(__name__)
+
+_MAX_BATCH = 256
+# Batches form on their own while a commit is in flight; a non-zero
+# wait trades per-request latency for larger batches.
+_MAX_WAIT_SECONDS = 0.0
+
+
+@dataclass(slots=True)
+class _Intent:
+    fn: Callable[[sqlite3.Connection], object]
+    future: Future
+
+
+@dataclass(slots=True)
+class WriteQueueMetrics:
+    batches: int = 0
+    intents: int = 0
+    failed_intents: int = 0
+    failed_batches: int = 0
+    last_batch_size: int = 0
+    max_batch_size: int = 0
+    last_commit_ms: float = 0.0
+    max_commit_ms: float = 0.0
+    total_commit_ms: float = 0.0
+
+
+class WriteQueue:
+    def __init__(
+        self,
+        max_batch: int = _MAX_BATCH,
+        max_wait: float = _MAX_WAIT_SECONDS,
+    ):
+        self._max_batch = max_batch
+        self._max_wait = max_wait
+        self._queue: queue.Queue[_Intent | None] = queue.Queue()
+        self._thread: threading.Thread | None = None
+        self._metrics = WriteQueueMetrics()
+        self._metrics_lock = threading.Lock()
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self) -> None:
+        if self.running:
+            return
+        self._thread = threading.Thread(
+            target=self._run, name="write-queue", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Flush what's queued, then stop the writer."""
+        if not self.running:
+            return
+        self._queue.put(None)
+        self._thread.join()
+        self._thread = None
+
+    def submit[T](self, fn: Callable[[sqlite3.Connection], T]) -> Future[T]:
+        future: Future[T] = Future()
+        if not self.running:
+            try:
+                with unit_of_work() as conn:
+                    future.set_result(fn(conn))
+            # Re-raised in the caller by Future.result().
+            except Exception as exc:  # noqa: BLE001
+                future.set_exception(exc)
+            return future
+        self._queue.put(_Intent(fn, future))
+        return future
+
+    def execute[T](self, fn: Callable[[sqlite3.Connection], T]) -> T:
+        """Submit an intent and block until its batch is committed."""
+        return self.submit(fn).result()
+
+    def metrics(self) -> dict:
+        with self._metrics_lock:
+            m = self._metrics
+            return {
+                "running": self.running,
+                "queue_depth": self._queue.qsize(),
+                "batches": m.batches,
+                "intents": m.intents,
+                "failed_intents": m.failed_intents,
+                "failed_batches": m.failed_batches,
+                "avg_batch_size": (
+                    round(m.intents / m.batches, 2) if m.batches else 0.0
+                ),
+                "last_batch_size": m.last_batch_size,
+                "max_batch_size": m.max_batch_size,
+                "avg_commit_ms": (
+                    round(m.total_commit_ms / m.batches, 3)
+                    if m.batches
+                    else 0.0
+                ),
+                "last_commit_ms": round(m.last_commit_ms, 3),
+                "max_commit_ms": round(m.max_commit_ms, 3),
+            }
+
+    # ── writer thread ──────────────────────────────────────────────────
+
+    def _collect(self, first: _Intent) -> tuple[list[_Intent], bool]:
+        """Gather a batch starting at `first`. Returns (batch, stop)."""
+        batch = [first]
+        deadline = time.monotonic() + self._max_wait
+        while len(batch) < self._max_batch:
+            remaining = deadline - time.monotonic()
+            try:
+                if remaining > 0:
+                    item = self._queue.get(timeout=remaining)
+                else:
+                    item = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if item is None:
+                return batch, True
+            batch.append(item)
+        return batch, False
+
+    def _run(self) -> None:
+        conn = _connect()
+        # Savepoints and commits are issued explicitly below.
+        conn.isolation_level = None
+        try:
+            stop = False
+            while not stop:
+                first = self._queue.get()
+                if first is None:
+                    break
+                batch, stop = self._collect(first)
+                self._commit_batch(conn, batch)
+        finally:
+            conn.close()
+
+    def _commit_batch(
+        self, conn: sqlite3.Connection, batch: list[_Intent]
+    ) -> None:
+        started = time.perf_counter()
+        results: list[tuple[_Intent, object, Exception | None]] = []
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            for intent in batch:
+                conn.execute("SAVEPOINT intent")
+                try:
+                    value = intent.fn(conn)
+                # Re-raised in the caller by Future.result().
+                except Exception as exc:  # noqa: BLE001
+                    conn.execute("ROLLBACK TO intent")
+                    conn.execute("RELEASE intent")
+                    results.append((intent, None, exc))
+                else:
+                    conn.execute("RELEASE intent")
+                    results.append((intent, value, None))
+            conn.execute("COMMIT")
+        except Exception as exc:
+            log.exception("Write batch of %d failed", len(batch))
+            if conn.in_transaction:
+                conn.execute("ROLLBACK")
+            for intent in batch:
+                intent.future.set_exception(exc)
+            with self._metrics_lock:
+                self._metrics.failed_batches += 1
+            return
+        except BaseException as exc:
+            # KeyboardInterrupt, SystemExit and the like: undo the batch,
+            # fail its callers and let the writer thread stop with it.
+            if conn.in_transaction:
+                conn.execute("ROLLBACK")
+            for intent in batch:
+                intent.future.set_exception(exc)
+            raise
+
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        failed = 0
+        for intent, value, exc in results:
+            if exc is not None:
+                failed += 1
+                intent.future.set_exception(exc)
+            else:
+                intent.future.set_result(value)
+
+        with self._metrics_lock:
+            m = self._metrics
+            m.batches += 1
+            m.intents += len(batch)
+            m.failed_intents += failed
+            m.last_batch_size = len(batch)
+            m.max_batch_size = max(m.max_batch_size, len(batch))
+            m.last_commit_ms = elapsed_ms
+            m.max_commit_ms = max(m.max_commit_ms, elapsed_ms)
+            m.total_commit_ms += elapsed_ms
+
+
+write_queue = WriteQueue()
+
+
+def execute[T](fn: Callable[[sqlite3.Connection], T]) -> T:
+    return write_queue.execute(fn)
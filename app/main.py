@@ -5,7 +5,9 @@ Built for the Acme Logistics FDE Technical Challenge.
 All /api/* endpoints require header: X-API-Key
 """
 
+import asyncio
 from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
@@ -13,16 +15,25 @@ from app.config import get_settings
 from app.db.schema import init_db
 from app.db.seed import seed_cities, seed_loads, seed_negotiation_settings
 from app.db.seed_history import seed_historical_data
+from app.db.write_queue import write_queue
 from app.routes import (
-    health,
+    analytics,
+    booked_loads,
+    calls,
+    carrier_interactions,
     carriers,
+    dashboard,
+    events,
+    health,
     loads,
+    metrics,
+    negotiation_settings,
     offers,
-    calls,
-    dashboard,
-    analytics,
 )
-from app.routes import carrier_interactions, booked_loads, negotiation_settings
+from app.services.dashboard_service import refresh_dashboard_snapshots
+from app.services.event_service import close_streams_on_exit
+from app.services.lane_stats_service import build_lane_stats_index
+from app.services.load_service import sweep_urgency
 
 
 @asynccontextmanager
@@ -32,12 +43,20 @@ async def lifespan(app: FastAPI):
     seed_loads()
     seed_negotiation_settings()
     seed_historical_data()
+    build_lane_stats_index()
     s = get_settings()
     print(f"✅ {s.app_name} ready")
     print(f"   Brokerage : {s.brokerage_name}")
     print(f"   FMCSA     : {'live' if s.fmcsa_web_key else 'mock mode'}")
     print(f"   Radius    : {s.default_search_radius_miles} mi")
+    write_queue.start()
+    urgency_sweep = asyncio.create_task(sweep_urgency())
+    dashboard_refresh = asyncio.create_task(refresh_dashboard_snapshots())
+    close_streams_on_exit()
     yield
+    dashboard_refresh.cancel()
+    urgency_sweep.cancel()
+    write_queue.stop()
 
 
 app = FastAPI(
@@ -52,6 +71,7 @@ app.add_middleware(
     allow_origins=["*"],
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["ETag", "X-Generated-At"],
 )
 
 app.include_router(health.router)
@@ -64,3 +84,5 @@ app.include_router(booked_loads.router)
 app.include_router(dashboard.router)
 app.include_router(negotiation_settings.router)
 app.include_router(analytics.router)
+app.include_router(metrics.router)
+app.include_router(events.router)
@@ -27,14 +27,19 @@ from app.models.offer import (
     OfferResponse,
     OfferAnalysisRequest,
     OfferAnalysisResponse,
+    OfferBatchAnalysisRequest,
+    OfferBatchAnalysisResponse,
     BookedLoadRequest,
     BookedLoadResponse,
 )
 from app.models.call import (
     CallLogRequest,
+    CallImportRecord,
     CallLogResponse,
     CallDetailResponse,
     CallListResponse,
+    CallBulkError,
+    CallBulkIngestResponse,
 )
 from app.models.dashboard import DashboardMetrics
 
@@ -62,11 +67,16 @@ __all__ = [
     "OfferResponse",
     "OfferAnalysisRequest",
     "OfferAnalysisResponse",
+    "OfferBatchAnalysisRequest",
+    "OfferBatchAnalysisResponse",
     "BookedLoadRequest",
     "BookedLoadResponse",
     "CallLogRequest",
+    "CallImportRecord",
     "CallLogResponse",
     "CallDetailResponse",
     "CallListResponse",
+    "CallBulkError",
+    "CallBulkIngestResponse",
     "DashboardMetrics",
 ]
@@ -30,3 +30,22 @@ class AnalyticsResponse(BaseModel):
     carrier_objections: list[CarrierObjection] = []
     top_lanes: list[TopLane] = []
     equipment_demand_supply: list[EquipmentDemandSupply] = []
+
+
+class RateDistribution(BaseModel):
+    """Rate per mile ($/mi) across a lane's bookings."""
+
+    mean: float
+    stddev: float
+    p10: float
+    p50: float
+    p90: float
+
+
+class LaneRateStats(BaseModel):
+    origin: str
+    destination: str
+    equipment_type: str | None = None  # None: all equipment
+    bookings: int
+    agreed_rate_per_mile: RateDistribution
+    loadboard_rate_per_mile: RateDistribution
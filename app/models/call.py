@@ -1,3 +1,4 @@
+from datetime import datetime
 from typing import Optional, Union
 from pydantic import BaseModel, field_validator
 from app.models.enums import CallOutcome, Sentiment
@@ -32,6 +33,13 @@ class CallLogRequest(BaseModel):
     key_points: Optional[list[str]] = None
 
 
+class CallImportRecord(CallLogRequest):
+    """One NDJSON line of POST /api/calls/bulk."""
+
+    # Original call time for backfills; defaults to ingestion time.
+    created_at: datetime | None = None
+
+
 class CallLogResponse(BaseModel):
     id: str
     call_id: str
@@ -65,11 +73,27 @@ class CallDetailResponse(BaseModel):
 
 class CallListResponse(BaseModel):
     calls: list[CallDetailResponse]
-    total: int
+    total: int | None = None
     page: int
     page_size: int
+    next_cursor: str | None = None
     kpi_total_calls: int = 0
     kpi_booking_rate: float = 0
     kpi_avg_duration: int = 0
     kpi_total_duration: int = 0
     kpi_avg_negotiation_pct: float = 0
+
+
+class CallBulkError(BaseModel):
+    line: int
+    error: str
+
+
+class CallBulkIngestResponse(BaseModel):
+    received: int
+    inserted: int
+    interactions: int
+    failed: int
+    errors: list[CallBulkError]
+    errors_truncated: bool = False
+    elapsed_ms: float
@@ -53,3 +53,16 @@ class DashboardMetrics(BaseModel):
 
     # Rate intelligence
     rate_intelligence: Optional[RateIntelligence] = None
+
+
+class TimeseriesPoint(BaseModel):
+    start: str  # bucket start, UTC
+    # None where the metric is undefined (a rate over no calls)
+    value: int | float | None = None
+
+
+class DashboardTimeseries(BaseModel):
+    metric: str
+    bucket: str
+    period: str
+    points: list[TimeseriesPoint]
@@ -47,3 +47,23 @@ class Sentiment(str, Enum):
     FRUSTRATED = "frustrated"
     AGGRESSIVE = "aggressive"
     CONFUSED = "confused"
+
+
+class TimeseriesMetric(str, Enum):
+    CALLS = "calls"
+    BOOKED = "booked"
+    REVENUE = "revenue"
+    CONVERSION = "conversion"
+    AVG_NEGOTIATION_PCT = "avg_negotiation_pct"
+
+
+class TimeBucket(str, Enum):
+    HOUR = "hour"
+    DAY = "day"
+
+
+class AnalyticsWindow(str, Enum):
+    DAYS_7 = "7d"
+    DAYS_30 = "30d"
+    DAYS_90 = "90d"
+    CUSTOM = "custom"
@@ -193,9 +193,10 @@ class LoadWithStatus(Load):
 
 class LoadListResponse(BaseModel):
     loads: list[LoadWithStatus]
-    total: int
+    total: int | None = None
     page: int
     page_size: int
+    next_cursor: str | None = None
     kpi_total_loads: int = 0
     kpi_critical_count: int = 0
     kpi_avg_rate_per_mile: Optional[float] = None
@@ -1,6 +1,6 @@
 from typing import Optional
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, field_validator
 
 
 class NegotiationSettingsResponse(BaseModel):
@@ -83,3 +83,55 @@ class NegotiationSettingsUpdate(BaseModel):
     agent_tone: Optional[str] = Field(
         None, description="Tone of the AI agent (e.g. professional, friendly)"
     )
+
+
+class NegotiationSimulationRequest(BaseModel):
+    target_margins: list[float] = Field(
+        [0.10, 0.15, 0.20],
+        min_length=1,
+        description="Candidate target margins (e.g. 0.15 = 15%)",
+    )
+    max_bumps_above_loadboard: list[float] = Field(
+        [0.0, 0.03, 0.05],
+        min_length=1,
+        description="Candidate max bumps above loadboard (e.g. 0.03 = 3%)",
+    )
+    rate_reject_multipliers: list[float] = Field(
+        [1.10, 1.20, 1.30],
+        min_length=1,
+        description="Candidate reject lines as a multiple of loadboard",
+    )
+
+    @field_validator(
+        "target_margins",
+        "max_bumps_above_loadboard",
+        "rate_reject_multipliers",
+    )
+    @classmethod
+    def non_negative(cls, v: list[float]) -> list[float]:
+        if any(x < 0 for x in v):
+            raise ValueError("Candidate values must be non-negative")
+        return v
+
+
+class SimulationScenario(BaseModel):
+    target_margin: float
+    max_bump_above_loadboard: float
+    rate_reject_multiplier: float
+    is_current: bool = False
+    accept_pct: float
+    counter_pct: float
+    reject_pct: float
+    expected_bookings: float
+    booking_rate_pct: float
+    avg_margin_pct: float | None = None
+    total_margin: float
+    total_agreed: float
+
+
+class NegotiationSimulationResponse(BaseModel):
+    sample_size: int
+    historical_booking_rate_pct: float | None = None
+    historical_avg_margin_pct: float | None = None
+    elapsed_ms: float
+    scenarios: list[SimulationScenario]
@@ -1,10 +1,11 @@
 from typing import Optional, Union
-from pydantic import BaseModel, field_validator, model_validator
+from pydantic import BaseModel, Field, field_validator, model_validator
 from app.models.enums import OfferType, OfferStatus, Verdict
 
 
-class OfferAnalysisRequest(BaseModel):
-    load_id: str
+class CarrierAsk(BaseModel):
+    """What the carrier is asking for; shared by single and batch analysis."""
+
     asking_rate: Optional[float] = None
     asking_pickup_datetime: Optional[str] = None
     asking_pickup_window_hours: Optional[int] = None
@@ -25,6 +26,18 @@ class OfferAnalysisRequest(BaseModel):
         return self
 
 
+class OfferAnalysisRequest(CarrierAsk):
+    load_id: str
+    call_id: str | None = Field(
+        None,
+        description="Call being negotiated; enables per-call round limits",
+    )
+
+
+class OfferBatchAnalysisRequest(CarrierAsk):
+    load_ids: list[str] = Field(..., min_length=1, max_length=50)
+
+
 class OfferAnalysisResponse(BaseModel):
     load_id: str
     verdict: Verdict
@@ -32,6 +45,13 @@ class OfferAnalysisResponse(BaseModel):
     counter_offers: Optional[list[str]] = None
 
 
+class OfferBatchAnalysisResponse(BaseModel):
+    """Per-load verdicts, best first (accept > counter > reject)."""
+
+    results: list[OfferAnalysisResponse]
+    best_load_id: str | None = None
+
+
 class BookedLoadRequest(BaseModel):
     load_id: str
     mc_number: Union[str, int]
@@ -69,9 +89,10 @@ class BookedLoadResponse(BaseModel):
 
 class PaginatedBookedLoads(BaseModel):
     items: list[BookedLoadResponse]
-    total: int
+    total: int | None = None
     page: int
     page_size: int
+    next_cursor: str | None = None
     kpi_total_bookings: int = 0
     kpi_total_revenue: float = 0
     kpi_avg_margin: Optional[float] = None
@@ -1,7 +1,13 @@
-from fastapi import APIRouter, Security
-from app.models.analytics import AnalyticsResponse
-from app.services.analytics_service import get_analytics
+from datetime import date
+from typing import Annotated
+
+from fastapi import APIRouter, HTTPException, Query, Security
+
+from app.models.analytics import AnalyticsResponse, LaneRateStats
+from app.models.enums import AnalyticsWindow, EquipmentType
 from app.routes._auth import verify_api_key
+from app.services.analytics_service import get_analytics
+from app.services.lane_stats_service import get_lane_rate_stats
 
 router = APIRouter(prefix="/api/analytics", tags=["Analytics"])
 
@@ -11,6 +17,44 @@ router = APIRouter(prefix="/api/analytics", tags=["Analytics"])
     response_model=AnalyticsResponse,
     dependencies=[Security(verify_api_key)],
 )
-async def analytics():
-    """Aggregated analytics for the dashboard."""
-    return get_analytics()
+async def analytics(
+    window: Annotated[
+        AnalyticsWindow | None,
+        Query(description="Default: last 30 days (setting)"),
+    ] = None,
+    start: Annotated[
+        date | None, Query(description="window=custom only")
+    ] = None,
+    end: Annotated[
+        date | None,
+        Query(description="window=custom only; default today (UTC)"),
+    ] = None,
+):
+    """Aggregated analytics for the dashboard over a window of days."""
+    result, error = get_analytics(window, start, end)
+    if error:
+        raise HTTPException(400, error)
+    return result
+
+
+@router.get(
+    "/lanes/{origin}/{destination}",
+    response_model=LaneRateStats,
+    dependencies=[Security(verify_api_key)],
+)
+async def lane_rate_stats(
+    origin: str,
+    destination: str,
+    equipment_type: Annotated[
+        EquipmentType | None, Query(description="Default: all equipment")
+    ] = None,
+):
+    """p10/p50/p90 agreed and loadboard rate per mile on a lane."""
+    result, error = await get_lane_rate_stats(
+        origin,
+        destination,
+        equipment_type.value if equipment_type else None,
+    )
+    if error:
+        raise HTTPException(404, error)
+    return result
@@ -1,34 +1,46 @@
-from fastapi import APIRouter, HTTPException, Query, Security
+from fastapi import APIRouter, Header, HTTPException, Query, Security
 
 from app.models.offer import (
     BookedLoadRequest,
     BookedLoadResponse,
     PaginatedBookedLoads,
 )
+from app.routes._auth import verify_api_key
 from app.services.booked_load_service import (
     book_load,
     get_booking,
     list_bookings,
 )
-from app.routes._auth import verify_api_key
 from app.utils.period import Period
 
 router = APIRouter(prefix="/api/booked-loads", tags=["Booked Loads"])
 
 
+# Plain def: runs in the threadpool while its write waits on the
+# group-commit queue, leaving the event loop free.
 @router.post(
     "",
     response_model=BookedLoadResponse,
     dependencies=[Security(verify_api_key)],
 )
-async def create_booking(req: BookedLoadRequest):
+def create_booking(
+    req: BookedLoadRequest,
+    idempotency_key: str | None = Header(
+        None,
+        alias="Idempotency-Key",
+        description=(
+            "Dedupe key for retried webhooks (defaults to call_id and load_id)"
+        ),
+    ),
+):
     """
     Confirm a load is booked by a carrier. Marks the load as unavailable
     so it won't appear in future searches.
     """
-    result, error = book_load(req)
+    result, error = book_load(req, idempotency_key)
     if error:
-        status = 409 if "already booked" in error else 404
+        conflict = "already booked" in error or "Idempotency key" in error
+        status = 409 if conflict else 404
         raise HTTPException(status, error)
     return result
 
@@ -44,16 +56,28 @@ async def list_all_bookings(
     period: Period = Query(
         Period.last_month, description="Time period filter"
     ),
+    cursor: str | None = Query(
+        None, description="next_cursor of the previous page (overrides page)"
+    ),
+    include_totals: bool | None = Query(
+        None,
+        description="Compute total and KPIs (default: first page only)",
+    ),
 ):
     """List confirmed bookings with pagination."""
     offset = (page - 1) * page_size
-    return list_bookings(
+    result, error = list_bookings(
         offset=offset,
         limit=page_size,
         page=page,
         page_size=page_size,
         period=period.value,
+        cursor=cursor,
+        include_totals=include_totals,
     )
+    if error:
+        raise HTTPException(400, error)
+    return result
 
 
 @router.get(
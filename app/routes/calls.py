@@ -1,28 +1,53 @@
 from typing import Optional
 
-from fastapi import APIRouter, Query, Security
+from fastapi import APIRouter, Header, Query, Request, Security
 
 from app.models.call import (
     CallLogRequest,
     CallLogResponse,
     CallDetailResponse,
     CallListResponse,
+    CallBulkIngestResponse,
 )
 from app.services.call_service import log_call, get_call, list_calls
+from app.services.call_import_service import ingest_calls_ndjson
 from app.routes._auth import verify_api_key
 from app.utils.period import Period
 
 router = APIRouter(prefix="/api/calls", tags=["Calls"])
 
 
+# Plain def: runs in the threadpool while its write waits on the
+# group-commit queue, leaving the event loop free.
 @router.post(
     "",
     response_model=CallLogResponse,
     dependencies=[Security(verify_api_key)],
 )
-async def log_call_route(req: CallLogRequest):
+def log_call_route(
+    req: CallLogRequest,
+    idempotency_key: str | None = Header(
+        None,
+        alias="Idempotency-Key",
+        description="Dedupe key for retried webhooks (defaults to call_id)",
+    ),
+):
     """Log post-call data: extracted info, outcome, sentiment."""
-    return log_call(req)
+    return log_call(req, idempotency_key)
+
+
+@router.post(
+    "/bulk",
+    response_model=CallBulkIngestResponse,
+    dependencies=[Security(verify_api_key)],
+)
+async def bulk_ingest_calls_route(request: Request):
+    """
+    Backfill calls from an NDJSON body (one call per line, same fields
+    as POST /api/calls plus an optional `created_at`). Valid lines are
+    inserted in chunks; invalid ones are reported by line number.
+    """
+    return await ingest_calls_ndjson(request.stream())
 
 
 @router.get(
@@ -43,6 +68,16 @@ async def list_calls_route(
     ),
     page: int = Query(1, ge=1, description="Page number"),
     page_size: int = Query(50, ge=1, le=100, description="Results per page"),
+    include_transcript: bool = Query(
+        False, description="Include transcripts and key points"
+    ),
+    cursor: str | None = Query(
+        None, description="next_cursor of the previous page (overrides page)"
+    ),
+    include_totals: bool | None = Query(
+        None,
+        description="Compute total and KPIs (default: first page only)",
+    ),
 ):
     """List all calls with optional filtering and pagination."""
     return list_calls(
@@ -52,6 +87,9 @@ async def list_calls_route(
         period=period.value,
         page=page,
         page_size=page_size,
+        include_transcript=include_transcript,
+        cursor=cursor,
+        include_totals=include_totals,
     )
 
 
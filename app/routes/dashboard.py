@@ -1,20 +1,68 @@
-from fastapi import APIRouter, Query, Security
-from app.models.dashboard import DashboardMetrics
-from app.services.dashboard_service import get_dashboard_metrics
+from typing import Annotated
+
+from fastapi import APIRouter, Header, Query, Response, Security
+
+from app.models.dashboard import DashboardMetrics, DashboardTimeseries
+from app.models.enums import TimeBucket, TimeseriesMetric
 from app.routes._auth import verify_api_key
+from app.services.dashboard_service import (
+    get_dashboard_snapshot,
+    get_dashboard_timeseries,
+)
 from app.utils.period import Period
 
 router = APIRouter(prefix="/api/dashboard", tags=["Dashboard"])
 
 
+def _etag_matches(if_none_match: str, etag: str) -> bool:
+    tags = {t.strip().removeprefix("W/") for t in if_none_match.split(",")}
+    return "*" in tags or etag in tags
+
+
+# Plain def: runs in the threadpool when a missing snapshot has to be
+# built inline, leaving the event loop free.
 @router.get(
     "/metrics",
     response_model=DashboardMetrics,
     dependencies=[Security(verify_api_key)],
     include_in_schema=True,
+    responses={304: {"description": "Unchanged since If-None-Match"}},
+)
+def dashboard_metrics(
+    period: Annotated[Period, Query()] = Period.last_month,
+    if_none_match: Annotated[str | None, Header()] = None,
+):
+    """
+    Aggregated metrics for the operational dashboard, served from a
+    snapshot rebuilt every few seconds and after writes. `ETag` changes
+    only when the metrics do; `X-Generated-At` is the snapshot's time.
+    """
+    snapshot = get_dashboard_snapshot(period.value)
+    headers = {
+        "ETag": snapshot.etag,
+        "X-Generated-At": snapshot.generated_at,
+        "Cache-Control": "no-cache",
+    }
+    if if_none_match and _etag_matches(if_none_match, snapshot.etag):
+        return Response(status_code=304, headers=headers)
+    return Response(
+        snapshot.body, media_type="application/json", headers=headers
+    )
+
+
+# Plain def: the bucket queries run in the threadpool.
+@router.get(
+    "/timeseries",
+    response_model=DashboardTimeseries,
+    dependencies=[Security(verify_api_key)],
 )
-async def dashboard_metrics(
-    period: Period = Query(Period.last_month),
+def dashboard_timeseries(
+    metric: Annotated[TimeseriesMetric, Query()] = TimeseriesMetric.CALLS,
+    bucket: Annotated[TimeBucket, Query()] = TimeBucket.DAY,
+    period: Annotated[Period, Query()] = Period.last_month,
 ):
-    """Aggregated metrics for the operational dashboard."""
-    return get_dashboard_metrics(period=period.value)
+    """
+    One metric per hour or day (UTC) over the period, oldest first, for
+    charts. Rates are null in buckets without calls.
+    """
+    return get_dashboard_timeseries(metric.value, bucket.value, period.value)
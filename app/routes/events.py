@@ -0,0 +1,30 @@
+from typing import Annotated
+
+from fastapi import APIRouter, Header, Security
+from fastapi.responses import StreamingResponse
+
+from app.routes._auth import verify_api_key
+from app.services.event_service import stream_events
+
+router = APIRouter(prefix="/api/events", tags=["Events"])
+
+
+@router.get(
+    "/stream",
+    response_class=StreamingResponse,
+    dependencies=[Security(verify_api_key)],
+)
+async def event_stream(
+    last_event_id: Annotated[str | None, Header()] = None,
+):
+    """
+    Server-sent events: `call_logged`, `calls_imported`, `offer_created`,
+    `load_booked` and `settings_updated`, each with a `kpi_delta` for the
+    dashboard. Reconnect with `Last-Event-ID` to resume; a `reset` event
+    means events were missed and the dashboard should be refetched.
+    """
+    return StreamingResponse(
+        stream_events(last_event_id),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
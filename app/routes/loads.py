@@ -127,22 +127,34 @@ async def list_loads_route(
     ),
     page: int = Query(1, ge=1, description="Page number"),
     page_size: int = Query(50, ge=1, le=100, description="Results per page"),
+    cursor: str | None = Query(
+        None, description="next_cursor of the previous page (overrides page)"
+    ),
+    include_totals: bool | None = Query(
+        None,
+        description="Compute total and KPIs (default: first page only)",
+    ),
 ):
     """List all loads with optional filtering, sorting, and pagination."""
     # Default to 'available' status; 'all' means no status filter
     effective_status = None if status == "all" else (status or "available")
-    return list_loads(
-        status=effective_status,
-        equipment_type=equipment_type,
-        origin=origin,
-        destination=destination,
-        urgency=urgency,
-        period=period.value,
-        page=page,
-        page_size=page_size,
-        sort_by=sort_by,
-        sort_order=sort_order,
-    )
+    try:
+        return list_loads(
+            status=effective_status,
+            equipment_type=equipment_type,
+            origin=origin,
+            destination=destination,
+            urgency=urgency,
+            period=period.value,
+            page=page,
+            page_size=page_size,
+            sort_by=sort_by,
+            sort_order=sort_order,
+            cursor=cursor,
+            include_totals=include_totals,
+        )
+    except ValueError as e:
+        raise HTTPException(400, str(e))
 
 
 @router.get(
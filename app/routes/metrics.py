@@ -0,0 +1,12 @@
+from fastapi import APIRouter, Security
+
+from app.db.write_queue import write_queue
+from app.routes._auth import verify_api_key
+
+router = APIRouter(prefix="/api/metrics", tags=["Metrics"])
+
+
+@router.get("", dependencies=[Security(verify_api_key)])
+async def get_metrics():
+    """Runtime metrics: write queue depth, batch sizes, commit latency."""
+    return {"write_queue": write_queue.metrics()}
@@ -3,12 +3,16 @@ from fastapi import APIRouter, Security
 from app.models.negotiation_settings import (
     NegotiationSettingsResponse,
     NegotiationSettingsUpdate,
+    NegotiationSimulationRequest,
+    NegotiationSimulationResponse,
 )
 from app.db.repositories.negotiation_settings_repo import (
     get_all_settings,
     upsert_all,
 )
 from app.routes._auth import verify_api_key
+from app.services.event_service import publish_event
+from app.services.simulation_service import simulate
 
 router = APIRouter(
     prefix="/api/settings/negotiation",
@@ -71,5 +75,22 @@ async def update_negotiation_settings(
                 updates[k] = v
     if updates:
         upsert_all(updates)
+        publish_event("settings_updated", {"changed": sorted(updates)})
     raw = get_all_settings()
     return NegotiationSettingsResponse(**_settings_from_db(raw))
+
+
+@router.post(
+    "/simulate",
+    response_model=NegotiationSimulationResponse,
+    dependencies=[Security(verify_api_key)],
+)
+async def simulate_negotiation_settings(
+    body: NegotiationSimulationRequest,
+):
+    """
+    What-if replay of candidate settings over historical opening asks.
+    Returns the verdict mix, expected booking rate and margin for every
+    combination, best total margin first. Nothing is changed.
+    """
+    return simulate(body)
@@ -4,28 +4,39 @@ from app.models.offer import (
     OfferResponse,
     OfferAnalysisRequest,
     OfferAnalysisResponse,
+    OfferBatchAnalysisRequest,
+    OfferBatchAnalysisResponse,
+)
+from app.services.offer_service import (
+    analyze_offer,
+    analyze_offer_batch,
+    create_offer,
+)
+from app.db.repositories.negotiation_settings_repo import (
+    get_settings_snapshot,
 )
-from app.services.offer_service import create_offer, analyze_offer
-from app.db.repositories.negotiation_settings_repo import get_all_settings
 from app.routes._auth import verify_api_key
 
 router = APIRouter(prefix="/api/offers", tags=["Offers"])
 
 
+# Plain def: runs in the threadpool while its write waits on the
+# group-commit queue, leaving the event loop free.
 @router.post(
     "",
     response_model=OfferResponse,
     dependencies=[Security(verify_api_key)],
     include_in_schema=False,
 )
-async def create_offer_route(req: OfferCreateRequest):
+def create_offer_route(req: OfferCreateRequest):
     """Log negotiation offer. Returns rate floor/ceiling for agent."""
-    ns = get_all_settings()
-    target_margin = ns.get("target_margin", 0.15)
-    max_bump = ns.get("max_bump_above_loadboard", 0.03)
+    ns = get_settings_snapshot()
+    target_margin = ns.target_margin
+    max_bump = ns.max_bump_above_loadboard
     response, error = create_offer(req, 1 - target_margin, 1 + max_bump)
     if error:
-        raise HTTPException(404, error)
+        status = 409 if "limit reached" in error else 404
+        raise HTTPException(status, error)
     return response
 
 
@@ -40,11 +51,28 @@ async def analyze_offer_route(req: OfferAnalysisRequest):
     Returns accept, counter (with counter_offers list),
     or reject (with reason).
     """
-    ns = get_all_settings()
-    target_margin = ns.get("target_margin", 0.15)
-    max_bump = ns.get("max_bump_above_loadboard", 0.03)
+    ns = get_settings_snapshot()
+    target_margin = ns.target_margin
+    max_bump = ns.max_bump_above_loadboard
     result, error = analyze_offer(req, 1 - target_margin, 1 + max_bump)
     if error:
         status = 409 if "already booked" in error else 404
         raise HTTPException(status, error)
     return result
+
+
+@router.post(
+    "/analyze/batch",
+    response_model=OfferBatchAnalysisResponse,
+    dependencies=[Security(verify_api_key)],
+)
+async def analyze_offer_batch_route(req: OfferBatchAnalysisRequest):
+    """
+    Analyze one carrier ask against several loads at once.
+    Returns a verdict per load, ranked best first, so the agent can
+    pick the strongest counter in a single round trip.
+    """
+    ns = get_settings_snapshot()
+    target_margin = ns.target_margin
+    max_bump = ns.max_bump_above_loadboard
+    return analyze_offer_batch(req, 1 - target_margin, 1 + max_bump)
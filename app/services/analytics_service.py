@@ -1,16 +1,22 @@
 """
 Analytics service — computes negotiation depth, carrier objections,
-top lanes, and equipment demand/supply from the last 30 days of data.
+top lanes, and equipment demand/supply over a window of calls: the last
+7, 30 or 90 days, or a custom range of days. Without a window it is the
+last `analytics_window_days` (30 by default).
+
+Call figures come from the daily rollups summed over the window's days,
+so a longer window only adds rollup rows; only the demand side of
+equipment (available loads) is read live.
 """
 
-from collections import Counter, defaultdict
+from collections import Counter
+from datetime import UTC, date, datetime, timedelta
 
+from app.config import get_settings
 from app.db.repositories.analytics_repo import (
-    get_all_calls_last_30_days,
+    LaneTotals,
     get_available_loads_by_equipment,
-    get_booked_calls_last_30_days,
-    get_failed_calls_last_30_days,
-    get_recent_calls_by_equipment,
+    get_window_totals,
 )
 from app.models.analytics import (
     AnalyticsResponse,
@@ -19,8 +25,9 @@ from app.models.analytics import (
     NegotiationDepthBucket,
     TopLane,
 )
+from app.models.enums import AnalyticsWindow
 
-# ── Negotiation depth bucket labels ──────────────────────────────────────────
+# ── Negotiation depth ────────────────────────────────────────────────────────
 
 _DEPTH_LABELS = {
     0: "1st offer",
@@ -30,115 +37,69 @@ _DEPTH_LABELS = {
 }
 
 
-def _negotiation_depth() -> list[NegotiationDepthBucket]:
-    """Distribution of how quickly deals close (booked calls, last 30 days)."""
-    booked = get_booked_calls_last_30_days()
-    if not booked:
-        return []
-
-    buckets: Counter[str] = Counter()
-    for call in booked:
-        rounds = call.get("negotiation_rounds", 0) or 0
-        key = min(rounds, 3)
-        buckets[key] += 1
-
+def _negotiation_depth(
+    booked_rounds: dict[int, int],
+) -> list[NegotiationDepthBucket]:
+    """Distribution of how quickly deals close (booked calls)."""
+    buckets: Counter[int] = Counter()
+    for rounds, count in booked_rounds.items():
+        buckets[min(rounds, 3)] += count
     total = sum(buckets.values())
-    result: list[NegotiationDepthBucket] = []
-    for key in sorted(buckets):
-        label = _DEPTH_LABELS.get(key, f"{key} rounds")
-        pct = round(buckets[key] / total * 100)
-        result.append(NegotiationDepthBucket(round=label, pct=pct))
-
-    return result
+    return [
+        NegotiationDepthBucket(
+            round=_DEPTH_LABELS.get(key, f"{key} rounds"),
+            pct=round(buckets[key] / total * 100),
+        )
+        for key in sorted(buckets)
+    ]
 
 
 # ── Carrier objections ───────────────────────────────────────────────────────
 
+_OBJECTION_REASONS = {
+    "negotiation_failed": "Rate too low",
+    "dropped_call": "Call dropped",
+    # Last, so it ranks after a failure reason on a tie.
+    "no_loads_available": "No matching loads",
+}
 
-def _carrier_objections() -> list[CarrierObjection]:
-    """Top reasons carriers decline (failed/dropped calls, last 30 days).
-
-    Also includes no_loads_available calls from all calls in the last 30 days.
-    """
-    failed = get_failed_calls_last_30_days()
-    all_calls = get_all_calls_last_30_days()
-
-    reasons: Counter[str] = Counter()
-
-    for call in failed:
-        outcome = call.get("outcome", "")
-        if outcome == "negotiation_failed":
-            reasons["Rate too low"] += 1
-        elif outcome == "dropped_call":
-            reasons["Call dropped"] += 1
-
-    # Count no_loads_available from all calls
-    for call in all_calls:
-        if call.get("outcome") == "no_loads_available":
-            reasons["No matching loads"] += 1
-
-    if not reasons:
-        return []
 
+def _carrier_objections(outcomes: dict[str, int]) -> list[CarrierObjection]:
+    """Top reasons carriers decline: failed, dropped and no-load calls."""
+    reasons = Counter(
+        {
+            reason: outcomes[outcome]
+            for outcome, reason in _OBJECTION_REASONS.items()
+            if outcomes.get(outcome)
+        }
+    )
     total = sum(reasons.values())
-    result: list[CarrierObjection] = []
-    for reason, count in reasons.most_common():
-        pct = round(count / total * 100)
-        result.append(CarrierObjection(reason=reason, count=count, pct=pct))
-
-    return result
+    return [
+        CarrierObjection(
+            reason=reason, count=count, pct=round(count / total * 100)
+        )
+        for reason, count in reasons.most_common()
+    ]
 
 
 # ── Top lanes ────────────────────────────────────────────────────────────────
 
 
-def _top_lanes() -> list[TopLane]:
-    """Highest volume lanes (last 30 days, top 5)."""
-    all_calls = get_all_calls_last_30_days()
-
-    lane_calls: Counter[str] = Counter()
-    lane_bookings: Counter[str] = Counter()
-    lane_rates: defaultdict[str, list[float]] = defaultdict(list)
-
-    for call in all_calls:
-        origin = call.get("lane_origin")
-        dest = call.get("lane_destination")
-        if not origin or not dest:
-            continue
-
-        lane = f"{origin} \u2192 {dest}"
-        lane_calls[lane] += 1
-
-        if call.get("outcome") == "booked":
-            lane_bookings[lane] += 1
-            # agreed_rate comes from the booked_loads JOIN; fall back to
-            # final_rate on the call itself when the JOIN doesn't match.
-            agreed = call.get("agreed_rate") or call.get("final_rate")
-            if agreed is not None:
-                lane_rates[lane].append(float(agreed))
-
-    if not lane_calls:
-        return []
-
+def _top_lanes(lanes: list[LaneTotals]) -> list[TopLane]:
+    """Highest volume lanes, busiest first (the repo picks the top 5)."""
     result: list[TopLane] = []
-    for lane, calls_count in lane_calls.most_common(5):
-        bookings = lane_bookings.get(lane, 0)
-        rates = lane_rates.get(lane, [])
-        if rates:
-            avg = sum(rates) / len(rates)
-            avg_rate = f"${avg:,.0f}"
-        else:
-            avg_rate = "$0"
-
+    for lane in lanes:
+        # Booked calls' agreed rate, or their final rate without one.
+        n = lane.rate_count
+        avg_rate = f"${lane.rate_sum / n:,.0f}" if n else "$0"
         result.append(
             TopLane(
-                lane=lane,
-                calls=calls_count,
-                bookings=bookings,
+                lane=f"{lane.lane_origin} \u2192 {lane.lane_destination}",
+                calls=lane.calls,
+                bookings=lane.bookings,
                 avg_rate=avg_rate,
             )
         )
-
     return result
 
 
@@ -157,42 +118,80 @@ def _format_equip(raw: str) -> str:
     return _EQUIP_LABELS.get(raw, raw.replace("_", " ").title())
 
 
-def _equipment_demand_supply() -> list[EquipmentDemandSupply]:
-    """Equipment type balance: demand (available loads) vs supply (recent calls)."""
+def _equipment_demand_supply(
+    supply_raw: dict[str, int],
+) -> list[EquipmentDemandSupply]:
+    """Demand (available loads) vs supply (calls), by demand descending."""
     demand_raw = get_available_loads_by_equipment()
-    supply_raw = get_recent_calls_by_equipment()
 
     all_types = sorted(set(demand_raw) | set(supply_raw))
-    if not all_types:
-        return []
-
     demand_total = sum(demand_raw.values()) or 1
     supply_total = sum(supply_raw.values()) or 1
 
-    result: list[EquipmentDemandSupply] = []
-    for eq in all_types:
-        demand_pct = round(demand_raw.get(eq, 0) / demand_total * 100)
-        supply_pct = round(supply_raw.get(eq, 0) / supply_total * 100)
-        result.append(
-            EquipmentDemandSupply(
-                type=_format_equip(eq),
-                demand=demand_pct,
-                supply=supply_pct,
-            )
+    result = [
+        EquipmentDemandSupply(
+            type=_format_equip(eq),
+            demand=round(demand_raw.get(eq, 0) / demand_total * 100),
+            supply=round(supply_raw.get(eq, 0) / supply_total * 100),
         )
-
-    # Sort by demand descending for readability
+        for eq in all_types
+    ]
     result.sort(key=lambda x: x.demand, reverse=True)
     return result
 
 
 # ── Public entry point ───────────────────────────────────────────────────────
 
+_WINDOW_DAYS = {
+    AnalyticsWindow.DAYS_7: 7,
+    AnalyticsWindow.DAYS_30: 30,
+    AnalyticsWindow.DAYS_90: 90,
+}
+
 
-def get_analytics() -> AnalyticsResponse:
-    return AnalyticsResponse(
-        negotiation_depth=_negotiation_depth(),
-        carrier_objections=_carrier_objections(),
-        top_lanes=_top_lanes(),
-        equipment_demand_supply=_equipment_demand_supply(),
+def _window_days(
+    window: AnalyticsWindow | None,
+    start: date | None,
+    end: date | None,
+) -> tuple[tuple[date, date], None] | tuple[None, str]:
+    """The window as an inclusive range of UTC days."""
+    now = datetime.now(UTC)
+    if window != AnalyticsWindow.CUSTOM:
+        if start is not None or end is not None:
+            return None, "start and end apply only to window=custom"
+        days = (
+            _WINDOW_DAYS[window]
+            if window is not None
+            else get_settings().analytics_window_days
+        )
+        # Calls from `days` days ago to now; a day rollup is kept for
+        # the whole of that first day.
+        return ((now - timedelta(days=days)).date(), now.date()), None
+    if start is None:
+        return None, "window=custom requires start"
+    end = end or now.date()
+    if start > end:
+        return None, "start must not be after end"
+    return (start, end), None
+
+
+def get_analytics(
+    window: AnalyticsWindow | None = None,
+    start: date | None = None,
+    end: date | None = None,
+) -> tuple[AnalyticsResponse, None] | tuple[None, str]:
+    """Analytics over a window (default: the last analytics_window_days)."""
+    days, error = _window_days(window, start, end)
+    if error:
+        return None, error
+    since, until = days
+    totals = get_window_totals(since.isoformat(), until.isoformat())
+    return (
+        AnalyticsResponse(
+            negotiation_depth=_negotiation_depth(totals.booked_rounds),
+            carrier_objections=_carrier_objections(totals.outcomes),
+            top_lanes=_top_lanes(totals.top_lanes),
+            equipment_demand_supply=_equipment_demand_supply(totals.equipment),
+        ),
+        None,
     )
@@ -1,18 +1,35 @@
+import sqlite3
 import uuid
 
+from app.db.repositories.booked_load_repo import (
+    get_all_booked_loads,
+    get_booked_load,
+    get_booked_loads_kpis,
+    insert_booked_load,
+)
+from app.db.repositories.load_repo import get_load_by_id
+from app.db.repositories.negotiation_settings_repo import (
+    get_settings_snapshot,
+)
+from app.db.write_queue import execute
 from app.models.offer import (
     BookedLoadRequest,
     BookedLoadResponse,
     PaginatedBookedLoads,
 )
-from app.db.repositories.load_repo import get_load_by_id
-from app.db.repositories.booked_load_repo import (
-    insert_booked_load,
-    get_booked_load,
-    get_all_booked_loads,
-    get_booked_loads_kpis,
+from app.services.dashboard_service import mark_dashboard_stale
+from app.services.event_service import publish_event
+from app.services.idempotency_service import (
+    claim,
+    get_replay,
+    release,
+    remember,
+    request_hash,
+)
+from app.services.lane_stats_service import record_booking
+from app.services.negotiation_session_service import (
+    mark_load_booked_in_sessions,
 )
-from app.db.repositories.negotiation_settings_repo import get_all_settings
 from app.utils.fmcsa import ensure_mc_prefix
 from app.utils.period import period_since
 
@@ -33,20 +50,30 @@ def _enrich_booking(record: dict) -> BookedLoadResponse:
 
 def book_load(
     req: BookedLoadRequest,
+    idempotency_key: str | None = None,
 ) -> tuple[BookedLoadResponse, None] | tuple[None, str]:
+    # Without a key, a call may book each load once: a retry of the same
+    # booking replays, booking another load on the call goes ahead.
+    key = idempotency_key or f"{req.call_id}:{req.load_id}"
+    fingerprint = request_hash(req)
+    replay, conflict = get_replay(
+        "booked_loads", key, fingerprint, BookedLoadResponse
+    )
+    if conflict:
+        return None, conflict
+    if replay is not None:
+        return replay, None
+
     load = get_load_by_id(req.load_id)
     if not load:
         return None, f"Load {req.load_id} not found"
     if load.get("status") == "booked":
         return None, f"Load {req.load_id} is already booked"
 
-    ns = get_all_settings()
-    target_margin = ns.get("target_margin", 0.15)
+    target_margin = get_settings_snapshot().target_margin
     floor_rate = round(load["loadboard_rate"] * (1 - target_margin), 2)
     agreed_rate = (
-        req.agreed_rate
-        if req.agreed_rate is not None
-        else floor_rate
+        req.agreed_rate if req.agreed_rate is not None else floor_rate
     )
     agreed_pickup_datetime = (
         req.agreed_pickup_datetime
@@ -54,18 +81,55 @@ def book_load(
         else load["pickup_datetime"]
     )
 
-    record = insert_booked_load(
+    # Claim, booking row and idempotency record share one commit,
+    # grouped with other requests' writes by the write queue.
+    def _write(
+        conn: sqlite3.Connection,
+    ) -> tuple[BookedLoadResponse | None, str | None, bool]:
+        """(response, error, replayed)"""
+        stored, conflict = claim(
+            "booked_loads", key, fingerprint, BookedLoadResponse, conn
+        )
+        if stored is not None or conflict:
+            # A concurrent retry got here first.
+            return stored, conflict, True
+        record = insert_booked_load(
+            {
+                "load_id": req.load_id,
+                "mc_number": ensure_mc_prefix(req.mc_number),
+                "carrier_name": req.carrier_name,
+                "agreed_rate": agreed_rate,
+                "agreed_pickup_datetime": agreed_pickup_datetime,
+                "offer_id": f"OF-{uuid.uuid4().hex[:8]}",
+                "call_id": req.call_id,
+            },
+            conn=conn,
+        )
+        if record is None:
+            release("booked_loads", key, conn)
+            return None, f"Load {req.load_id} is already booked", False
+        response = BookedLoadResponse(**record)
+        remember("booked_loads", key, response, conn=conn)
+        return response, None, False
+
+    response, error, replayed = execute(_write)
+    if error or replayed:
+        return response, error
+    mark_load_booked_in_sessions(req.load_id)
+    record_booking(load, response.agreed_rate)
+    mark_dashboard_stale()
+    publish_event(
+        "load_booked",
         {
-            "load_id": req.load_id,
-            "mc_number": ensure_mc_prefix(req.mc_number),
-            "carrier_name": req.carrier_name,
-            "agreed_rate": agreed_rate,
-            "agreed_pickup_datetime": agreed_pickup_datetime,
-            "offer_id": f"OF-{uuid.uuid4().hex[:8]}",
-            "call_id": req.call_id,
-        }
+            "id": response.id,
+            "load_id": response.load_id,
+            "call_id": response.call_id,
+            "agreed_rate": response.agreed_rate,
+            "created_at": response.created_at,
+        },
+        {"revenue_today": response.agreed_rate},
     )
-    return BookedLoadResponse(**record), None
+    return response, None
 
 
 def get_booking(
@@ -81,14 +145,28 @@ def list_bookings(
     page: int = 1,
     page_size: int = 20,
     period: str = "last_month",
-) -> PaginatedBookedLoads:
+    cursor: str | None = None,
+    include_totals: bool | None = None,
+) -> tuple[PaginatedBookedLoads, None] | tuple[None, str]:
     since = period_since(period)
-    rows, total = get_all_booked_loads(offset=offset, limit=limit, since=since)
-    kpis = get_booked_loads_kpis(since)
+    if include_totals is None:
+        include_totals = cursor is None
+    try:
+        rows, total, next_cursor = get_all_booked_loads(
+            offset=offset,
+            limit=limit,
+            since=since,
+            cursor=cursor,
+            include_total=include_totals,
+        )
+    except ValueError as e:
+        return None, str(e)
+    kpis = get_booked_loads_kpis(since) if include_totals else {}
     return PaginatedBookedLoads(
         items=[_enrich_booking(r) for r in rows],
         total=total,
         page=page,
         page_size=page_size,
+        next_cursor=next_cursor,
         **kpis,
-    )
+    ), None
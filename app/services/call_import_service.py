@@ -0,0 +1,159 @@
+"""
+Bulk call ingestion for backfills (POST /api/calls/bulk).
+
+The body is NDJSON, one `CallImportRecord` per line, read as a stream.
+Valid lines are buffered and written `_CHUNK_SIZE` at a time: calls and
+their carrier interactions go in with `executemany`, in one transaction
+per chunk through the write queue. Invalid lines are skipped and
+reported by line number; a chunk that fails to write reports each of
+its lines. Unlike POST /api/calls there is no idempotency check and no
+read-back.
+"""
+
+import asyncio
+import sqlite3
+import time
+from collections.abc import AsyncIterator
+from datetime import UTC
+
+from pydantic import ValidationError
+
+from app.db.repositories.call_repo import insert_calls
+from app.db.repositories.carrier_repo import insert_interactions
+from app.db.write_queue import execute
+from app.models.call import (
+    CallBulkError,
+    CallBulkIngestResponse,
+    CallImportRecord,
+)
+from app.services.dashboard_service import (
+    invalidate_timeseries,
+    mark_dashboard_stale,
+)
+from app.services.event_service import publish_event
+from app.utils.fmcsa import ensure_mc_prefix
+
+_CHUNK_SIZE = 5000
+_MAX_REPORTED_ERRORS = 1000
+
+
+def _validation_message(exc: ValidationError) -> str:
+    errors = exc.errors()
+    first = errors[0]
+    loc = ".".join(str(p) for p in first["loc"])
+    msg = f"{loc}: {first['msg']}" if loc else first["msg"]
+    if len(errors) > 1:
+        msg += f" (+{len(errors) - 1} more)"
+    return msg
+
+
+class _CallImport:
+    def __init__(self) -> None:
+        self.received = 0
+        self.inserted = 0
+        self.interactions = 0
+        self.failed = 0
+        self.errors: list[CallBulkError] = []
+        self._pending: list[tuple[int, dict]] = []
+
+    def _error(self, line: int, message: str) -> None:
+        self.failed += 1
+        if len(self.errors) < _MAX_REPORTED_ERRORS:
+            self.errors.append(CallBulkError(line=line, error=message))
+
+    def add(self, line_no: int, raw: bytes) -> bool:
+        """Validate one line. Returns True once a chunk is ready."""
+        self.received += 1
+        try:
+            rec = CallImportRecord.model_validate_json(raw)
+        except ValidationError as exc:
+            self._error(line_no, _validation_message(exc))
+            return False
+        call = rec.model_dump()
+        call["outcome"] = rec.outcome.value
+        call["sentiment"] = rec.sentiment.value
+        if call["mc_number"]:
+            call["mc_number"] = ensure_mc_prefix(call["mc_number"])
+        if rec.created_at is not None:
+            # Stored as naive UTC text like every other created_at; the
+            # rollups and filters compare it as a string.
+            created_at = rec.created_at
+            if created_at.tzinfo is not None:
+                created_at = created_at.astimezone(UTC).replace(tzinfo=None)
+            call["created_at"] = created_at.isoformat()
+        self._pending.append((line_no, call))
+        return len(self._pending) >= _CHUNK_SIZE
+
+    def flush(self) -> None:
+        if not self._pending:
+            return
+        chunk, self._pending = self._pending, []
+        calls = [call for _, call in chunk]
+
+        def _write(conn: sqlite3.Connection) -> tuple[int, int]:
+            inserted = insert_calls(calls, conn=conn)
+            # Cascade, as in log_call: one interaction per carrier call.
+            interactions = [
+                {
+                    "mc_number": call["mc_number"],
+                    "carrier_name": call["carrier_name"],
+                    "call_id": call["call_id"],
+                    "call_length_seconds": call["duration_seconds"] or 0,
+                    "outcome": call["outcome"],
+                    "load_id": call["load_id"],
+                    "notes": "",
+                    "created_at": call["created_at"],
+                }
+                for call in calls
+                if call["mc_number"]
+            ]
+            return inserted, insert_interactions(interactions, conn=conn)
+
+        try:
+            inserted, interactions = execute(_write)
+        except sqlite3.Error as exc:
+            for line_no, _ in chunk:
+                self._error(line_no, f"write failed: {exc}")
+            return
+        self.inserted += inserted
+        self.interactions += interactions
+        # Backfilled rows can land in closed buckets.
+        invalidate_timeseries()
+        mark_dashboard_stale()
+        publish_event("calls_imported", {"inserted": inserted})
+
+
+async def _lines(stream: AsyncIterator[bytes]) -> AsyncIterator[bytes]:
+    """Split a byte stream on newlines, yielding each line (may be blank)."""
+    buffer = b""
+    async for chunk in stream:
+        buffer += chunk
+        *lines, buffer = buffer.split(b"\n")
+        for line in lines:
+            yield line
+    if buffer:
+        yield buffer
+
+
+async def ingest_calls_ndjson(
+    stream: AsyncIterator[bytes],
+) -> CallBulkIngestResponse:
+    started = time.perf_counter()
+    job = _CallImport()
+    line_no = 0
+    async for raw in _lines(stream):
+        line_no += 1
+        if not raw.strip():
+            continue
+        if job.add(line_no, raw):
+            await asyncio.to_thread(job.flush)
+    await asyncio.to_thread(job.flush)
+    return CallBulkIngestResponse(
+        received=job.received,
+        inserted=job.inserted,
+        interactions=job.interactions,
+        failed=job.failed,
+        errors=job.errors,
+        errors_truncated=job.failed > len(job.errors),
+        elapsed_ms=round((time.perf_counter() - started) * 1000, 1),
+    )
@@ -1,8 +1,11 @@
 import logging
+import sqlite3
 from typing import Optional
 
 from fastapi import HTTPException
 
+from app.config import get_settings
+from app.db.write_queue import execute
 from app.models.call import (
     CallLogRequest,
     CallLogResponse,
@@ -17,56 +20,136 @@ from app.db.repositories.call_repo import (
 )
 from app.utils.period import period_since
 from app.db.repositories.carrier_repo import insert_interaction
+from app.services.dashboard_service import mark_dashboard_stale
+from app.services.event_service import publish_event
+from app.services.idempotency_service import (
+    claim,
+    get_replay,
+    remember,
+    request_hash,
+)
+from app.services.negotiation_session_service import end_session
 from app.utils.fmcsa import ensure_mc_prefix
 
 log = logging.getLogger(__name__)
 
 
-def log_call(req: CallLogRequest) -> CallLogResponse:
-    log.info("POST /api/calls received: call_id=%s outcome=%s load_id=%s",
-             req.call_id, req.outcome.value, req.load_id)
+def log_call(
+    req: CallLogRequest, idempotency_key: str | None = None
+) -> CallLogResponse:
+    log.info(
+        "POST /api/calls received: call_id=%s outcome=%s load_id=%s",
+        req.call_id,
+        req.outcome.value,
+        req.load_id,
+    )
+
+    # Without a key, a call is logged once per call_id; a different
+    # body for the same call_id is refused rather than replayed.
+    key = idempotency_key or req.call_id
+    fingerprint = request_hash(req)
+    replay, conflict = get_replay("calls", key, fingerprint, CallLogResponse)
+    if conflict:
+        raise HTTPException(status_code=409, detail=conflict)
+    if replay is not None:
+        log.info(
+            "Replaying stored response: call_id=%s key=%s", req.call_id, key
+        )
+        return replay
 
     call_data = req.model_dump()
     call_data["outcome"] = req.outcome.value
     call_data["sentiment"] = req.sentiment.value
     if call_data.get("mc_number"):
         call_data["mc_number"] = ensure_mc_prefix(str(call_data["mc_number"]))
-    result = insert_call(call_data)
-
-    log.info("Call inserted: id=%s call_id=%s created_at=%s",
-             result["id"], result["call_id"], result["created_at"])
-
-    # Cascade: create carrier interaction record
-    if req.mc_number:
-        insert_interaction(
-            {
-                "mc_number": ensure_mc_prefix(str(req.mc_number)),
-                "carrier_name": req.carrier_name,
-                "call_id": result["call_id"],
-                "call_length_seconds": req.duration_seconds or 0,
-                "outcome": result["outcome"],
-                "load_id": req.load_id,
-                "notes": "",
-            }
+
+    # Call, interaction and idempotency record share one commit,
+    # grouped with other requests' writes by the write queue.
+    def _write(
+        conn: sqlite3.Connection,
+    ) -> tuple[CallLogResponse | None, str | None, bool]:
+        """(response, conflict, replayed)"""
+        stored, conflict = claim(
+            "calls", key, fingerprint, CallLogResponse, conn
         )
+        if stored is not None or conflict:
+            # A concurrent retry got here first.
+            return stored, conflict, True
+        result = insert_call(call_data, conn=conn)
 
-    # Verify the call is readable from DB
-    verify = get_call_by_call_id(result["call_id"])
-    if verify:
-        log.info("DB verify OK: call_id=%s is in DB", result["call_id"])
-    else:
-        log.error("DB verify FAILED: call_id=%s NOT found after insert!", result["call_id"])
+        # Cascade: create carrier interaction record
+        if req.mc_number:
+            insert_interaction(
+                {
+                    "mc_number": ensure_mc_prefix(str(req.mc_number)),
+                    "carrier_name": req.carrier_name,
+                    "call_id": result["call_id"],
+                    "call_length_seconds": req.duration_seconds or 0,
+                    "outcome": result["outcome"],
+                    "load_id": req.load_id,
+                    "notes": "",
+                },
+                conn=conn,
+            )
+
+        response = CallLogResponse(
+            id=result["id"],
+            call_id=result["call_id"],
+            outcome=result["outcome"],
+            sentiment=result["sentiment"],
+            created_at=result["created_at"],
+        )
+        remember("calls", key, response, conn=conn)
+        return response, None, False
+
+    response, conflict, replayed = execute(_write)
+    if conflict:
+        raise HTTPException(status_code=409, detail=conflict)
+    if replayed:
+        log.info(
+            "Replaying stored response: call_id=%s key=%s", req.call_id, key
+        )
+        return response
+    mark_dashboard_stale()
+    publish_event(
+        "call_logged",
+        {
+            "call_id": response.call_id,
+            "outcome": response.outcome,
+            "sentiment": response.sentiment,
+            "created_at": response.created_at,
+        },
+        {
+            "calls_today": 1,
+            "booked_today": int(response.outcome == "booked"),
+            "pending_transfer": int(response.outcome == "transferred_to_ops"),
+        },
+    )
+
+    log.info(
+        "Call inserted: id=%s call_id=%s created_at=%s",
+        response.id,
+        response.call_id,
+        response.created_at,
+    )
+
+    if get_settings().debug_verify_writes:
+        verify = get_call_by_call_id(response.call_id)
+        if verify:
+            log.info("DB verify OK: call_id=%s is in DB", response.call_id)
+        else:
+            log.error(
+                "DB verify FAILED: call_id=%s NOT found after insert!",
+                response.call_id,
+            )
+
+    # The call is over: drop its negotiation session.
+    end_session(req.call_id)
 
     # Booking is handled separately via POST /api/booked-loads
     # (triggered by the HappyRobot platform after the call)
 
-    return CallLogResponse(
-        id=result["id"],
-        call_id=result["call_id"],
-        outcome=result["outcome"],
-        sentiment=result["sentiment"],
-        created_at=result["created_at"],
-    )
+    return response
 
 
 def get_call(call_id: str) -> CallDetailResponse:
@@ -85,21 +168,37 @@ def list_calls(
     period: str = "last_month",
     page: int = 1,
     page_size: int = 50,
+    include_transcript: bool = False,
+    cursor: str | None = None,
+    include_totals: bool | None = None,
 ) -> CallListResponse:
+    """
+    Totals and KPIs are full scans of the period, so by default they're
+    only computed for the first page; cursor pages skip them.
+    """
     since = period_since(period)
-    rows, total = get_all_calls(
-        outcome=outcome,
-        sentiment=sentiment,
-        mc_number=mc_number,
-        since=since,
-        page=page,
-        page_size=page_size,
-    )
-    kpis = get_calls_kpis(since)
+    if include_totals is None:
+        include_totals = cursor is None
+    try:
+        rows, total, next_cursor = get_all_calls(
+            outcome=outcome,
+            sentiment=sentiment,
+            mc_number=mc_number,
+            since=since,
+            page=page,
+            page_size=page_size,
+            include_transcript=include_transcript,
+            cursor=cursor,
+            include_total=include_totals,
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    kpis = get_calls_kpis(since) if include_totals else {}
     return CallListResponse(
         calls=[CallDetailResponse(**r) for r in rows],
         total=total,
         page=page,
         page_size=page_size,
+        next_cursor=next_cursor,
         **kpis,
     )
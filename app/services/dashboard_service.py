@@ -1,15 +1,36 @@
-from datetime import date, timedelta
+import asyncio
+import hashlib
+import logging
+import threading
+import time
+from dataclasses import dataclass
+from datetime import UTC, datetime, timedelta
+from typing import NamedTuple
+
+from app.config import get_settings
 from app.db.repositories.dashboard_repo import (
-    get_calls_since,
-    get_bookings_with_loads_since,
-    get_offers_for_calls,
+    BookingSummary,
+    CallBucket,
+    CallGroup,
+    RecentCallRow,
+    get_booking_summaries,
+    get_call_buckets,
+    get_call_groups,
+    get_first_epoch,
+    get_recent_calls,
+    get_revenue_buckets,
 )
 from app.models.dashboard import (
     DashboardMetrics,
+    DashboardTimeseries,
     FunnelStage,
     RateIntelligence,
     RecentCall,
+    TimeseriesPoint,
 )
+from app.utils.period import Period, period_since, utc_today
+
+log = logging.getLogger(__name__)
 
 
 # ── Period helpers ───────────────────────────────────────────────────────────
@@ -27,7 +48,7 @@ def _period_range(period: str) -> tuple[str | None, str | None]:
     days = _PERIOD_DAYS.get(period)
     if days is None:
         return None, None  # all_time: no filter, no trend
-    today = date.today()
+    today = utc_today()
     if period == "today":
         current_since = today.isoformat()
         previous_since = (today - timedelta(days=1)).isoformat()
@@ -37,11 +58,6 @@ def _period_range(period: str) -> tuple[str | None, str | None]:
     return current_since, previous_since
 
 
-def _filter_before(rows: list[dict], cutoff: str) -> list[dict]:
-    """Keep rows with created_at < cutoff."""
-    return [r for r in rows if r.get("created_at", "") < cutoff]
-
-
 # ── Trend helpers ────────────────────────────────────────────────────────────
 
 
@@ -66,10 +82,10 @@ def _compute_conversion_trend(current: float, previous: float) -> str | None:
 _FUNNEL_STAGE_NAMES = [
     "Inbound Calls",  # 0
     "Authenticated",  # 1
-    "Load Matched",   # 2
-    "Offer Made",     # 3
-    "Negotiated",     # 4
-    "Booked",         # 5
+    "Load Matched",  # 2
+    "Offer Made",  # 3
+    "Negotiated",  # 4
+    "Booked",  # 5
 ]
 
 # Outcome → minimum funnel stage the call must have reached.
@@ -85,10 +101,8 @@ _OUTCOME_MIN_STAGE: dict[str, int] = {
 }
 
 
-def _call_max_stage(call: dict, offer_call_ids: set[str]) -> int:
-    """Return the highest funnel stage index (0–5) this call reached."""
-    outcome = call["outcome"]
-
+def _call_max_stage(outcome: str, offered: bool, negotiated: bool) -> int:
+    """Return the highest funnel stage index (0–5) a call reached."""
     # Minimum stage implied by the outcome itself
     implied = _OUTCOME_MIN_STAGE.get(outcome, 0)
 
@@ -98,9 +112,9 @@ def _call_max_stage(call: dict, offer_call_ids: set[str]) -> int:
         progressive = 1
         if outcome != "no_loads_available":
             progressive = 2
-            if call["call_id"] in offer_call_ids:
+            if offered:
                 progressive = 3
-                if (call.get("negotiation_rounds") or 0) >= 1:
+                if negotiated:
                     progressive = 4
                     if outcome == "booked":
                         progressive = 5
@@ -108,18 +122,21 @@ def _call_max_stage(call: dict, offer_call_ids: set[str]) -> int:
     return max(implied, progressive)
 
 
-def _build_funnel(calls: list[dict], offers: list[dict]) -> list[FunnelStage]:
-    total = len(calls)
+def _build_funnel(groups: list[CallGroup]) -> list[FunnelStage]:
+    total = sum(g.calls for g in groups)
     if total == 0:
         return []
 
-    offer_call_ids = {o["call_id"] for o in offers if o.get("call_id")}
     stage_counts = [0] * len(_FUNNEL_STAGE_NAMES)
 
-    for c in calls:
-        max_stage = _call_max_stage(c, offer_call_ids)
-        for i in range(max_stage + 1):
-            stage_counts[i] += 1
+    for g in groups:
+        for offered, n in (
+            (True, g.offered_calls),
+            (False, g.calls - g.offered_calls),
+        ):
+            max_stage = _call_max_stage(g.outcome, offered, g.negotiated)
+            for i in range(max_stage + 1):
+                stage_counts[i] += n
 
     return [
         FunnelStage(
@@ -134,35 +151,20 @@ def _build_funnel(calls: list[dict], offers: list[dict]) -> list[FunnelStage]:
 # ── Rate intelligence ────────────────────────────────────────────────────────
 
 
-def _build_rate_intelligence(bookings: list[dict]) -> RateIntelligence:
-    if not bookings:
-        return RateIntelligence()
-
-    loadboard_rates = [
-        b["loadboard_rate"] for b in bookings if b.get("loadboard_rate")
-    ]
-    agreed_rates = [b["agreed_rate"] for b in bookings if b.get("agreed_rate")]
-
-    if not loadboard_rates or not agreed_rates:
+def _build_rate_intelligence(summary: BookingSummary) -> RateIntelligence:
+    if summary.avg_loadboard is None or summary.avg_agreed is None:
         return RateIntelligence()
 
-    avg_lb = round(sum(loadboard_rates) / len(loadboard_rates), 2)
-    avg_agreed = round(sum(agreed_rates) / len(agreed_rates), 2)
+    avg_lb = round(summary.avg_loadboard, 2)
+    avg_agreed = round(summary.avg_agreed, 2)
     discount = (
         round(((avg_lb - avg_agreed) / avg_lb) * 100, 1)
         if avg_lb > 0
         else None
     )
-
-    per_booking_margins = []
-    for b in bookings:
-        lb = b.get("loadboard_rate")
-        ag = b.get("agreed_rate")
-        if lb and ag and lb > 0:
-            per_booking_margins.append(((lb - ag) / lb) * 100)
     avg_margin = (
-        round(sum(per_booking_margins) / len(per_booking_margins), 1)
-        if per_booking_margins
+        round(summary.avg_margin_pct, 1)
+        if summary.avg_margin_pct is not None
         else None
     )
 
@@ -177,25 +179,35 @@ def _build_rate_intelligence(bookings: list[dict]) -> RateIntelligence:
 # ── Aggregate metrics from a set of calls ────────────────────────────────────
 
 
-def _trim_recent_calls(calls: list[dict]) -> list[RecentCall]:
+def _trim_recent_calls(calls: list[RecentCallRow]) -> list[RecentCall]:
     return [
         RecentCall(
-            call_id=c["call_id"],
-            mc_number=c.get("mc_number"),
-            carrier_name=c.get("carrier_name"),
-            lane_origin=c.get("lane_origin"),
-            lane_destination=c.get("lane_destination"),
-            load_id=c.get("load_id"),
-            outcome=c["outcome"],
-            final_rate=c.get("final_rate"),
-            created_at=c["created_at"],
+            call_id=c.call_id,
+            mc_number=c.mc_number,
+            carrier_name=c.carrier_name,
+            lane_origin=c.lane_origin,
+            lane_destination=c.lane_destination,
+            load_id=c.load_id,
+            outcome=c.outcome,
+            final_rate=c.final_rate,
+            created_at=c.created_at,
         )
-        for c in calls[:10]
+        for c in calls
     ]
 
 
-def _aggregate_calls(calls: list[dict]) -> dict:
-    total = len(calls)
+def _count_by(groups: list[CallGroup], field: str) -> dict[str, int]:
+    counts: dict[str, int] = {}
+    for g in groups:
+        key = getattr(g, field)
+        counts[key] = counts.get(key, 0) + g.calls
+    return counts
+
+
+def _aggregate_calls(
+    groups: list[CallGroup], recent: list[RecentCallRow]
+) -> dict:
+    total = sum(g.calls for g in groups)
     if total == 0:
         return {
             "total_calls": 0,
@@ -207,39 +219,29 @@ def _aggregate_calls(calls: list[dict]) -> dict:
             "recent_calls": [],
         }
 
-    outcomes: dict[str, int] = {}
-    sentiments: dict[str, int] = {}
-    for c in calls:
-        outcomes[c["outcome"]] = outcomes.get(c["outcome"], 0) + 1
-        sentiments[c["sentiment"]] = sentiments.get(c["sentiment"], 0) + 1
-
-    booked_calls = [c for c in calls if c["outcome"] == "booked"]
-    booked = len(booked_calls)
+    booked_groups = [g for g in groups if g.outcome == "booked"]
+    booked = sum(g.calls for g in booked_groups)
     booking_rate = (booked / total * 100) if total else 0.0
 
-    diffs = []
-    for c in booked_calls:
-        if c["initial_rate"] and c["final_rate"] and c["initial_rate"] > 0:
-            diffs.append(
-                ((c["final_rate"] - c["initial_rate"]) / c["initial_rate"])
-                * 100
-            )
-    avg_diff = sum(diffs) / len(diffs) if diffs else None
-
-    total_rev = (
-        sum(c["final_rate"] for c in booked_calls if c["final_rate"]) or 0.0
+    n_diffs = sum(g.rate_diff_count for g in booked_groups)
+    avg_diff = (
+        sum(g.rate_diff_sum for g in booked_groups) / n_diffs
+        if n_diffs
+        else None
     )
 
+    total_rev = sum(g.final_rate_sum for g in booked_groups)
+
     return {
         "total_calls": total,
-        "calls_by_outcome": outcomes,
-        "sentiment_distribution": sentiments,
+        "calls_by_outcome": _count_by(groups, "outcome"),
+        "sentiment_distribution": _count_by(groups, "sentiment"),
         "booking_rate_percent": round(booking_rate, 1),
         "avg_rate_differential_percent": round(avg_diff, 1)
         if avg_diff
         else None,
         "total_revenue": round(total_rev, 2),
-        "recent_calls": _trim_recent_calls(calls),
+        "recent_calls": _trim_recent_calls(recent),
     }
 
 
@@ -249,36 +251,30 @@ def _aggregate_calls(calls: list[dict]) -> dict:
 def get_dashboard_metrics(period: str = "today") -> DashboardMetrics:
     current_since, previous_since = _period_range(period)
 
-    # Fetch current period data
-    current_calls = get_calls_since(current_since)
-    current_bookings = get_bookings_with_loads_since(current_since)
-
-    # Fetch previous period data for trends
-    if previous_since and current_since:
-        all_since_prev = get_calls_since(previous_since)
-        prev_calls = _filter_before(all_since_prev, current_since)
-        all_bookings_prev = get_bookings_with_loads_since(previous_since)
-        prev_bookings = _filter_before(all_bookings_prev, current_since)
-    else:
-        prev_calls = []
-        prev_bookings = []
+    # Current period and, for trends, the previous one
+    # ([previous_since, current_since)): one statement per table
+    current_calls, prev_outcomes = get_call_groups(
+        current_since, previous_since
+    )
+    current_bookings, prev_bookings = get_booking_summaries(
+        current_since, previous_since
+    )
 
     # Base aggregate metrics for the period
-    base_data = _aggregate_calls(current_calls)
-
-    # Fetch offers for funnel computation
-    call_ids = [c["call_id"] for c in current_calls]
-    period_offers = get_offers_for_calls(call_ids)
+    base_data = _aggregate_calls(
+        current_calls, get_recent_calls(current_since)
+    )
 
     # KPIs: current period
-    n_calls = len(current_calls)
-    n_calls_prev = len(prev_calls)
+    n_calls = base_data["total_calls"]
+    n_calls_prev = sum(prev_outcomes.values())
 
-    n_booked = len([c for c in current_calls if c["outcome"] == "booked"])
-    n_booked_prev = len([c for c in prev_calls if c["outcome"] == "booked"])
+    outcomes = base_data["calls_by_outcome"]
+    n_booked = outcomes.get("booked", 0)
+    n_booked_prev = prev_outcomes.get("booked", 0)
 
-    revenue = sum(b.get("agreed_rate", 0) for b in current_bookings)
-    revenue_prev = sum(b.get("agreed_rate", 0) for b in prev_bookings)
+    revenue = current_bookings.revenue
+    revenue_prev = prev_bookings.revenue
 
     conversion = round((n_booked / n_calls) * 100, 1) if n_calls > 0 else 0
     conversion_prev = (
@@ -287,12 +283,10 @@ def get_dashboard_metrics(period: str = "today") -> DashboardMetrics:
         else 0
     )
 
-    pending_transfer = len(
-        [c for c in current_calls if c["outcome"] == "transferred_to_ops"]
-    )
+    pending_transfer = outcomes.get("transferred_to_ops", 0)
 
     # Funnel for the period
-    funnel = _build_funnel(current_calls, period_offers)
+    funnel = _build_funnel(current_calls)
 
     # Rate intelligence for the period
     rate_intel = _build_rate_intelligence(current_bookings)
@@ -328,3 +322,204 @@ def get_dashboard_metrics(period: str = "today") -> DashboardMetrics:
     )
 
     return DashboardMetrics(**base_data)
+
+
+# ── Snapshots ────────────────────────────────────────────────────────────────
+#
+# Dashboard polls are served from a pre-serialized snapshot per period.
+# `refresh_dashboard_snapshots` (started in lifespan) rebuilds them every
+# `dashboard_refresh_seconds`, or sooner once a write path calls
+# `mark_dashboard_stale()`.
+
+
+@dataclass(frozen=True, slots=True)
+class DashboardSnapshot:
+    body: bytes  # DashboardMetrics as JSON
+    etag: str
+    generated_at: str
+
+
+_snapshots: dict[str, DashboardSnapshot] = {}
+_loop: asyncio.AbstractEventLoop | None = None
+_stale: asyncio.Event | None = None
+
+# However often writes land, rebuild at most this often.
+_MIN_REFRESH_SECONDS = 1.0
+
+
+def _build_snapshot(period: str) -> DashboardSnapshot:
+    body = get_dashboard_metrics(period).model_dump_json().encode()
+    return DashboardSnapshot(
+        body=body,
+        # Content hash: unchanged metrics keep their ETag across rebuilds.
+        etag=f'"{hashlib.blake2b(body, digest_size=12).hexdigest()}"',
+        generated_at=datetime.now(UTC).isoformat(timespec="seconds"),
+    )
+
+
+def _rebuild_snapshots() -> None:
+    global _snapshots
+    _snapshots = {p.value: _build_snapshot(p.value) for p in Period}
+
+
+def get_dashboard_snapshot(period: str) -> DashboardSnapshot:
+    """The latest snapshot, or a fresh one if the refresher isn't running."""
+    snapshot = _snapshots.get(period)
+    return snapshot if snapshot is not None else _build_snapshot(period)
+
+
+def mark_dashboard_stale() -> None:
+    """Wake the refresher early. Safe to call from any thread."""
+    loop, stale = _loop, _stale
+    if loop is None or stale is None or stale.is_set():
+        return
+    try:
+        loop.call_soon_threadsafe(stale.set)
+    except RuntimeError:
+        pass  # loop already closed (shutdown)
+
+
+async def refresh_dashboard_snapshots() -> None:
+    """Rebuild every period's snapshot forever (see above)."""
+    global _loop, _stale, _snapshots
+    interval = get_settings().dashboard_refresh_seconds
+    _loop, _stale = asyncio.get_running_loop(), asyncio.Event()
+    try:
+        while True:
+            started = time.monotonic()
+            _stale.clear()
+            try:
+                await asyncio.to_thread(_rebuild_snapshots)
+            except Exception:
+                log.exception("Dashboard snapshot refresh failed")
+            try:
+                await asyncio.wait_for(_stale.wait(), interval)
+            except TimeoutError:
+                pass
+            await asyncio.sleep(
+                started + _MIN_REFRESH_SECONDS - time.monotonic()
+            )
+    finally:
+        _loop = _stale = None
+        _snapshots = {}
+
+
+# ── Time series ──────────────────────────────────────────────────────────────
+#
+# Bucket totals are aggregated in SQL over the created_epoch indexes.
+# Once a bucket has closed its totals can't change (writes are stamped
+# with the current time), so closed buckets are cached per width and
+# each request queries only from the first uncached bucket on, which in
+# steady state is just the open one. Backfills write into the past and
+# call invalidate_timeseries().
+
+_BUCKET_SECONDS = {"hour": 3600, "day": 86400}
+
+# Rows are stamped before they commit; treat a bucket as closed only
+# this long after it ends.
+_BUCKET_GRACE_SECONDS = 60
+
+
+class _Bucket(NamedTuple):
+    calls: int
+    booked: int
+    revenue: float
+    neg_pct_sum: float
+    neg_pct_count: int
+
+
+_NO_CALLS = CallBucket(0, 0, 0.0, 0)
+
+# width -> {bucket start: totals}, closed buckets only
+_closed_buckets: dict[int, dict[int, _Bucket]] = {}
+_closed_buckets_lock = threading.Lock()
+
+
+def invalidate_timeseries() -> None:
+    """Forget cached buckets, after writes dated in the past."""
+    global _closed_buckets
+    with _closed_buckets_lock:
+        _closed_buckets = {}
+
+
+def _bucket_totals(
+    width: int, since: int, now: int
+) -> list[tuple[int, _Bucket]]:
+    """(start, totals) for every bucket from `since` up to `now`."""
+    end = now // width * width + width
+    first = min(since // width * width, end)
+    closed_before = (now - _BUCKET_GRACE_SECONDS) // width * width
+
+    with _closed_buckets_lock:
+        cache = _closed_buckets.setdefault(width, {})
+        fetch_from = next(
+            (
+                s
+                for s in range(first, end, width)
+                if s >= closed_before or s not in cache
+            ),
+            end,
+        )
+        totals = [(s, cache[s]) for s in range(first, fetch_from, width)]
+
+    # Query outside the lock. If a backfill invalidates the cache
+    # meanwhile these totals may predate it, so they're only cached
+    # while `cache` is still the current one.
+    calls = get_call_buckets(width, fetch_from, end)
+    revenue = get_revenue_buckets(width, fetch_from, end)
+    for start in range(fetch_from, end, width):
+        c = calls.get(start, _NO_CALLS)
+        bucket = _Bucket(
+            c.calls,
+            c.booked,
+            revenue.get(start, 0.0),
+            c.neg_pct_sum,
+            c.neg_pct_count,
+        )
+        totals.append((start, bucket))
+    with _closed_buckets_lock:
+        if _closed_buckets.get(width) is cache:
+            cache.update(
+                (s, b) for s, b in totals if fetch_from <= s < closed_before
+            )
+    return totals
+
+
+def _metric_value(metric: str, b: _Bucket) -> float | None:
+    if metric == "calls":
+        return b.calls
+    if metric == "booked":
+        return b.booked
+    if metric == "revenue":
+        return round(b.revenue, 2)
+    if metric == "conversion":
+        return round(b.booked / b.calls * 100, 1) if b.calls else None
+    # avg_negotiation_pct
+    return (
+        round(b.neg_pct_sum / b.neg_pct_count, 1) if b.neg_pct_count else None
+    )
+
+
+def get_dashboard_timeseries(
+    metric: str, bucket: str, period: str
+) -> DashboardTimeseries:
+    width = _BUCKET_SECONDS[bucket]
+    now = int(time.time())
+    since_date = period_since(period, datetime.fromtimestamp(now, UTC).date())
+    if since_date is not None:
+        since = int(
+            datetime.fromisoformat(since_date).replace(tzinfo=UTC).timestamp()
+        )
+    else:
+        since = get_first_epoch() or now
+
+    points = [
+        TimeseriesPoint(
+            start=datetime.fromtimestamp(start, UTC).isoformat(),
+            value=_metric_value(metric, totals),
+        )
+        for start, totals in _bucket_totals(width, since, now)
+    ]
+    return DashboardTimeseries(
+        metric=metric, bucket=bucket, period=period, points=points
+    )
@@ -0,0 +1,162 @@
+"""
+Change events for live dashboards (GET /api/events/stream).
+
+Write paths publish a small event once their transaction has committed:
+what changed plus `kpi_delta`, the amounts to add to the dashboard's
+current-period KPIs (`calls_today`, `booked_today`, `revenue_today`,
+`pending_transfer`). An empty delta means the change doesn't move them,
+or can't be expressed as a delta (bulk backfills land in past days).
+
+Events are numbered `<boot>-<n>` and the last `_BUFFER_SIZE` are kept
+in memory, so a client reconnecting with `Last-Event-ID` is sent what
+it missed. If it missed more than that, or the id is from an earlier
+process, it gets a `reset` event instead and should refetch
+/api/dashboard/metrics.
+
+uvicorn waits for open responses before it shuts down, and a stream
+never ends by itself, so `close_streams_on_exit()` (lifespan) ends them
+as soon as the server is asked to stop.
+"""
+
+import asyncio
+import itertools
+import json
+import signal
+import threading
+import time
+from collections import deque
+from collections.abc import AsyncIterator
+from typing import NamedTuple
+
+_BUFFER_SIZE = 1000
+# Comment line sent when idle, so proxies don't drop the connection.
+_KEEPALIVE_SECONDS = 15.0
+_RETRY_MS = 3000
+
+_BOOT = format(time.time_ns(), "x")
+
+
+class Event(NamedTuple):
+    n: int
+    type: str
+    data: str  # JSON
+
+
+_lock = threading.Lock()
+_buffer: deque[Event] = deque(maxlen=_BUFFER_SIZE)
+_last_n = 0
+_subscribers: set[tuple[asyncio.AbstractEventLoop, asyncio.Event]] = set()
+_closing = False
+
+
+def _wake(subscribers: list) -> None:
+    for loop, wake in subscribers:
+        try:
+            loop.call_soon_threadsafe(wake.set)
+        except RuntimeError:
+            pass  # that stream's loop is closed
+
+
+def publish_event(
+    type: str, data: dict, kpi_delta: dict | None = None
+) -> None:
+    """Record an event and wake every open stream. Any thread."""
+    global _last_n
+    payload = json.dumps(
+        {**data, "kpi_delta": kpi_delta or {}}, separators=(",", ":")
+    )
+    with _lock:
+        _last_n += 1
+        _buffer.append(Event(_last_n, type, payload))
+        subscribers = list(_subscribers)
+    _wake(subscribers)
+
+
+def close_event_streams() -> None:
+    """End every open stream; clients reconnect to the next server."""
+    global _closing
+    _closing = True
+    # No lock: this runs in a signal handler, possibly while the same
+    # thread holds it. Copying the set is a single atomic call.
+    _wake(list(_subscribers))
+
+
+def close_streams_on_exit() -> None:
+    """Chain close_event_streams() in front of the SIGINT/SIGTERM handlers."""
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        previous = signal.getsignal(sig)
+
+        def handler(signum, frame, previous=previous):
+            close_event_streams()
+            if callable(previous):
+                previous(signum, frame)
+
+        try:
+            signal.signal(sig, handler)
+        except ValueError:
+            return  # not the main thread (e.g. TestClient): nothing to do
+
+
+def _parse_id(event_id: str) -> int | None:
+    """The event number in an id from this process, else None."""
+    boot, _, n = event_id.partition("-")
+    if boot != _BOOT or not n.isdigit():
+        return None
+    return int(n)
+
+
+def _read_after(n: int) -> tuple[list[Event], int] | None:
+    """
+    Buffered events after number `n` and the latest number, or None
+    when some of them have already left the buffer.
+    """
+    with _lock:
+        if n > _last_n:
+            return None
+        first = _buffer[0].n if _buffer else _last_n + 1
+        if n < first - 1:
+            return None
+        # Numbers are consecutive, so the position is arithmetic.
+        events = list(itertools.islice(_buffer, n - first + 1, None))
+        return events, _last_n
+
+
+def _format(n: int, type: str, data: str) -> str:
+    return f"id: {_BOOT}-{n}\nevent: {type}\ndata: {data}\n\n"
+
+
+async def stream_events(
+    last_event_id: str | None = None,
+) -> AsyncIterator[str]:
+    """SSE frames for one client, from `last_event_id` on, forever."""
+    wake = asyncio.Event()
+    subscriber = (asyncio.get_running_loop(), wake)
+    with _lock:
+        _subscribers.add(subscriber)
+        n = _last_n
+    try:
+        yield f"retry: {_RETRY_MS}\n\n"
+        if last_event_id:
+            resumed = _parse_id(last_event_id)
+            if resumed is None:
+                yield _format(n, "reset", '{"reason":"unknown_id"}')
+            else:
+                n = resumed
+        while not _closing:
+            wake.clear()
+            read = _read_after(n)
+            if read is None:
+                with _lock:
+                    n = _last_n
+                yield _format(n, "reset", '{"reason":"buffer_overrun"}')
+                continue
+            events, n = read
+            for event in events:
+                yield _format(*event)
+            try:
+                await asyncio.wait_for(wake.wait(), _KEEPALIVE_SECONDS)
+            except TimeoutError:
+                yield ": keepalive\n\n"
+    finally:
+        with _lock:
+            _subscribers.discard(subscriber)
@@ -0,0 +1,129 @@
+"""
+Idempotency store for webhook-driven writes.
+
+The voice platform retries webhooks, so POST /api/calls and
+POST /api/booked-loads may see the same request several times. The
+first successful response is stored under (scope, key) together with a
+hash of the request body; a retry with the same body gets that response
+back without touching the write path, and a different body under a
+used key is refused.
+
+A key is claimed inside the write's own transaction, before anything
+is written, so concurrent retries can't both get past the check.
+Committed responses are also kept in a bounded in-memory LRU and read
+from there (or the `idempotency_keys` table) before queueing a write at
+all. Entries older than `_RETENTION_HOURS` are pruned.
+"""
+
+import hashlib
+import sqlite3
+import threading
+from datetime import UTC, datetime, timedelta
+
+from cachetools import LRUCache
+from pydantic import BaseModel
+
+from app.db.repositories.idempotency_repo import (
+    claim_key,
+    delete_responses_before,
+    get_stored_response,
+    release_key,
+    store_response,
+)
+
+_MEMORY_SIZE = 4096
+_RETENTION_HOURS = 24
+_PRUNE_EVERY = 500  # stores between two prunes of the table
+
+_memory: LRUCache = LRUCache(maxsize=_MEMORY_SIZE)
+_lock = threading.Lock()
+_stores_since_prune = 0
+
+
+def request_hash(req: BaseModel) -> str:
+    return hashlib.blake2b(
+        req.model_dump_json().encode(), digest_size=16
+    ).hexdigest()
+
+
+def _replay[M: BaseModel](
+    key: str, fingerprint: str, stored: tuple[str, str], model: type[M]
+) -> tuple[M, None] | tuple[None, str]:
+    stored_hash, payload = stored
+    # Keys stored before request hashes were kept have none: replay.
+    if stored_hash and stored_hash != fingerprint:
+        return None, (
+            f"Idempotency key '{key}' was already used for a different request"
+        )
+    return model.model_validate_json(payload), None
+
+
+def get_replay[M: BaseModel](
+    scope: str, key: str | None, fingerprint: str, model: type[M]
+) -> tuple[M | None, str | None]:
+    """
+    Look for a committed response before queueing the write:
+    (response, None) to replay, (None, error) when the key belongs to a
+    different request, (None, None) when there is nothing stored.
+    """
+    if not key:
+        return None, None
+    with _lock:
+        stored = _memory.get((scope, key))
+    if stored is None:
+        stored = get_stored_response(scope, key)
+        if stored is None:
+            return None, None
+        with _lock:
+            _memory[(scope, key)] = stored
+    return _replay(key, fingerprint, stored, model)
+
+
+def claim[M: BaseModel](
+    scope: str,
+    key: str | None,
+    fingerprint: str,
+    model: type[M],
+    conn: sqlite3.Connection,
+) -> tuple[M | None, str | None]:
+    """
+    Claim the key in the write's transaction `conn`, before writing.
+    Same results as get_replay(): (None, None) means the key is ours,
+    so write, then remember() the response (or release() the key).
+    """
+    if not key or claim_key(scope, key, fingerprint, conn):
+        return None, None
+    return _replay(
+        key, fingerprint, get_stored_response(scope, key, conn=conn), model
+    )
+
+
+def remember(
+    scope: str,
+    key: str | None,
+    response: BaseModel,
+    conn: sqlite3.Connection,
+) -> None:
+    """
+    Store the response of a claimed key, in the same commit as the write
+    it describes. The memory layer fills on first replay, once that
+    commit is durable.
+    """
+    global _stores_since_prune
+    if not key:
+        return
+    store_response(scope, key, response.model_dump_json(), conn)
+    with _lock:
+        _stores_since_prune += 1
+        prune = _stores_since_prune >= _PRUNE_EVERY
+        if prune:
+            _stores_since_prune = 0
+    if prune:
+        cutoff = datetime.now(UTC) - timedelta(hours=_RETENTION_HOURS)
+        delete_responses_before(cutoff.isoformat(), conn=conn)
+
+
+def release(scope: str, key: str | None, conn: sqlite3.Connection) -> None:
+    """Give up a claimed key when the write was refused."""
+    if key:
+        release_key(scope, key, conn)
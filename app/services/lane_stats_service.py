@@ -0,0 +1,144 @@
+"""
+Lane rate statistics — what a lane has actually paid, per mile, so
+negotiation can anchor against market history.
+
+Lanes are keyed by canonical city pair (app.utils.geo) and equipment
+type, with one more entry per pair across all equipment. Each keeps the
+count, mean and variance (Welford) and a t-digest of agreed and
+loadboard rates per mile.
+
+The index lives in memory: `build_lane_stats_index()` reads every
+booking once at startup and `record_booking()` adds each new one, so a
+lookup is a dict hit plus a summary cached until the lane's next
+booking.
+"""
+
+import math
+import threading
+
+from app.db.repositories.analytics_repo import LaneBooking, get_lane_bookings
+from app.models.analytics import LaneRateStats, RateDistribution
+from app.utils.geo import canonical_city, resolve_city
+from app.utils.tdigest import TDigest
+
+_ALL_EQUIPMENT = ""
+
+
+class _RateStats:
+    def __init__(self) -> None:
+        self.count = 0
+        self.mean = 0.0
+        self._m2 = 0.0
+        self.digest = TDigest()
+
+    def add(self, value: float) -> None:
+        self.count += 1
+        delta = value - self.mean
+        self.mean += delta / self.count
+        self._m2 += delta * (value - self.mean)
+        self.digest.add(value)
+
+    def summary(self) -> RateDistribution:
+        variance = self._m2 / (self.count - 1) if self.count > 1 else 0.0
+        return RateDistribution(
+            mean=round(self.mean, 2),
+            stddev=round(math.sqrt(variance), 2),
+            p10=round(self.digest.quantile(0.1), 2),
+            p50=round(self.digest.quantile(0.5), 2),
+            p90=round(self.digest.quantile(0.9), 2),
+        )
+
+
+class _LaneStats:
+    def __init__(self, booking: LaneBooking, equipment: str) -> None:
+        self.origin = booking.origin
+        self.destination = booking.destination
+        self.equipment_type = equipment or None
+        self.agreed = _RateStats()
+        self.loadboard = _RateStats()
+        self._summary: LaneRateStats | None = None
+
+    def add(self, booking: LaneBooking) -> None:
+        self.agreed.add(booking.agreed_rate / booking.miles)
+        self.loadboard.add(booking.loadboard_rate / booking.miles)
+        self._summary = None
+
+    def summary(self) -> LaneRateStats:
+        if self._summary is None:
+            self._summary = LaneRateStats(
+                origin=self.origin,
+                destination=self.destination,
+                equipment_type=self.equipment_type,
+                bookings=self.agreed.count,
+                agreed_rate_per_mile=self.agreed.summary(),
+                loadboard_rate_per_mile=self.loadboard.summary(),
+            )
+        return self._summary
+
+
+_Key = tuple[str, str, str]  # canonical origin, destination, equipment
+
+_lock = threading.Lock()
+_index: dict[_Key, _LaneStats] = {}
+
+
+def _add(index: dict[_Key, _LaneStats], booking: LaneBooking) -> None:
+    if not booking.miles or booking.miles <= 0:
+        return
+    origin = canonical_city(booking.origin)
+    destination = canonical_city(booking.destination)
+    if origin is None or destination is None:
+        return
+    for equipment in (booking.equipment_type, _ALL_EQUIPMENT):
+        key = (origin, destination, equipment)
+        lane = index.get(key)
+        if lane is None:
+            lane = index[key] = _LaneStats(booking, equipment)
+        lane.add(booking)
+
+
+def build_lane_stats_index() -> None:
+    """(Re)build the index from every booking. Call at startup."""
+    global _index
+    index: dict[_Key, _LaneStats] = {}
+    for booking in get_lane_bookings():
+        _add(index, booking)
+    with _lock:
+        _index = index
+
+
+def record_booking(load: dict, agreed_rate: float) -> None:
+    """Add a committed booking of `load` (a loads row) to the index."""
+    booking = LaneBooking(
+        load["origin"],
+        load["destination"],
+        load["equipment_type"],
+        load["miles"],
+        agreed_rate,
+        load["loadboard_rate"],
+    )
+    with _lock:
+        _add(_index, booking)
+
+
+async def get_lane_rate_stats(
+    origin: str,
+    destination: str,
+    equipment_type: str | None = None,
+) -> tuple[LaneRateStats, None] | tuple[None, str]:
+    """Rate-per-mile distribution on a lane, optionally one equipment."""
+    resolved = []
+    for raw in (origin, destination):
+        city = await resolve_city(raw)
+        if city is None:
+            return None, f"Could not resolve city: '{raw}'"
+        resolved.append(city[0])
+    key = (*resolved, equipment_type or _ALL_EQUIPMENT)
+    with _lock:
+        lane = _index.get(key)
+        if lane is None:
+            equipment = f" ({equipment_type})" if equipment_type else ""
+            return None, (
+                f"No bookings on lane {origin} → {destination}{equipment}"
+            )
+        return lane.summary(), None
@@ -1,12 +1,21 @@
+import asyncio
+import logging
 from datetime import datetime, timedelta, timezone
 
+from app.config import get_settings
+from app.db.city_data import get_location_meta
 from app.db.repositories.load_repo import (
+    URGENCY_LEVELS,
     get_all_loads,
     get_load_by_id,
-    get_loads_paginated,
     get_loads_kpis,
+    get_loads_paginated,
+    refresh_urgency,
 )
-from app.db.repositories.negotiation_settings_repo import get_all_settings
+from app.db.repositories.negotiation_settings_repo import (
+    get_settings_snapshot,
+)
+from app.db.write_queue import execute
 from app.models.load import (
     AlternativeLoad,
     Load,
@@ -18,41 +27,10 @@ from app.models.load import (
     SearchResultLoad,
 )
 from app.models.location import ResolvedLocation
-from app.db.city_data import get_location_meta
 from app.utils.geo import haversine_miles, resolve_location
 from app.utils.period import period_since
 
-_PERISHABLE_KEYWORDS = {
-    "temp-controlled",
-    "seafood",
-    "produce",
-    "frozen",
-    "perishable",
-    "dairy",
-    "meat",
-}
-
-
-def _compute_urgency(
-    pitch_count: int, days_listed: int, commodity: str, notes: str
-) -> str:
-    commodity_lower = commodity.lower()
-    notes_lower = notes.lower()
-    is_perishable = any(kw in commodity_lower for kw in _PERISHABLE_KEYWORDS)
-
-    # Critical
-    if (
-        pitch_count > 8
-        or days_listed >= 2
-        or is_perishable
-        or "dead-end" in notes_lower
-    ):
-        return "critical"
-    # High
-    if pitch_count > 4 or days_listed >= 1:
-        return "high"
-    return "normal"
-
+log = logging.getLogger(__name__)
 
 # How far beyond the requested radius we still surface alternatives
 _ALT_RADIUS_MULTIPLIER = 3
@@ -192,9 +170,9 @@ async def search_loads(
 
     equip = _normalize_equipment(equipment_type)
 
-    ns = get_all_settings()
-    target_margin = ns.get("target_margin", 0.15)
-    max_bump = ns.get("max_bump_above_loadboard", 0.03)
+    ns = get_settings_snapshot()
+    target_margin = ns.target_margin
+    max_bump = ns.max_bump_above_loadboard
 
     now = datetime.now(timezone.utc)
     window_end = (
@@ -398,9 +376,9 @@ async def search_loads_by_lane(
     o_loc = await resolve_location(origin)
     d_loc = await resolve_location(destination)
 
-    ns = get_all_settings()
-    target_margin = ns.get("target_margin", 0.15)
-    max_bump = ns.get("max_bump_above_loadboard", 0.03)
+    ns = get_settings_snapshot()
+    target_margin = ns.target_margin
+    max_bump = ns.max_bump_above_loadboard
 
     matches: list[SearchResultLoad] = []
 
@@ -459,16 +437,19 @@ def _days_listed_from_created_at(created_at: str | None, now: datetime) -> int:
     return max(0, (now - created_dt).days)
 
 
-_URGENCY_RANK = {"critical": 0, "high": 1, "normal": 2}
-
-_PYTHON_SORT_KEY = {
-    "urgency": lambda l: _URGENCY_RANK.get(l.urgency, 2),
-    "pickup_datetime": lambda l: l.pickup_datetime or "",
-    "loadboard_rate": lambda l: l.loadboard_rate or 0,
-    "miles": lambda l: l.miles or 0,
-    "created_at": lambda l: l.created_at or "",
-    "weight": lambda l: l.weight or 0,
-}
+async def sweep_urgency() -> None:
+    """
+    Re-rank loads forever, every `urgency_sweep_seconds`. Triggers keep
+    urgency current as offers come in; this catches loads that crossed a
+    days-listed threshold while nothing touched them.
+    """
+    interval = get_settings().urgency_sweep_seconds
+    while True:
+        try:
+            await asyncio.to_thread(execute, refresh_urgency)
+        except Exception:
+            log.exception("Urgency sweep failed")
+        await asyncio.sleep(interval)
 
 
 def list_loads(
@@ -482,39 +463,30 @@ def list_loads(
     page_size: int = 50,
     sort_by: str = "pickup_datetime",
     sort_order: str = "asc",
+    cursor: str | None = None,
+    include_totals: bool | None = None,
 ) -> LoadListResponse:
+    """Raises ValueError for a malformed cursor."""
     since = period_since(period)
+    if include_totals is None:
+        include_totals = cursor is None
 
-    # Parse multi-field sort
-    sort_fields = [s.strip() for s in sort_by.split(",") if s.strip()]
-    sort_orders = [s.strip() for s in sort_order.split(",") if s.strip()]
-    while len(sort_orders) < len(sort_fields):
-        sort_orders.append("asc")
-
-    # urgency is computed in Python, so when it's a sort field we must
-    # fetch all matching rows, enrich, sort in Python, then paginate.
-    has_urgency_sort = "urgency" in sort_fields
-
-    # Build DB-level sort fields (exclude urgency)
-    db_pairs = [(f, o) for f, o in zip(sort_fields, sort_orders) if f != "urgency"]
-    db_sort_by = ",".join(f for f, _ in db_pairs) or "pickup_datetime"
-    db_sort_order = ",".join(o for _, o in db_pairs) or "asc"
-
-    rows, total = get_loads_paginated(
+    rows, total, next_cursor = get_loads_paginated(
         status=status,
         equipment_type=equipment_type,
         origin=origin,
         destination=destination,
         since=since,
-        page=page if not has_urgency_sort else 1,
-        page_size=page_size if not has_urgency_sort else 0,
-        sort_by=db_sort_by,
-        sort_order=db_sort_order,
-        skip_pagination=has_urgency_sort,
+        urgency=urgency,
+        page=page,
+        page_size=page_size,
+        sort_by=sort_by,
+        sort_order=sort_order,
+        cursor=cursor,
+        include_total=include_totals,
     )
 
-    ns = get_all_settings()
-    target_margin = ns.get("target_margin", 0.15)
+    target_margin = get_settings_snapshot().target_margin
 
     now = datetime.now(timezone.utc)
     enriched: list[LoadWithStatus] = []
@@ -522,13 +494,6 @@ def list_loads(
         days_listed = _days_listed_from_created_at(r.get("created_at"), now)
         pitch_count = r.get("pitch_count", 0)
 
-        computed_urgency = _compute_urgency(
-            pitch_count=pitch_count,
-            days_listed=days_listed,
-            commodity=r.get("commodity_type", ""),
-            notes=r.get("notes", ""),
-        )
-
         miles = r.get("miles", 0)
         floor_rate = r["loadboard_rate"] * (1 - target_margin)
         rate_per_mile = round(floor_rate / miles, 2) if miles > 0 else None
@@ -541,57 +506,46 @@ def list_loads(
             else db_status
         )
 
-        extra_keys = {"pitch_count", "active_thinking_calls", "status"}
+        extra_keys = {
+            "pitch_count",
+            "active_thinking_calls",
+            "urgency_rank",
+            "status",
+        }
         base = {k: v for k, v in r.items() if k not in extra_keys}
 
         load = LoadWithStatus(
             **base,
             status=effective_status,
             pitch_count=pitch_count,
-            urgency=computed_urgency,
+            urgency=URGENCY_LEVELS[r["urgency_rank"]],
             days_listed=days_listed,
             rate_per_mile=rate_per_mile,
         )
 
-        if urgency and load.urgency != urgency:
-            continue
-
         enriched.append(load)
 
-    # Python-level multi-field sort (uses stable sort in reverse priority order)
-    if has_urgency_sort:
-        for field, ord_ in reversed(list(zip(sort_fields, sort_orders))):
-            key_fn = _PYTHON_SORT_KEY.get(field)
-            if key_fn:
-                enriched.sort(key=key_fn, reverse=(ord_.lower() == "desc"))
-        # Manual pagination
-        total = len(enriched)
-        start = (page - 1) * page_size
-        enriched = enriched[start : start + page_size]
+    if not include_totals:
+        return LoadListResponse(
+            loads=enriched,
+            page=page,
+            page_size=page_size,
+            next_cursor=next_cursor,
+        )
 
     # KPIs (period + status only, independent of table filters)
     kpi_data = get_loads_kpis(
         since=since, status=status, target_margin=target_margin
     )
-    critical_count = 0
-    for r in kpi_data["urgency_data"]:
-        dl = _days_listed_from_created_at(r.get("created_at"), now)
-        u = _compute_urgency(
-            r.get("pitch_count", 0),
-            dl,
-            r.get("commodity_type", ""),
-            r.get("notes", ""),
-        )
-        if u == "critical":
-            critical_count += 1
 
     return LoadListResponse(
         loads=enriched,
-        total=len(enriched) if urgency and not has_urgency_sort else total,
+        total=total,
         page=page,
         page_size=page_size,
+        next_cursor=next_cursor,
         kpi_total_loads=kpi_data["total_loads"],
-        kpi_critical_count=critical_count,
+        kpi_critical_count=kpi_data["critical_count"],
         kpi_avg_rate_per_mile=kpi_data["avg_rate_per_mile"],
     )
 
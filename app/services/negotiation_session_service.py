@@ -0,0 +1,150 @@
+"""
+Per-call negotiation sessions, held in memory.
+
+A session is opened on the first offer or analysis for a call_id and
+keeps, per load discussed: the load snapshot, the floor/ceiling bounds
+and the round history. Later rounds are answered from memory and the
+round/offer limits are enforced without querying the offers table.
+Sessions end when the call is logged, or expire after
+`_SESSION_TTL_SECONDS` of inactivity.
+"""
+
+import threading
+from dataclasses import dataclass, field
+from datetime import UTC, datetime
+
+from cachetools import TTLCache
+
+from app.db.repositories.load_repo import get_load_by_id
+
+_SESSION_TTL_SECONDS = 60 * 60
+_MAX_SESSIONS = 10_000
+
+
+@dataclass(slots=True)
+class NegotiationRound:
+    source: str  # "analysis" or "offer"
+    amount: float | None
+    verdict: str | None
+    at: str
+
+
+@dataclass(slots=True)
+class LoadNegotiation:
+    load: dict
+    floor_pct: float
+    ceiling_pct: float
+    floor: float
+    ceiling: float
+    rounds: list[NegotiationRound] = field(default_factory=list)
+
+    @property
+    def rate_rounds(self) -> int:
+        """Asks analyzed so far. Logged offers restate an analyzed round,
+        so they don't count again."""
+        return sum(
+            1
+            for r in self.rounds
+            if r.source == "analysis" and r.amount is not None
+        )
+
+
+@dataclass(slots=True)
+class NegotiationSession:
+    call_id: str
+    loads: dict[str, LoadNegotiation] = field(default_factory=dict)
+    offers_logged: int = 0
+
+
+_sessions: TTLCache = TTLCache(maxsize=_MAX_SESSIONS, ttl=_SESSION_TTL_SECONDS)
+_lock = threading.Lock()
+
+
+def get_session(call_id: str) -> NegotiationSession:
+    """Return the call's session, opening one if needed. Extends its TTL."""
+    with _lock:
+        session = _sessions.get(call_id)
+        if session is None:
+            session = NegotiationSession(call_id=call_id)
+        _sessions[call_id] = session
+        return session
+
+
+def get_negotiation(
+    session: NegotiationSession,
+    load_id: str,
+    floor_pct: float,
+    ceiling_pct: float,
+) -> LoadNegotiation | None:
+    """Load snapshot and bounds for this call, fetched once per load."""
+    # The load is read under the lock too: a booking that commits after
+    # the read flips the cached status once the snapshot is in place.
+    with _lock:
+        neg = session.loads.get(load_id)
+        if neg is None:
+            load = get_load_by_id(load_id)
+            if not load:
+                return None
+            neg = LoadNegotiation(
+                load=load,
+                floor_pct=floor_pct,
+                ceiling_pct=ceiling_pct,
+                floor=round(load["loadboard_rate"] * floor_pct, 2),
+                ceiling=round(load["loadboard_rate"] * ceiling_pct, 2),
+            )
+            session.loads[load_id] = neg
+        elif (neg.floor_pct, neg.ceiling_pct) != (floor_pct, ceiling_pct):
+            # Settings changed mid-call: re-derive the bounds.
+            rate = neg.load["loadboard_rate"]
+            neg.floor_pct, neg.ceiling_pct = floor_pct, ceiling_pct
+            neg.floor = round(rate * floor_pct, 2)
+            neg.ceiling = round(rate * ceiling_pct, 2)
+        return neg
+
+
+def record_round(
+    neg: LoadNegotiation,
+    source: str,
+    amount: float | None,
+    verdict: str | None = None,
+) -> None:
+    with _lock:
+        neg.rounds.append(
+            NegotiationRound(
+                source=source,
+                amount=amount,
+                verdict=verdict,
+                at=datetime.now(UTC).isoformat(),
+            )
+        )
+
+
+def reserve_offer(session: NegotiationSession, max_offers: int) -> bool:
+    """Claim one of the call's `max_offers` offer slots, if any is left.
+    Check and claim happen together, so concurrent offers can't both
+    take the last slot."""
+    with _lock:
+        if session.offers_logged >= max_offers:
+            return False
+        session.offers_logged += 1
+        return True
+
+
+def release_offer(session: NegotiationSession) -> None:
+    """Give back a slot claimed for an offer that wasn't logged."""
+    with _lock:
+        session.offers_logged -= 1
+
+
+def end_session(call_id: str) -> None:
+    with _lock:
+        _sessions.pop(call_id, None)
+
+
+def mark_load_booked_in_sessions(load_id: str) -> None:
+    """Flip the cached status so other live calls stop pitching it."""
+    with _lock:
+        for session in _sessions.values():
+            neg = session.loads.get(load_id)
+            if neg is not None:
+                neg.load["status"] = "booked"
@@ -1,14 +1,31 @@
-from datetime import datetime, timedelta, timezone
+from datetime import UTC, datetime, timedelta
 
+from app.db.repositories.load_repo import get_load_by_id, get_loads_by_ids
+from app.db.repositories.negotiation_settings_repo import (
+    get_settings_snapshot,
+)
+from app.db.repositories.offer_repo import insert_offer
+from app.db.write_queue import execute
 from app.models.enums import Verdict
 from app.models.offer import (
-    OfferCreateRequest,
-    OfferResponse,
+    CarrierAsk,
     OfferAnalysisRequest,
     OfferAnalysisResponse,
+    OfferBatchAnalysisRequest,
+    OfferBatchAnalysisResponse,
+    OfferCreateRequest,
+    OfferResponse,
+)
+from app.services.dashboard_service import mark_dashboard_stale
+from app.services.event_service import publish_event
+from app.services.negotiation_session_service import (
+    NegotiationSession,
+    get_negotiation,
+    get_session,
+    record_round,
+    release_offer,
+    reserve_offer,
 )
-from app.db.repositories.load_repo import get_load_by_id
-from app.db.repositories.offer_repo import insert_offer
 from app.utils.fmcsa import ensure_mc_prefix
 
 # ── Broker strategy thresholds ──────────────────────────
@@ -21,21 +38,18 @@ _MILES_COUNTER_TOLERANCE = 0.20
 def _parse_dt(dt_str: str) -> datetime:
     dt = datetime.fromisoformat(dt_str.replace("Z", "+00:00"))
     if dt.tzinfo is None:
-        dt = dt.replace(tzinfo=timezone.utc)
+        dt = dt.replace(tzinfo=UTC)
     return dt
 
 
-def analyze_offer(
-    req: OfferAnalysisRequest,
-    rate_floor_pct: float,
+def _evaluate_load(
+    load: dict,
+    req: CarrierAsk,
     rate_ceiling_pct: float,
-) -> tuple[OfferAnalysisResponse, None] | tuple[None, str]:
-    load = get_load_by_id(req.load_id)
-    if not load:
-        return None, f"Load {req.load_id} not found"
-    if load.get("status") == "booked":
-        return None, f"Load {req.load_id} is already booked"
-
+    now: datetime,
+) -> OfferAnalysisResponse:
+    """Apply the accept/counter/reject rules to one available load."""
+    load_id = load["load_id"]
     rejects: list[str] = []
     counters: list[str] = []
     accepts: dict[str, str] = {}
@@ -100,7 +114,6 @@ def analyze_offer(
 
     # ── Pickup window (priority 3) ───────────────────
     if req.asking_pickup_window_hours is not None:
-        now = datetime.now(timezone.utc)
         load_pickup = _parse_dt(load["pickup_datetime"])
         wh = req.asking_pickup_window_hours
         window_end = now + timedelta(hours=wh)
@@ -168,17 +181,17 @@ def analyze_offer(
     # ── Build response ───────────────────────────────
     if rejects:
         return OfferAnalysisResponse(
-            load_id=req.load_id,
+            load_id=load_id,
             verdict=Verdict.REJECT,
             reason="; ".join(rejects),
-        ), None
+        )
 
     if counters:
         return OfferAnalysisResponse(
-            load_id=req.load_id,
+            load_id=load_id,
             verdict=Verdict.COUNTER,
             counter_offers=counters,
-        ), None
+        )
 
     priority = [
         "radius_miles",
@@ -191,10 +204,116 @@ def analyze_offer(
         None,
     )
     return OfferAnalysisResponse(
-        load_id=req.load_id,
+        load_id=load_id,
         verdict=Verdict.ACCEPT,
         reason=accept_reason,
-    ), None
+    )
+
+
+def analyze_offer(
+    req: OfferAnalysisRequest,
+    rate_floor_pct: float,
+    rate_ceiling_pct: float,
+) -> tuple[OfferAnalysisResponse, None] | tuple[None, str]:
+    if req.call_id is None:
+        load = get_load_by_id(req.load_id)
+        if not load:
+            return None, f"Load {req.load_id} not found"
+        if load.get("status") == "booked":
+            return None, f"Load {req.load_id} is already booked"
+        now = datetime.now(UTC)
+        return _evaluate_load(load, req, rate_ceiling_pct, now), None
+
+    # Within a call, later rounds are answered from the session.
+    session = get_session(req.call_id)
+    neg = get_negotiation(
+        session, req.load_id, rate_floor_pct, rate_ceiling_pct
+    )
+    if neg is None:
+        return None, f"Load {req.load_id} not found"
+    if neg.load.get("status") == "booked":
+        return None, f"Load {req.load_id} is already booked"
+
+    max_rounds = get_settings_snapshot().max_negotiation_rounds
+    if req.asking_rate is not None and neg.rate_rounds >= max_rounds:
+        return OfferAnalysisResponse(
+            load_id=req.load_id,
+            verdict=Verdict.REJECT,
+            reason=(
+                f"Round limit reached ({max_rounds} rounds) —"
+                f" our best is ${neg.ceiling:.2f}"
+            ),
+        ), None
+
+    now = datetime.now(UTC)
+    result = _evaluate_load(neg.load, req, rate_ceiling_pct, now)
+    record_round(neg, "analysis", req.asking_rate, result.verdict.value)
+    return result, None
+
+
+_VERDICT_RANK = {Verdict.ACCEPT: 0, Verdict.COUNTER: 1, Verdict.REJECT: 2}
+
+
+def analyze_offer_batch(
+    req: OfferBatchAnalysisRequest,
+    rate_floor_pct: float,
+    rate_ceiling_pct: float,
+) -> OfferBatchAnalysisResponse:
+    """
+    Analyze one carrier ask against several loads in a single pass.
+    Loads that are missing or already booked come back as rejects.
+    """
+    load_ids = list(dict.fromkeys(req.load_ids))  # dedupe, keep order
+    loads = get_loads_by_ids(load_ids)
+    now = datetime.now(UTC)
+
+    ranked: list[tuple[tuple, OfferAnalysisResponse]] = []
+    for load_id in load_ids:
+        load = loads.get(load_id)
+        if not load:
+            result = OfferAnalysisResponse(
+                load_id=load_id,
+                verdict=Verdict.REJECT,
+                reason=f"Load {load_id} not found",
+            )
+            ranked.append(((2, 1, 0.0, 0.0), result))
+            continue
+        if load.get("status") == "booked":
+            result = OfferAnalysisResponse(
+                load_id=load_id,
+                verdict=Verdict.REJECT,
+                reason=f"Load {load_id} is already booked",
+            )
+            ranked.append(((2, 1, 0.0, 0.0), result))
+            continue
+
+        result = _evaluate_load(load, req, rate_ceiling_pct, now)
+        # Within a verdict: fewer sticking points first, then the
+        # smallest gap between the ask and our ceiling, then the
+        # best-paying load.
+        rate_gap = 0.0
+        if req.asking_rate is not None:
+            ceiling = load["loadboard_rate"] * rate_ceiling_pct
+            rate_gap = max(0.0, req.asking_rate - ceiling)
+        key = (
+            _VERDICT_RANK[result.verdict],
+            len(result.counter_offers or []),
+            rate_gap,
+            -load["loadboard_rate"],
+        )
+        ranked.append((key, result))
+
+    ranked.sort(key=lambda kr: kr[0])
+    results = [r for _, r in ranked]
+    best = results[0] if results else None
+    return OfferBatchAnalysisResponse(
+        results=results,
+        best_load_id=(
+            best.load_id
+            if best is not None and best.verdict != Verdict.REJECT
+            else None
+        ),
+    )
 
 
 def create_offer(
@@ -202,7 +321,41 @@ def create_offer(
     rate_floor_percent: float,
     rate_ceiling_percent: float,
 ) -> tuple[OfferResponse, None] | tuple[None, str]:
-    load = get_load_by_id(req.load_id)
+    if req.call_id is not None:
+        session = get_session(req.call_id)
+        max_offers = get_settings_snapshot().max_offers_per_call
+        if not reserve_offer(session, max_offers):
+            return None, (
+                f"Offer limit reached for call {req.call_id}"
+                f" ({max_offers} offers)"
+            )
+        try:
+            result, error = _log_offer(
+                req, rate_floor_percent, rate_ceiling_percent, session
+            )
+        except Exception:
+            release_offer(session)
+            raise
+        if error:
+            release_offer(session)
+        return result, error
+    return _log_offer(req, rate_floor_percent, rate_ceiling_percent)
+
+
+def _log_offer(
+    req: OfferCreateRequest,
+    rate_floor_percent: float,
+    rate_ceiling_percent: float,
+    session: NegotiationSession | None = None,
+) -> tuple[OfferResponse, None] | tuple[None, str]:
+    neg = None
+    if session is not None:
+        neg = get_negotiation(
+            session, req.load_id, rate_floor_percent, rate_ceiling_percent
+        )
+        load = neg.load if neg else None
+    else:
+        load = get_load_by_id(req.load_id)
     if not load:
         return None, f"Load {req.load_id} not found"
 
@@ -220,25 +373,39 @@ def create_offer(
     orig_pickup = load["pickup_datetime"]
     pickup_changed = agreed_pickup is not None and agreed_pickup != orig_pickup
 
-    result = insert_offer(
+    offer = {
+        "call_id": req.call_id,
+        "load_id": req.load_id,
+        "mc_number": ensure_mc_prefix(req.mc_number),
+        "offer_amount": req.offer_amount,
+        "offer_type": req.offer_type.value,
+        "round_number": req.round_number,
+        "status": req.status.value,
+        "notes": req.notes,
+        "original_rate": original_rate,
+        "rate_difference": rate_diff,
+        "rate_difference_pct": rate_diff_pct,
+        "original_pickup_datetime": orig_pickup,
+        "agreed_pickup_datetime": agreed_pickup,
+        "pickup_changed": pickup_changed,
+    }
+    result = execute(lambda conn: insert_offer(offer, conn=conn))
+    mark_dashboard_stale()
+    publish_event(
+        "offer_created",
         {
-            "call_id": req.call_id,
-            "load_id": req.load_id,
-            "mc_number": ensure_mc_prefix(req.mc_number),
-            "offer_amount": req.offer_amount,
-            "offer_type": req.offer_type.value,
-            "round_number": req.round_number,
-            "status": req.status.value,
-            "notes": req.notes,
-            "original_rate": original_rate,
-            "rate_difference": rate_diff,
-            "rate_difference_pct": rate_diff_pct,
-            "original_pickup_datetime": orig_pickup,
-            "agreed_pickup_datetime": agreed_pickup,
-            "pickup_changed": pickup_changed,
-        }
+            "offer_id": result["offer_id"],
+            "call_id": result.get("call_id"),
+            "load_id": result["load_id"],
+            "offer_amount": result["offer_amount"],
+            "status": result["status"],
+            "created_at": result["created_at"],
+        },
     )
 
+    if neg is not None:
+        record_round(neg, "offer", req.offer_amount, req.status.value)
+
     return OfferResponse(
         offer_id=result["offer_id"],
         call_id=result.get("call_id"),
@@ -0,0 +1,236 @@
+"""
+What-if simulator for negotiation settings.
+
+Replays the rate rule of `analyze_offer` over every historical opening
+ask: accept up to the ceiling (loadboard × (1 + max_bump)), counter up
+to the reject line (loadboard × reject multiplier), reject above it.
+Only the rate rule is replayed — offers don't record the carrier's
+miles or pickup asks.
+
+Booking model, per ask:
+  accept  → books at max(ask, floor), floor = loadboard × (1 - target_margin)
+            (the agent opens at the floor, so nobody books below it)
+  counter → books at the ceiling if that call actually booked
+  reject  → no booking
+
+Asks are sorted once by ask/loadboard ratio and prefix-summed, so every
+grid point is answered with a few `searchsorted` lookups: the whole grid
+is one vectorized pass, whatever its size.
+
+CLI:
+    python -m app.services.simulation_service \\
+        --target-margin 0.1 0.15 --max-bump 0 0.03 --reject-multiplier 1.2
+"""
+
+import argparse
+import time
+
+import numpy as np
+
+from app.db.repositories.negotiation_settings_repo import (
+    get_settings_snapshot,
+)
+from app.db.repositories.offer_repo import get_opening_ask_history
+from app.models.negotiation_settings import (
+    NegotiationSimulationRequest,
+    NegotiationSimulationResponse,
+    SimulationScenario,
+)
+from app.services.offer_service import _RATE_REJECT_MULTIPLIER
+
+
+def _prefix(values: np.ndarray) -> np.ndarray:
+    """Cumulative sum with a leading 0, so p[j] - p[i] sums rows i..j-1."""
+    out = np.empty(len(values) + 1, dtype=np.float64)
+    out[0] = 0.0
+    np.cumsum(values, out=out[1:])
+    return out
+
+
+def _grid(
+    req: NegotiationSimulationRequest,
+) -> tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """Cartesian grid of candidates, with the live settings appended."""
+    ns = get_settings_snapshot()
+    current = (
+        ns.target_margin,
+        ns.max_bump_above_loadboard,
+        _RATE_REJECT_MULTIPLIER,
+    )
+    t, b, m = np.meshgrid(
+        np.asarray(req.target_margins, dtype=np.float64),
+        np.asarray(req.max_bumps_above_loadboard, dtype=np.float64),
+        np.asarray(req.rate_reject_multipliers, dtype=np.float64),
+        indexing="ij",
+    )
+    t, b, m = t.ravel(), b.ravel(), m.ravel()
+    is_current = np.isclose(t, current[0]) & np.isclose(b, current[1])
+    is_current &= np.isclose(m, current[2])
+    if not is_current.any():
+        t = np.append(t, current[0])
+        b = np.append(b, current[1])
+        m = np.append(m, current[2])
+        is_current = np.append(is_current, True)
+    return t, b, m, is_current
+
+
+def simulate(
+    req: NegotiationSimulationRequest,
+) -> NegotiationSimulationResponse:
+    rows = get_opening_ask_history()
+    started = time.perf_counter()
+
+    data = np.array(rows, dtype=np.float64).reshape(-1, 4)
+    ask, lb, booked, agreed = data.T
+    n = len(ask)
+
+    order = np.argsort(ask / lb, kind="stable")
+    ask, lb, booked = ask[order], lb[order], booked[order]
+    ratio = ask / lb
+
+    p_lb = _prefix(lb)
+    p_ask = _prefix(ask)
+    p_headroom = _prefix(lb - ask)
+    p_margin_pct = _prefix(1.0 - ratio)
+    p_booked = _prefix(booked)
+    p_lb_booked = _prefix(lb * booked)
+
+    t, b, m, is_current = _grid(req)
+
+    # Row-index boundaries for every grid point at once.
+    i_floor = np.searchsorted(ratio, 1.0 - t, side="right")
+    i_ceil = np.searchsorted(ratio, 1.0 + b, side="right")
+    i_floor = np.minimum(i_floor, i_ceil)
+    i_reject = np.maximum(np.searchsorted(ratio, m, side="right"), i_ceil)
+
+    n_accept = i_ceil
+    n_counter = i_reject - i_ceil
+    n_reject = n - i_reject
+
+    # Accepts at or below the floor book at the floor (margin = t);
+    # the rest book at their ask (margin = 1 - ratio).
+    accept_margin_pct = (
+        t * i_floor + p_margin_pct[i_ceil] - p_margin_pct[i_floor]
+    )
+    accept_margin = (
+        t * p_lb[i_floor] + p_headroom[i_ceil] - p_headroom[i_floor]
+    )
+    accept_agreed = (1.0 - t) * p_lb[i_floor] + p_ask[i_ceil] - p_ask[i_floor]
+
+    # Counters book at the ceiling, only when the call really booked.
+    counter_booked = p_booked[i_reject] - p_booked[i_ceil]
+    counter_lb = p_lb_booked[i_reject] - p_lb_booked[i_ceil]
+
+    bookings = n_accept + counter_booked
+    margin_pct_sum = accept_margin_pct - b * counter_booked
+    total_margin = accept_margin - b * counter_lb
+    total_agreed = accept_agreed + (1.0 + b) * counter_lb
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        denom = max(n, 1)
+        accept_pct = n_accept / denom * 100
+        counter_pct = n_counter / denom * 100
+        reject_pct = n_reject / denom * 100
+        booking_rate = bookings / denom * 100
+        avg_margin = np.where(
+            bookings > 0, margin_pct_sum / bookings * 100, np.nan
+        )
+
+    scenarios = [
+        SimulationScenario(
+            target_margin=round(float(t[i]), 4),
+            max_bump_above_loadboard=round(float(b[i]), 4),
+            rate_reject_multiplier=round(float(m[i]), 4),
+            is_current=bool(is_current[i]),
+            accept_pct=round(float(accept_pct[i]), 1),
+            counter_pct=round(float(counter_pct[i]), 1),
+            reject_pct=round(float(reject_pct[i]), 1),
+            expected_bookings=round(float(bookings[i]), 1),
+            booking_rate_pct=round(float(booking_rate[i]), 1),
+            avg_margin_pct=round(float(avg_margin[i]), 1)
+            if not np.isnan(avg_margin[i])
+            else None,
+            total_margin=round(float(total_margin[i]), 2),
+            total_agreed=round(float(total_agreed[i]), 2),
+        )
+        for i in range(len(t))
+    ]
+    scenarios.sort(key=lambda s: (-s.total_margin, -s.booking_rate_pct))
+
+    # What actually happened, for comparison.
+    hist_rate = None
+    hist_margin = None
+    if n:
+        hist_rate = round(float(booked.mean()) * 100, 1)
+        lb_all = data[:, 1]
+        known = (data[:, 2] == 1) & ~np.isnan(agreed)
+        if known.any():
+            margins = (lb_all[known] - agreed[known]) / lb_all[known]
+            hist_margin = round(float(margins.mean()) * 100, 1)
+
+    return NegotiationSimulationResponse(
+        sample_size=n,
+        historical_booking_rate_pct=hist_rate,
+        historical_avg_margin_pct=hist_margin,
+        elapsed_ms=round((time.perf_counter() - started) * 1000, 1),
+        scenarios=scenarios,
+    )
+
+
+def main() -> None:
+    defaults = NegotiationSimulationRequest()
+    parser = argparse.ArgumentParser(
+        description="Replay negotiation settings over historical offers."
+    )
+    parser.add_argument(
+        "--target-margin",
+        type=float,
+        nargs="+",
+        default=defaults.target_margins,
+    )
+    parser.add_argument(
+        "--max-bump",
+        type=float,
+        nargs="+",
+        default=defaults.max_bumps_above_loadboard,
+    )
+    parser.add_argument(
+        "--reject-multiplier",
+        type=float,
+        nargs="+",
+        default=defaults.rate_reject_multipliers,
+    )
+    args = parser.parse_args()
+
+    result = simulate(
+        NegotiationSimulationRequest(
+            target_margins=args.target_margin,
+            max_bumps_above_loadboard=args.max_bump,
+            rate_reject_multipliers=args.reject_multiplier,
+        )
+    )
+    print(
+        f"{result.sample_size} opening asks replayed in"
+        f" {result.elapsed_ms} ms"
+        f" (historical booking rate {result.historical_booking_rate_pct}%,"
+        f" margin {result.historical_avg_margin_pct}%)"
+    )
+    print(
+        f"{'margin':>7} {'bump':>6} {'reject':>7} "
+        f"{'acc%':>6} {'ctr%':>6} {'rej%':>6} "
+        f"{'book%':>6} {'avg m%':>7} {'total margin':>13}"
+    )
+    for s in result.scenarios:
+        marker = " *" if s.is_current else ""
+        print(
+            f"{s.target_margin:>7.2f} {s.max_bump_above_loadboard:>6.2f} "
+            f"{s.rate_reject_multiplier:>7.2f} "
+            f"{s.accept_pct:>6.1f} {s.counter_pct:>6.1f} "
+            f"{s.reject_pct:>6.1f} {s.booking_rate_pct:>6.1f} "
+            f"{s.avg_margin_pct if s.avg_margin_pct is not None else '-':>7} "
+            f"{s.total_margin:>13,.2f}{marker}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -5,6 +5,7 @@ City resolution: alias → exact → prefix → fuzzy → geocode API.
 
 import logging
 import math
+from functools import lru_cache
 
 import httpx
 from cachetools import TTLCache
@@ -52,6 +53,14 @@ def _resolve_city_static(cleaned: str) -> tuple[str, float, float] | None:
     return None
 
 
+@lru_cache(maxsize=1024)
+def canonical_city(name: str) -> str | None:
+    """Canonical city key (e.g. "dallas, tx") for a stored city name.
+    In-memory tables only — never calls the geocoder."""
+    result = _resolve_city_static(name.lower().strip())
+    return result[0] if result else None
+
+
 async def _geocode_city(query: str) -> tuple[str, float, float] | None:
     """Fallback: call Nominatim API. Cached 24h."""
     if query in _geocode_cache:
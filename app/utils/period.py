@@ -1,4 +1,4 @@
-from datetime import date, timedelta
+from datetime import UTC, date, datetime, timedelta
 from enum import Enum
 
 
@@ -12,12 +12,17 @@ class Period(str, Enum):
 _PERIOD_DAYS = {"today": 1, "last_week": 7, "last_month": 30}
 
 
-def period_since(period: str) -> str | None:
+def utc_today() -> date:
+    """Today in UTC, the zone every created_at is stored in."""
+    return datetime.now(UTC).date()
+
+
+def period_since(period: str, today: date | None = None) -> str | None:
     """Return ISO date string for start of period, or None for all_time."""
     days = _PERIOD_DAYS.get(period)
     if days is None:
         return None
-    today = date.today()
+    today = today or utc_today()
     if days == 1:
         return today.isoformat()
     return (today - timedelta(days=days - 1)).isoformat()
@@ -0,0 +1,95 @@
+"""
+Merging t-digest (Dunning & Ertl) — a streaming quantile sketch.
+
+Values are buffered and merged into at most ~`compression` centroids
+(weighted means), kept small near the tails so extreme quantiles stay
+accurate. Memory and quantile cost are bounded by `compression`, not by
+how many values were added.
+"""
+
+import math
+
+_BUFFER_FACTOR = 5  # merge once this many times `compression` are pending
+
+
+class TDigest:
+    def __init__(self, compression: float = 100) -> None:
+        self.compression = compression
+        self.count = 0
+        self.min = math.inf
+        self.max = -math.inf
+        self._means: list[float] = []
+        self._weights: list[float] = []
+        self._buffer: list[float] = []
+
+    def add(self, value: float) -> None:
+        self._buffer.append(value)
+        self.count += 1
+        self.min = min(self.min, value)
+        self.max = max(self.max, value)
+        if len(self._buffer) >= _BUFFER_FACTOR * self.compression:
+            self._merge()
+
+    def _k(self, q: float) -> float:
+        """Scale function k1: centroid size shrinks towards q = 0 and 1."""
+        return self.compression / (2 * math.pi) * math.asin(2 * q - 1)
+
+    def _q(self, k: float) -> float:
+        """Inverse of _k."""
+        if k >= self.compression / 4:
+            return 1.0
+        return (math.sin(k * 2 * math.pi / self.compression) + 1) / 2
+
+    def _merge(self) -> None:
+        if not self._buffer:
+            return
+        points = sorted(
+            zip(
+                self._means + self._buffer,
+                self._weights + [1.0] * len(self._buffer),
+            )
+        )
+        self._buffer.clear()
+        means: list[float] = []
+        weights: list[float] = []
+        mean, weight = points[0]
+        q_left = 0.0
+        q_limit = self._q(self._k(q_left) + 1)
+        for next_mean, next_weight in points[1:]:
+            if q_left + (weight + next_weight) / self.count <= q_limit:
+                weight += next_weight
+                mean += (next_mean - mean) * next_weight / weight
+            else:
+                means.append(mean)
+                weights.append(weight)
+                q_left += weight / self.count
+                q_limit = self._q(self._k(q_left) + 1)
+                mean, weight = next_mean, next_weight
+        means.append(mean)
+        weights.append(weight)
+        self._means, self._weights = means, weights
+
+    def quantile(self, q: float) -> float | None:
+        """Estimated value at quantile `q` (0..1); None when empty."""
+        self._merge()
+        if not self.count:
+            return None
+        means, weights = self._means, self._weights
+        if len(means) == 1:
+            return means[0]
+        # Each centroid's mass is centred on its mean; interpolate
+        # between neighbouring centres, and towards min/max at the ends.
+        target = q * self.count
+        if target < weights[0] / 2:
+            return self.min + (means[0] - self.min) * target / (weights[0] / 2)
+        cumulative = weights[0] / 2
+        for i in range(1, len(means)):
+            step = (weights[i - 1] + weights[i]) / 2
+            if target < cumulative + step:
+                t = (target - cumulative) / step
+                return means[i - 1] + (means[i] - means[i - 1]) * t
+            cumulative += step
+        tail = target - cumulative
+        return means[-1] + (self.max - means[-1]) * min(
+            tail / (weights[-1] / 2), 1.0
+        )
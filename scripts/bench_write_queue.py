@@ -0,0 +1,83 @@
+"""
+Throughput of POST /api/calls writes with and without the write queue.
+
+Logs calls through `log_call` on a fresh temp database from a pool of
+threads, once committing each call on its own connection (writer not
+running) and once through the group-commit writer, and prints calls/s
+plus the writer's batch metrics.
+
+CLI (from the repo root):
+    python -m scripts.bench_write_queue
+    python -m scripts.bench_write_queue --threads 1 --calls 200
+"""
+
+import argparse
+import tempfile
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from app.db import connection
+from app.db.schema import init_db
+from app.db.write_queue import write_queue
+from app.models.call import CallLogRequest
+from app.models.enums import CallOutcome, Sentiment
+from app.services.call_service import log_call
+
+
+def _log_calls(count: int) -> None:
+    for _ in range(count):
+        log_call(
+            CallLogRequest(
+                call_id=f"bench-{uuid.uuid4().hex}",
+                mc_number="123456",
+                carrier_name="Bench Carrier",
+                outcome=CallOutcome.BOOKED,
+                sentiment=Sentiment.POSITIVE,
+                duration_seconds=120,
+                transcript="bench " * 100,
+            )
+        )
+
+
+def _run(threads: int, calls: int, queued: bool, db_dir: Path) -> float:
+    mode = "queue" if queued else "direct"
+    connection.DB_PATH = db_dir / f"bench-{mode}.db"
+    init_db()
+    if queued:
+        write_queue.start()
+    try:
+        started = time.perf_counter()
+        with ThreadPoolExecutor(threads) as pool:
+            for future in [
+                pool.submit(_log_calls, calls) for _ in range(threads)
+            ]:
+                future.result()
+        elapsed = time.perf_counter() - started
+    finally:
+        write_queue.stop()
+    return threads * calls / elapsed
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--threads", type=int, default=32)
+    parser.add_argument("--calls", type=int, default=200, help="per thread")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        direct = _run(args.threads, args.calls, False, Path(tmp))
+        queued = _run(args.threads, args.calls, True, Path(tmp))
+    m = write_queue.metrics()
+    print(f"{args.threads} threads x {args.calls} calls")
+    print(f"  direct:      {direct:8.0f} calls/s")
+    print(f"  write queue: {queued:8.0f} calls/s")
+    print(
+        f"  batches: {m['batches']}, avg size {m['avg_batch_size']}, "
+        f"avg commit {m['avg_commit_ms']} ms"
+    )
+
+
+if __name__ == "__main__":
+    main()
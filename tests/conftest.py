@@ -0,0 +1,37 @@
+import pytest
+
+from app.db import connection
+from app.db.connection import get_db
+from app.db.schema import init_db
+from app.db.seed import seed_cities, seed_loads, seed_negotiation_settings
+from app.db.write_queue import write_queue
+
+
+@pytest.fixture
+def db(tmp_path, monkeypatch):
+    """A fresh database with the seed cities, loads and settings."""
+    monkeypatch.setattr(connection, "DB_PATH", tmp_path / "carrier.db")
+    init_db()
+    seed_cities()
+    seed_loads()
+    seed_negotiation_settings()
+
+
+@pytest.fixture
+def available_load(db) -> dict:
+    with get_db() as conn:
+        row = conn.execute(
+            "SELECT * FROM loads WHERE status = 'available' LIMIT 1"
+        ).fetchone()
+    return dict(row)
+
+
+@pytest.fixture(params=["direct", "write_queue"])
+def writes(request, db):
+    """Write through a direct unit of work, or the group-commit queue."""
+    if request.param == "write_queue":
+        write_queue.start()
+        yield
+        write_queue.stop()
+    else:
+        yield
@@ -0,0 +1,46 @@
+import threading
+import uuid
+
+from app.db.connection import get_db
+from app.models.offer import BookedLoadRequest
+from app.services.booked_load_service import book_load
+
+_THREADS = 32
+
+
+def test_concurrent_bookings_of_one_load_have_one_winner(
+    available_load, writes
+):
+    load_id = available_load["load_id"]
+    errors: list[str | None] = []
+    start = threading.Barrier(_THREADS)
+
+    def book():
+        start.wait()
+        _, error = book_load(
+            BookedLoadRequest(
+                load_id=load_id,
+                mc_number="MC123456",
+                agreed_rate=available_load["loadboard_rate"],
+                call_id=f"call-{uuid.uuid4().hex}",
+            )
+        )
+        errors.append(error)
+
+    threads = [threading.Thread(target=book) for _ in range(_THREADS)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert errors.count(None) == 1
+    assert errors.count(f"Load {load_id} is already booked") == _THREADS - 1
+    with get_db() as conn:
+        rows = conn.execute(
+            "SELECT COUNT(*) FROM booked_loads WHERE load_id = ?", (load_id,)
+        ).fetchone()[0]
+        status = conn.execute(
+            "SELECT status FROM loads WHERE load_id = ?", (load_id,)
+        ).fetchone()[0]
+    assert rows == 1
+    assert status == "booked"
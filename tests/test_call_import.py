@@ -0,0 +1,46 @@
+import asyncio
+import json
+
+from app.db.connection import get_db
+from app.services.call_import_service import ingest_calls_ndjson
+
+
+def _ingest(*records: dict):
+    async def stream():
+        yield "\n".join(json.dumps(r) for r in records).encode()
+
+    return asyncio.run(ingest_calls_ndjson(stream()))
+
+
+def _record(call_id: str, created_at: str) -> dict:
+    return {
+        "call_id": call_id,
+        "outcome": "no_loads_available",
+        "sentiment": "neutral",
+        "created_at": created_at,
+    }
+
+
+def test_backfill_timestamps_are_stored_as_naive_utc(db):
+    result = _ingest(
+        _record("offset", "2026-01-01T23:30:00-05:00"),
+        _record("zulu", "2026-01-02T01:00:00Z"),
+        _record("naive", "2026-01-02T02:00:00"),
+    )
+
+    assert result.inserted == 3
+    with get_db() as conn:
+        rows = conn.execute(
+            """SELECT call_id, created_at FROM calls
+               WHERE call_id IN ('offset', 'zulu', 'naive')"""
+        ).fetchall()
+        days = conn.execute(
+            "SELECT day, SUM(calls) FROM calls_daily "
+            "WHERE day >= '2026-01-01' AND day < '2026-01-03' GROUP BY day"
+        ).fetchall()
+    assert {r["call_id"]: r["created_at"] for r in rows} == {
+        "offset": "2026-01-02T04:30:00",
+        "zulu": "2026-01-02T01:00:00",
+        "naive": "2026-01-02T02:00:00",
+    }
+    assert [tuple(d) for d in days] == [("2026-01-02", 3)]
@@ -0,0 +1,122 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import UTC, datetime
+
+import pytest
+
+from app.db.repositories.call_repo import insert_calls
+from app.services import dashboard_service
+
+_HOUR = 3600
+
+
+@pytest.fixture
+def clean_cache(db):
+    dashboard_service.invalidate_timeseries()
+    yield
+    dashboard_service.invalidate_timeseries()
+
+
+def test_closed_buckets_are_cached(clean_cache):
+    now = int(time.time())
+    dashboard_service._bucket_totals(_HOUR, now - 6 * _HOUR, now)
+
+    cached = dashboard_service._closed_buckets[_HOUR]
+    assert len(cached) >= 5
+    assert max(cached) < now - _HOUR
+
+
+def test_invalidation_during_a_read_drops_its_buckets(
+    clean_cache, monkeypatch
+):
+    read_buckets = dashboard_service.get_call_buckets
+
+    def backfill_midway(width, start, end):
+        buckets = read_buckets(width, start, end)
+        # A backfill commits and invalidates after this read.
+        dashboard_service.invalidate_timeseries()
+        return buckets
+
+    monkeypatch.setattr(dashboard_service, "get_call_buckets", backfill_midway)
+    now = int(time.time())
+    totals = dashboard_service._bucket_totals(_HOUR, now - 6 * _HOUR, now)
+
+    assert len(totals) == 7
+    assert not dashboard_service._closed_buckets.get(_HOUR)
+
+
+def test_concurrent_reads_and_invalidations(clean_cache):
+    now = int(time.time())
+
+    def read_and_invalidate(i: int) -> int:
+        if i % 3 == 0:
+            dashboard_service.invalidate_timeseries()
+        return len(
+            dashboard_service._bucket_totals(_HOUR, now - 6 * _HOUR, now)
+        )
+
+    with ThreadPoolExecutor(8) as pool:
+        lengths = list(pool.map(read_and_invalidate, range(200)))
+
+    assert lengths == [7] * 200
+
+
+@pytest.fixture
+def local_ahead_of_utc(monkeypatch):
+    """Host clock in UTC+14, where the local date is a day ahead."""
+    monkeypatch.setenv("TZ", "Pacific/Kiritimati")
+    time.tzset()
+    yield
+    monkeypatch.undo()
+    time.tzset()
+
+
+def test_today_starts_at_utc_midnight(
+    clean_cache, local_ahead_of_utc, monkeypatch
+):
+    # 12:30 UTC on the 10th is already the 11th locally.
+    now = datetime(2026, 3, 10, 12, 30, tzinfo=UTC).timestamp()
+    monkeypatch.setattr(dashboard_service.time, "time", lambda: now)
+    insert_calls(
+        [
+            _call("yesterday", "2026-03-09T23:50:00"),
+            _call("today", "2026-03-10T01:15:00"),
+        ]
+    )
+
+    series = dashboard_service.get_dashboard_timeseries(
+        "calls", "hour", "today"
+    )
+
+    assert len(series.points) == 13
+    assert series.points[0].start == "2026-03-10T00:00:00+00:00"
+    assert [p.value for p in series.points] == [0, 1] + [0] * 11
+
+
+def test_period_starting_after_now_is_empty(clean_cache):
+    now = int(time.time())
+    assert dashboard_service._bucket_totals(_HOUR, now + 13 * _HOUR, now) == []
+
+
+def _call(call_id: str, created_at: str) -> dict:
+    return {
+        "call_id": call_id,
+        "mc_number": None,
+        "carrier_name": None,
+        "lane_origin": None,
+        "lane_destination": None,
+        "equipment_type": None,
+        "load_id": None,
+        "initial_rate": None,
+        "final_rate": None,
+        "negotiation_rounds": 0,
+        "carrier_phone": None,
+        "special_requests": None,
+        "outcome": "no_loads_available",
+        "sentiment": "neutral",
+        "duration_seconds": 60,
+        "transcript": None,
+        "summary": None,
+        "key_points": None,
+        "created_at": created_at,
+    }
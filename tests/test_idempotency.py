@@ -0,0 +1,110 @@
+import threading
+import uuid
+
+import pytest
+from fastapi import HTTPException
+
+from app.db.connection import get_db
+from app.models.call import CallLogRequest
+from app.models.offer import BookedLoadRequest
+from app.services.booked_load_service import book_load
+from app.services.call_service import log_call
+
+_THREADS = 16
+
+
+def _available_loads(n: int) -> list[dict]:
+    with get_db() as conn:
+        rows = conn.execute(
+            "SELECT * FROM loads WHERE status = 'available' LIMIT ?", (n,)
+        ).fetchall()
+    return [dict(r) for r in rows]
+
+
+def _booking(load: dict, call_id: str, **fields) -> BookedLoadRequest:
+    fields.setdefault("agreed_rate", load["loadboard_rate"])
+    return BookedLoadRequest(
+        load_id=load["load_id"],
+        mc_number="MC123456",
+        call_id=call_id,
+        **fields,
+    )
+
+
+def _call(call_id: str, **fields) -> CallLogRequest:
+    return CallLogRequest(
+        call_id=call_id,
+        mc_number="MC123456",
+        outcome="negotiation_failed",
+        sentiment="neutral",
+        **fields,
+    )
+
+
+def _count(table: str, call_id: str) -> int:
+    with get_db() as conn:
+        return conn.execute(
+            f"SELECT COUNT(*) FROM {table} WHERE call_id = ?", (call_id,)
+        ).fetchone()[0]
+
+
+def test_booking_retry_replays_the_first_response(db):
+    (load,) = _available_loads(1)
+    call_id = f"call-{uuid.uuid4().hex}"
+
+    first, error = book_load(_booking(load, call_id))
+    assert error is None
+    retry, error = book_load(_booking(load, call_id))
+    assert error is None
+    assert retry == first
+    assert _count("booked_loads", call_id) == 1
+
+
+def test_one_call_can_book_two_loads(db):
+    load_a, load_b = _available_loads(2)
+    call_id = f"call-{uuid.uuid4().hex}"
+
+    _, error = book_load(_booking(load_a, call_id))
+    assert error is None
+    second, error = book_load(_booking(load_b, call_id))
+    assert error is None
+    assert second.load_id == load_b["load_id"]
+    assert _count("booked_loads", call_id) == 2
+
+
+def test_reused_key_with_a_different_body_is_refused(db):
+    (load,) = _available_loads(1)
+    call_id = f"call-{uuid.uuid4().hex}"
+
+    _, error = book_load(_booking(load, call_id))
+    assert error is None
+    _, error = book_load(
+        _booking(load, call_id, agreed_rate=load["loadboard_rate"] - 100)
+    )
+    assert error is not None and "Idempotency key" in error
+
+    log_call(_call(call_id))
+    with pytest.raises(HTTPException) as refused:
+        log_call(_call(call_id, duration_seconds=99))
+    assert refused.value.status_code == 409
+
+
+def test_concurrent_call_retries_insert_once(writes):
+    call_id = f"call-{uuid.uuid4().hex}"
+    responses = []
+    start = threading.Barrier(_THREADS)
+
+    def retry():
+        start.wait()
+        responses.append(log_call(_call(call_id)))
+
+    threads = [threading.Thread(target=retry) for _ in range(_THREADS)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert len(responses) == _THREADS
+    assert all(r == responses[0] for r in responses)
+    assert _count("calls", call_id) == 1
+    assert _count("carrier_interactions", call_id) == 1
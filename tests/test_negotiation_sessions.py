@@ -0,0 +1,131 @@
+import threading
+import uuid
+
+import pytest
+
+from app.db.repositories.negotiation_settings_repo import (
+    get_settings_snapshot,
+)
+from app.models.enums import OfferType, Verdict
+from app.models.offer import OfferAnalysisRequest, OfferCreateRequest
+from app.services import negotiation_session_service
+from app.services.offer_service import analyze_offer, create_offer
+
+
+def _bounds() -> tuple[float, float]:
+    ns = get_settings_snapshot()
+    return 1 - ns.target_margin, 1 + ns.max_bump_above_loadboard
+
+
+def _round(call_id: str, load: dict, n: int):
+    """One negotiation round: analyze the carrier's ask, log our offer."""
+    ask = round(load["loadboard_rate"] * 1.5, 2)
+    analysis, error = analyze_offer(
+        OfferAnalysisRequest(
+            load_id=load["load_id"], call_id=call_id, asking_rate=ask
+        ),
+        *_bounds(),
+    )
+    assert error is None
+    _, error = create_offer(
+        OfferCreateRequest(
+            call_id=call_id,
+            load_id=load["load_id"],
+            mc_number="MC123456",
+            offer_amount=load["loadboard_rate"],
+            offer_type=OfferType.COUNTER,
+            round_number=n,
+        ),
+        *_bounds(),
+    )
+    assert error is None
+    return analysis
+
+
+def _is_round_limit(analysis) -> bool:
+    return analysis.verdict == Verdict.REJECT and analysis.reason.startswith(
+        "Round limit reached"
+    )
+
+
+@pytest.mark.parametrize("rounds_before", ["max - 1", "max"])
+def test_round_limit_counts_each_round_once(available_load, rounds_before):
+    max_rounds = get_settings_snapshot().max_negotiation_rounds
+    n = max_rounds - 1 if rounds_before == "max - 1" else max_rounds
+    call_id = f"call-{uuid.uuid4().hex}"
+
+    for i in range(1, n + 1):
+        assert not _is_round_limit(_round(call_id, available_load, i))
+
+    next_round, error = analyze_offer(
+        OfferAnalysisRequest(
+            load_id=available_load["load_id"],
+            call_id=call_id,
+            asking_rate=available_load["loadboard_rate"],
+        ),
+        *_bounds(),
+    )
+    assert error is None
+    assert _is_round_limit(next_round) == (n == max_rounds)
+
+
+def test_concurrent_offers_respect_offer_limit(available_load):
+    max_offers = get_settings_snapshot().max_offers_per_call
+    call_id = f"call-{uuid.uuid4().hex}"
+    errors: list[str | None] = []
+    start = threading.Barrier(max_offers * 4)
+
+    def offer():
+        start.wait()
+        _, error = create_offer(
+            OfferCreateRequest(
+                call_id=call_id,
+                load_id=available_load["load_id"],
+                mc_number="MC123456",
+                offer_amount=available_load["loadboard_rate"],
+                offer_type=OfferType.INITIAL,
+            ),
+            *_bounds(),
+        )
+        errors.append(error)
+
+    threads = [threading.Thread(target=offer) for _ in range(max_offers * 4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert errors.count(None) == max_offers
+    assert all(e and "Offer limit reached" in e for e in errors if e)
+
+
+def test_booking_during_first_load_read_reaches_the_session(
+    available_load, monkeypatch
+):
+    session = negotiation_session_service.get_session(uuid.uuid4().hex)
+    load_id = available_load["load_id"]
+    read_load = negotiation_session_service.get_load_by_id
+    threads: list[threading.Thread] = []
+
+    def booked_right_after_read(load_id: str) -> dict:
+        load = read_load(load_id)
+        # Another call books the load between this read and the cache.
+        booking = threading.Thread(
+            target=negotiation_session_service.mark_load_booked_in_sessions,
+            args=(load_id,),
+        )
+        booking.start()
+        booking.join(timeout=0.2)
+        threads.append(booking)
+        return load
+
+    monkeypatch.setattr(
+        negotiation_session_service, "get_load_by_id", booked_right_after_read
+    )
+    neg = negotiation_session_service.get_negotiation(
+        session, load_id, *_bounds()
+    )
+    for booking in threads:
+        booking.join()
+
+    assert neg.load["status"] == "booked"
@@ -0,0 +1,61 @@
+import uuid
+
+from app.db.connection import get_db
+from app.db.repositories.negotiation_settings_repo import (
+    get_settings_snapshot,
+)
+from app.db.repositories.offer_repo import get_opening_ask_history
+from app.models.call import CallLogRequest
+from app.models.enums import OfferType
+from app.models.offer import BookedLoadRequest, OfferCreateRequest
+from app.services.booked_load_service import book_load
+from app.services.call_service import log_call
+from app.services.offer_service import create_offer
+
+
+def test_opening_ask_counted_once_for_a_call_with_two_bookings(db):
+    with get_db() as conn:
+        load_a, load_b = (
+            dict(r)
+            for r in conn.execute(
+                "SELECT * FROM loads WHERE status = 'available' LIMIT 2"
+            )
+        )
+    call_id = f"call-{uuid.uuid4().hex}"
+    ns = get_settings_snapshot()
+    _, error = create_offer(
+        OfferCreateRequest(
+            call_id=call_id,
+            load_id=load_a["load_id"],
+            mc_number="MC123456",
+            offer_amount=load_a["loadboard_rate"] * 1.05,
+            offer_type=OfferType.INITIAL,
+        ),
+        1 - ns.target_margin,
+        1 + ns.max_bump_above_loadboard,
+    )
+    assert error is None
+    for load in (load_a, load_b):
+        _, error = book_load(
+            BookedLoadRequest(
+                load_id=load["load_id"],
+                mc_number="MC123456",
+                agreed_rate=load["loadboard_rate"],
+                call_id=call_id,
+            )
+        )
+        assert error is None
+    log_call(
+        CallLogRequest(
+            call_id=call_id,
+            outcome="booked",
+            sentiment="positive",
+            load_id=load_a["load_id"],
+        )
+    )
+
+    history = get_opening_ask_history()
+
+    assert len(history) == 1
+    _, _, booked, _ = history[0]
+    assert booked == 1
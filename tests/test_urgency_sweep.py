@@ -0,0 +1,35 @@
+import asyncio
+import sqlite3
+from types import SimpleNamespace
+
+from app.services import load_service
+
+
+def test_sweep_keeps_running_after_a_failed_pass(monkeypatch, caplog):
+    passes = []
+
+    def execute(fn):
+        passes.append(fn)
+        if len(passes) == 1:
+            raise sqlite3.OperationalError("database is locked")
+
+    monkeypatch.setattr(load_service, "execute", execute)
+    monkeypatch.setattr(
+        load_service,
+        "get_settings",
+        lambda: SimpleNamespace(urgency_sweep_seconds=0),
+    )
+
+    async def run():
+        task = asyncio.create_task(load_service.sweep_urgency())
+        while len(passes) < 3 and not task.done():
+            await asyncio.sleep(0.01)
+        task.cancel()
+        await asyncio.gather(task, return_exceptions=True)
+        return task
+
+    task = asyncio.run(run())
+
+    assert task.cancelled()
+    assert len(passes) >= 3
+    assert "Urgency sweep failed" in caplog.text